@@ -0,0 +1,128 @@
+"""
+Count the memory blocks that compiled formats and rendered values take, with `tracemalloc` snapshots.
+
+For each format, the number of blocks, and their size, that stay allocated per compiled format are reported, which is
+what a cache of compiled formats costs per entry. Then a value is rendered a number of times, keeping the results, and
+the number of blocks that each render leaves allocated is reported. That is one for the result string, and more if
+rendering builds up caches or keeps intermediate objects alive.
+
+    python benchmarks/allocations.py
+    python benchmarks/allocations.py --json allocations.json
+"""
+
+import argparse
+import json
+import tracemalloc
+from typing import Any, Callable, Dict, List, Tuple
+
+from excel_text import compile_format
+
+FORMATS = {
+    "number": ("#,##0.00", 1234.5678),
+    "large_number": ("#,##0.00", 123456789012.345),
+    "padded_number": ("000,000,000,000", 1234567),
+    "scientific": ("0.00E+00", 0.000123),
+    "date": ("dddd d mmmm yyyy hh:mm:ss AM/PM", 44259.53),
+    "elapsed": ("[h]:mm:ss", 1.2345),
+    "conditional": ("[>=1000]#,##0;0.00", 1234.5),
+    "verbatim": ('"Amount due (incl. VAT): "$ ~ ^ & { } < > #,##0', 1234.5),
+}
+
+
+def allocated_blocks(fill: Callable[[List[Any]], None], count: int) -> Tuple[int, int]:
+    """
+    The blocks that filling a list allocates, from the statistics of `tracemalloc` snapshots taken before and after.
+
+    :param fill: Fills the list, which is preallocated so that growing it is not counted.
+    :param count: The length of the list.
+    :return: The number of blocks and their size in bytes, per item of the list.
+    """
+    items: List[Any] = [None] * count
+    tracemalloc.start()
+    try:
+        before = tracemalloc.take_snapshot()
+        fill(items)
+        after = tracemalloc.take_snapshot()
+    finally:
+        tracemalloc.stop()
+
+    statistics = after.compare_to(before, "filename")
+    blocks = sum(stat.count_diff for stat in statistics)
+    size = sum(stat.size_diff for stat in statistics)
+    return round(blocks / count), round(size / count)
+
+
+def compiled_blocks(fmt: str, renderer: str, count: int) -> Tuple[int, int]:
+    """
+    The blocks that a compiled format keeps allocated, averaged over a number of compilations.
+    """
+    config = {"renderer": renderer}
+    # The first compilation may set up caches, like the tokenizer, which are shared by all compiled formats.
+    compile_format(fmt, config)
+
+    def fill(items: List[Any]) -> None:
+        for i in range(len(items)):
+            items[i] = compile_format(fmt, config)
+
+    return allocated_blocks(fill, count)
+
+
+def render_blocks(fmt: str, value: Any, renderer: str, count: int) -> Tuple[int, int]:
+    """
+    The blocks that rendering a value leaves allocated, including the result, averaged over a number of renders.
+    """
+    render = compile_format(fmt, {"renderer": renderer}).render
+    # The first render may set up caches, which are not what is measured.
+    render(value)
+
+    def fill(items: List[Any]) -> None:
+        for i in range(len(items)):
+            items[i] = render(value)
+
+    return allocated_blocks(fill, count)
+
+
+def main(argv: Any = None) -> None:
+    arg_parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    arg_parser.add_argument(
+        "--runs", type=int, default=1000, help="Number of renders per format."
+    )
+    arg_parser.add_argument(
+        "--count", type=int, default=200, help="Number of compilations per format."
+    )
+    arg_parser.add_argument("--json", help="Write the results to this JSON file.")
+    args = arg_parser.parse_args(argv)
+
+    renderers = ["interpreter", "codegen"]
+    results: Dict[str, Dict[str, Dict[str, Dict[str, int]]]] = {
+        "compiled": {},
+        "render": {},
+    }
+    for name, (fmt, value) in FORMATS.items():
+        results["compiled"][name] = {}
+        results["render"][name] = {}
+        for renderer in renderers:
+            blocks, size = compiled_blocks(fmt, renderer, args.count)
+            results["compiled"][name][renderer] = {"blocks": blocks, "bytes": size}
+            blocks, size = render_blocks(fmt, value, renderer, args.runs)
+            results["render"][name][renderer] = {"blocks": blocks, "bytes": size}
+
+    for kind, description in [
+        ("compiled", "Blocks per compiled format"),
+        ("render", "Blocks left allocated per render"),
+    ]:
+        print(f"{description}:")
+        for name, by_renderer in results[kind].items():
+            row: List[str] = [
+                f"{by_renderer[r]['blocks']:4d} ({by_renderer[r]['bytes']:6d} B)"
+                for r in renderers
+            ]
+            print(f"  {name:20} interpreter {row[0]}   codegen {row[1]}")
+
+    if args.json:
+        with open(args.json, "w", encoding="utf-8") as f:
+            json.dump(results, f, indent=2)
+
+
+if __name__ == "__main__":
+    main()
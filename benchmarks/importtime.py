@@ -0,0 +1,103 @@
+"""
+Measure how long it takes to import excel_text, with `python -X importtime`.
+
+Each statement runs in a fresh interpreter, a number of times, and the median is reported. Only the imports triggered
+by the statement itself are counted, not those of the interpreter startup.
+
+    python benchmarks/importtime.py
+    python benchmarks/importtime.py --runs 20 --json importtime.json
+"""
+
+import argparse
+import json
+import statistics
+import subprocess
+import sys
+from typing import Dict, List, Tuple
+
+STATEMENTS = [
+    "import excel_text",
+    "from excel_text import get_text_function",
+    "from excel_text import text",
+    "from excel_text import text; text(1, '0.00')",
+    "from excel_text import text_array",
+]
+
+_MARKER = "--- excel_text importtime marker ---"
+
+
+def import_times(statement: str) -> Tuple[int, Dict[str, int]]:
+    """
+    Run a statement in a fresh interpreter.
+
+    :return: The total import time in microseconds, and the self time of each module that was imported.
+    """
+    result = subprocess.run(
+        [
+            sys.executable,
+            "-X",
+            "importtime",
+            "-c",
+            f"import sys; sys.stderr.write({_MARKER!r} + '\\n'); {statement}",
+        ],
+        capture_output=True,
+        text=True,
+        check=True,
+    )
+    lines = result.stderr.splitlines()
+    lines = lines[lines.index(_MARKER) + 1 :]
+
+    total = 0
+    modules = {}
+    for line in lines:
+        if not line.startswith("import time:"):
+            continue
+        self_us, cumulative_us, name = line[len("import time:") :].split("|")
+        modules[name.strip()] = int(self_us)
+        # Nested imports are indented, and already included in the cumulative time of their parents.
+        if not name[1:].startswith(" "):
+            total += int(cumulative_us)
+    return total, modules
+
+
+def main(argv: List[str]) -> None:
+    arg_parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    arg_parser.add_argument("--runs", type=int, default=10)
+    arg_parser.add_argument("--top", type=int, default=5)
+    arg_parser.add_argument("--json", help="Also write the results to this file.")
+    args = arg_parser.parse_args(argv)
+
+    results = {}
+    for statement in STATEMENTS:
+        totals = []
+        modules: Dict[str, List[int]] = {}
+        for _ in range(args.runs):
+            total, run_modules = import_times(statement)
+            totals.append(total)
+            for name, self_us in run_modules.items():
+                modules.setdefault(name, []).append(self_us)
+
+        heaviest = sorted(
+            ((statistics.median(us), name) for name, us in modules.items()),
+            reverse=True,
+        )[: args.top]
+        results[statement] = {
+            "median_us": statistics.median(totals),
+            "modules": len(modules),
+            "heaviest": {name: us for us, name in heaviest},
+        }
+
+        print(
+            f"{statement}\n"
+            f"    {statistics.median(totals) / 1000:8.2f} ms, {len(modules)} modules"
+        )
+        for us, name in heaviest:
+            print(f"    {us / 1000:8.2f} ms  {name}")
+
+    if args.json:
+        with open(args.json, "w", encoding="utf-8") as f:
+            json.dump(results, f, indent=2)
+
+
+if __name__ == "__main__":
+    main(sys.argv[1:])
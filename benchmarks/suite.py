@@ -0,0 +1,350 @@
+"""
+Benchmark each stage of turning a format string into text, and the text function as a whole.
+
+Every benchmark is timed for a number of loops that takes at least `--min-time` seconds, and that is repeated
+`--repeat` times. The results are printed, and can be written to JSON, so that commits can be compared offline:
+
+    python benchmarks/suite.py run --output before.json
+    git checkout my-branch
+    python benchmarks/suite.py run --output after.json
+    python benchmarks/suite.py compare before.json after.json
+"""
+
+import argparse
+import datetime
+import fnmatch
+import json
+import platform
+import random
+import statistics
+import subprocess
+import sys
+import time
+from functools import partial
+from typing import Any, Callable, Dict, List, Tuple
+
+from excel_text import get_text_function, compile_format
+
+# noinspection PyProtectedMember
+from excel_text._grammar import FormatStringParser
+
+# noinspection PyProtectedMember
+from excel_text._preprocess import preprocess
+
+# noinspection PyProtectedMember
+from excel_text._scanner import FormatStringScanner
+
+# noinspection PyProtectedMember
+from excel_text._visitor import FormatStringVisitor
+
+Benchmark = Callable[[int], float]
+"""
+A function that runs a benchmark a given number of times, and returns how many seconds that took in total.
+"""
+
+FORMATS = {
+    "number": ("#,##0.00", 1234.5678),
+    "date": ("dddd d mmmm yyyy hh:mm:ss AM/PM", 44259.53),
+    "elapsed": ("[h]:mm:ss", 1.2345),
+    "conditional": ("[>=1000]#,##0;0.00", 1234.5),
+    "verbatim": ('"Amount due (incl. VAT): "$ ~ ^ & { } < > #,##0', 1234.5),
+}
+"""
+A format string and a value for each kind of format.
+"""
+
+MIXED_FORMATS = [
+    ("0", lambda rng: rng.randint(-1000, 1000)),
+    ("0.00", lambda rng: round(rng.uniform(-1000, 1000), 2)),
+    ("#,##0.00", lambda rng: round(rng.uniform(0, 10**7), 2)),
+    ("$#,##0.00", lambda rng: round(rng.uniform(0, 10**5), 2)),
+    ("0%", lambda rng: rng.random()),
+    ("0.00E+00", lambda rng: rng.randint(1, 10**9)),
+    ("yyyy/mm/dd", lambda rng: rng.uniform(36526, 47484)),
+    ("dd mmm yyyy", lambda rng: rng.uniform(36526, 47484)),
+    ("hh:mm:ss", lambda rng: rng.random()),
+    ("yyyy/mm/dd hh:mm AM/PM", lambda rng: rng.uniform(36526, 47484)),
+    ("[h]:mm", lambda rng: rng.uniform(0, 10)),
+    ("[>=1000]#,##0;0.00", lambda rng: rng.uniform(0, 2000)),
+    ("@", lambda rng: rng.choice(["abc", "Excel", ""])),
+]
+"""
+The format strings of a realistic workload, with a function that generates a random value for each. Amounts have no
+more decimals than they are formatted with.
+"""
+
+
+def mixed_workload(size: int) -> List[Tuple[Any, str]]:
+    rng = random.Random(9)
+    workload = []
+    for _ in range(size):
+        fmt, value = rng.choice(MIXED_FORMATS)
+        workload.append((value(rng), fmt))  # type: ignore
+    return workload
+
+
+def loop(function: Callable[[], Any]) -> Benchmark:
+    """
+    Benchmark a function without arguments.
+    """
+
+    def benchmark(loops: int) -> float:
+        start = time.perf_counter()
+        for _ in range(loops):
+            function()
+        return time.perf_counter() - start
+
+    return benchmark
+
+
+def grammar_build() -> Benchmark:
+    return loop(lambda: FormatStringParser(".", ",").grammar)
+
+
+def scanner_build() -> Benchmark:
+    return loop(lambda: FormatStringScanner(".", ",").expression_pattern)
+
+
+def parse(fmt: str) -> Benchmark:
+    parser = FormatStringParser(".", ",")
+    return loop(lambda: parser.parse(fmt))
+
+
+def visit(fmt: str) -> Benchmark:
+    tree = FormatStringParser(".", ",").parse(fmt)
+    visitor = FormatStringVisitor(".", ",")
+    return loop(lambda: visitor.visit(tree))
+
+
+def scan(fmt: str) -> Benchmark:
+    scanner = FormatStringScanner(".", ",")
+    return loop(lambda: scanner.tokenize(fmt))
+
+
+def preprocess_tokens(fmt: str) -> Benchmark:
+    tokens = FormatStringScanner(".", ",").tokenize(fmt)
+    return loop(lambda: preprocess(tokens))
+
+
+def render(fmt: str, value: Any, renderer: str) -> Benchmark:
+    compiled = compile_format(fmt, {"renderer": renderer})
+    return loop(lambda: compiled.render(value))
+
+
+def text_mixed(config: Dict[str, Any]) -> Benchmark:
+    """
+    Format the values of a mixed workload with a text function, one value per loop.
+    """
+    workload = mixed_workload(1000)
+    text = get_text_function(config)
+
+    def benchmark(loops: int) -> float:
+        pairs = (workload * (loops // len(workload) + 1))[:loops]
+        start = time.perf_counter()
+        for value, fmt in pairs:
+            text(value, fmt)
+        return time.perf_counter() - start
+
+    return benchmark
+
+
+def text_pairs_mixed() -> Benchmark:
+    """
+    Format the values of a mixed workload with `text_pairs`, one value per loop.
+    """
+    from excel_text import text_pairs
+
+    workload = mixed_workload(1000)
+
+    def benchmark(loops: int) -> float:
+        pairs = (workload * (loops // len(workload) + 1))[:loops]
+        start = time.perf_counter()
+        for _ in text_pairs(pairs):
+            pass
+        return time.perf_counter() - start
+
+    return benchmark
+
+
+def text_array_mixed() -> Benchmark:
+    """
+    Format each format's values of a mixed workload as one array, one workload per loop.
+    """
+    from excel_text import text_array
+
+    by_format: Dict[str, List[Any]] = {}
+    workload = mixed_workload(10000)
+    for value, fmt in workload:
+        by_format.setdefault(fmt, []).append(value)
+
+    def benchmark(loops: int) -> float:
+        start = time.perf_counter()
+        for _ in range(loops):
+            for fmt, values in by_format.items():
+                text_array(values, fmt)
+        return time.perf_counter() - start
+
+    return benchmark
+
+
+def get_benchmarks() -> Dict[str, Callable[[], Benchmark]]:
+    """
+    All benchmarks by name. They are only set up when they are run.
+    """
+    benchmarks: Dict[str, Callable[[], Benchmark]] = {
+        "grammar_build": grammar_build,
+        "scanner_build": scanner_build,
+    }
+    for kind, (fmt, value) in FORMATS.items():
+        benchmarks.update(
+            {
+                f"parse[{kind}]": partial(parse, fmt),
+                f"visit[{kind}]": partial(visit, fmt),
+                f"scan[{kind}]": partial(scan, fmt),
+                f"preprocess[{kind}]": partial(preprocess_tokens, fmt),
+                f"render[{kind}]": partial(render, fmt, value, "interpreter"),
+                f"render_codegen[{kind}]": partial(render, fmt, value, "codegen"),
+            }
+        )
+    benchmarks.update(
+        {
+            "text[mixed]": partial(text_mixed, {}),
+            "text[mixed,uncached]": partial(text_mixed, {"cache_size": 0}),
+            "text[mixed,scanner,uncached]": partial(
+                text_mixed, {"cache_size": 0, "parser": "scanner"}
+            ),
+            "text[mixed,codegen]": partial(text_mixed, {"renderer": "codegen"}),
+            "text_pairs[mixed]": text_pairs_mixed,
+            "text_array[mixed,10000]": text_array_mixed,
+        }
+    )
+    return benchmarks
+
+
+def run_benchmark(
+    benchmark: Benchmark,
+    min_time: float,
+    repeat: int,
+) -> Dict[str, Any]:
+    """
+    Find a number of loops that takes at least `min_time`, and time that `repeat` times.
+
+    :return: The number of loops, and the time of a single loop in each repetition.
+    """
+    loops = 1
+    while benchmark(loops) < min_time:
+        loops *= 2
+    times = [benchmark(loops) / loops for _ in range(repeat)]
+    return {
+        "loops": loops,
+        "times": times,
+        "median": statistics.median(times),
+        "min": min(times),
+    }
+
+
+def get_metadata() -> Dict[str, Any]:
+    try:
+        commit = subprocess.run(
+            ["git", "rev-parse", "HEAD"],
+            capture_output=True,
+            text=True,
+            check=True,
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        commit = None
+
+    return {
+        "commit": commit,
+        "date": datetime.datetime.now().isoformat(timespec="seconds"),
+        "python": sys.version,
+        "platform": platform.platform(),
+    }
+
+
+def format_time(seconds: float) -> str:
+    for unit, scale in [("s", 1), ("ms", 1e-3), ("us", 1e-6)]:
+        if seconds >= scale:
+            return f"{seconds / scale:7.2f} {unit}"
+    return f"{seconds / 1e-9:7.2f} ns"
+
+
+def run(args: argparse.Namespace) -> None:
+    results = {}
+    for name, setup in get_benchmarks().items():
+        if args.filter and not fnmatch.fnmatchcase(name, args.filter):
+            continue
+        try:
+            benchmark = setup()
+        except ImportError as e:
+            print(f"{name:40} skipped: {e}")
+            continue
+        result = run_benchmark(benchmark, args.min_time, args.repeat)
+        results[name] = result
+        spread = statistics.stdev(result["times"]) if len(result["times"]) > 1 else 0
+        print(
+            f"{name:40} {format_time(result['median'])} +- {format_time(spread).strip()}"
+        )
+
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            json.dump({"metadata": get_metadata(), "benchmarks": results}, f, indent=2)
+
+
+def compare(args: argparse.Namespace) -> None:
+    with open(args.base, encoding="utf-8") as f:
+        base = json.load(f)
+    with open(args.new, encoding="utf-8") as f:
+        new = json.load(f)
+
+    print(f"base: {base['metadata']['commit']}")
+    print(f"new:  {new['metadata']['commit']}")
+    for name, result in new["benchmarks"].items():
+        if name not in base["benchmarks"]:
+            print(f"{name:40} {format_time(result['median'])}  (new)")
+            continue
+        ratio = result["median"] / base["benchmarks"][name]["median"]
+        if ratio > 1 + args.threshold:
+            verdict = "slower"
+        elif ratio < 1 - args.threshold:
+            verdict = "faster"
+        else:
+            verdict = ""
+        print(
+            f"{name:40} {format_time(base['benchmarks'][name]['median'])}"
+            f" -> {format_time(result['median'])}  x{ratio:.2f} {verdict}"
+        )
+
+
+def main(argv: List[str]) -> None:
+    arg_parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    subparsers = arg_parser.add_subparsers(required=True)
+
+    run_parser = subparsers.add_parser("run", help="Run the benchmarks.")
+    run_parser.add_argument("--output", help="Write the results to this JSON file.")
+    run_parser.add_argument(
+        "--filter", help="Only run benchmarks whose name matches this glob pattern."
+    )
+    run_parser.add_argument("--min-time", type=float, default=0.1)
+    run_parser.add_argument("--repeat", type=int, default=5)
+    run_parser.set_defaults(command=run)
+
+    compare_parser = subparsers.add_parser(
+        "compare", help="Compare two JSON files with results."
+    )
+    compare_parser.add_argument("base")
+    compare_parser.add_argument("new")
+    compare_parser.add_argument(
+        "--threshold",
+        type=float,
+        default=0.1,
+        help="Relative change below which results are considered the same.",
+    )
+    compare_parser.set_defaults(command=compare)
+
+    args = arg_parser.parse_args(argv)
+    args.command(args)
+
+
+if __name__ == "__main__":
+    main(sys.argv[1:])
@@ -0,0 +1,93 @@
+"""
+Measure how formatting with `text_threaded` scales with the number of threads.
+
+On free-threaded builds of CPython (3.13t and later, with the GIL disabled), the threads render on multiple cores, and
+the speedup should grow with the number of threads. With the GIL, only one thread runs Python code at a time, so the
+benchmark still runs, but no speedup is expected beyond what NumPy gets from releasing the GIL.
+
+    python benchmarks/threads.py
+    python benchmarks/threads.py --threads 1 2 4 8 --json threads.json
+"""
+
+import argparse
+import json
+import os
+import random
+import sys
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Dict, List
+
+from excel_text import text_threaded
+
+# noinspection PyProtectedMember
+from excel_text._threads import gil_enabled
+
+WORKLOADS = {
+    "number": "#,##0.00",
+    "date": "dd/mm/yyyy hh:mm:ss AM/PM",
+    "conditional": "[>=1000]#,##0;0.00",
+}
+
+
+def best_time(values: List[Any], fmt: str, threads: int, repeat: int) -> float:
+    """
+    The fastest of a number of runs, in seconds. The threads are started once, and do an untimed run first, so that
+    compiling the format, imports and starting the threads are not measured.
+    """
+    chunksize = max(len(values) // (threads * 4), 1)
+    times = []
+    with ThreadPoolExecutor(threads) as executor:
+        text_threaded(values, fmt, chunksize=chunksize, executor=executor)
+        for _ in range(repeat):
+            start = time.perf_counter()
+            text_threaded(values, fmt, chunksize=chunksize, executor=executor)
+            times.append(time.perf_counter() - start)
+    return min(times)
+
+
+def main(argv: Any = None) -> None:
+    cpus = os.cpu_count() or 1
+    arg_parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    arg_parser.add_argument("--size", type=int, default=100000)
+    arg_parser.add_argument("--repeat", type=int, default=3)
+    arg_parser.add_argument(
+        "--threads",
+        type=int,
+        nargs="+",
+        default=sorted({1, 2, 4, cpus}),
+        help="The numbers of threads to measure.",
+    )
+    arg_parser.add_argument("--json", help="Write the results to this JSON file.")
+    args = arg_parser.parse_args(argv)
+
+    gil = gil_enabled()
+    print(
+        f"Python {sys.version.split()[0]}, {cpus} CPUs, GIL {'enabled' if gil else 'disabled'}"
+    )
+    if gil:
+        print("Threads can't run Python code in parallel, so no speedup is expected.")
+
+    rng = random.Random(9)
+    # The number and date formats are rendered with NumPy, and the conditional one runs Python code for each value.
+    values = [rng.uniform(0, 50000) for _ in range(args.size)]
+
+    results: Dict[str, Dict[str, float]] = {}
+    for name, fmt in WORKLOADS.items():
+        results[name] = {}
+        for threads in args.threads:
+            results[name][str(threads)] = best_time(values, fmt, threads, args.repeat)
+        single = results[name][str(args.threads[0])]
+        row = [
+            f"{threads}: {seconds * 1000:7.1f} ms x{single / seconds:.2f}"
+            for threads, seconds in results[name].items()
+        ]
+        print(f"{name:12} " + "   ".join(row))
+
+    if args.json:
+        with open(args.json, "w", encoding="utf-8") as f:
+            json.dump({"gil": gil, "cpus": cpus, "seconds": results}, f, indent=2)
+
+
+if __name__ == "__main__":
+    main()
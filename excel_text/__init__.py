@@ -1,6 +1,68 @@
 # Let all or most files start with _ to designate them as internal, and only import here the things which are
 #   used by other packages. This helps us to easily know what constitutes a breaking change, and what does not.
 
-from excel_text._factory import get_text_function
+# Everything is imported on first access, in `__getattr__`, so that `import excel_text` is cheap. Importing
+#   `typing` here would already undo part of that, but type checkers treat any `TYPE_CHECKING` like theirs.
+TYPE_CHECKING = False
+if TYPE_CHECKING:
+    from typing import Any, Callable, List, Union
 
-text = get_text_function({"decimal": ".", "thousands": ",", "raise": True})
+    from excel_text._array import text_array
+    from excel_text._arrow import text_arrow
+    from excel_text._batch import text_many, text_pairs
+    from excel_text._cache import FormatCache, CacheInfo
+    from excel_text._compiled import CompiledFormat
+    from excel_text._dataframes import text_series, text_expr, register_accessors
+    from excel_text._errors import ExcelError
+    from excel_text._factory import get_text_function, compile_format, warm_up
+    from excel_text._format_file import FormatFile, write_format_file
+    from excel_text._parallel import text_parallel
+    from excel_text._threads import text_threaded
+
+    text: Callable[[Any, str], Union[str, ExcelError]]
+
+# It isn't part of the API, so it's not left in the namespace.
+del TYPE_CHECKING
+
+_exports = {
+    "text_array": "excel_text._array",
+    "text_arrow": "excel_text._arrow",
+    "text_many": "excel_text._batch",
+    "text_pairs": "excel_text._batch",
+    "FormatCache": "excel_text._cache",
+    "CacheInfo": "excel_text._cache",
+    "CompiledFormat": "excel_text._compiled",
+    "text_series": "excel_text._dataframes",
+    "text_expr": "excel_text._dataframes",
+    "register_accessors": "excel_text._dataframes",
+    "get_text_function": "excel_text._factory",
+    "compile_format": "excel_text._factory",
+    "warm_up": "excel_text._factory",
+    "FormatFile": "excel_text._format_file",
+    "write_format_file": "excel_text._format_file",
+    "text_parallel": "excel_text._parallel",
+    "text_threaded": "excel_text._threads",
+}
+
+__all__ = [*_exports, "text"]
+
+
+def __getattr__(name: str) -> "Any":
+    from importlib import import_module
+
+    if name == "text":
+        value = import_module("excel_text._factory").get_text_function(
+            {"decimal": ".", "thousands": ",", "raise": True}
+        )
+    elif name in _exports:
+        value = getattr(import_module(_exports[name]), name)
+    else:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+
+    # Later accesses find it directly, without calling this function again.
+    globals()[name] = value
+    return value
+
+
+def __dir__() -> "List[str]":
+    return sorted({*globals(), *__all__})
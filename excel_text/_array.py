@@ -0,0 +1,482 @@
+"""
+Render whole arrays of values at once with NumPy.
+
+Tokens that can be rendered with array operations are, and everything else falls back to rendering one value at a time,
+so the results are always exactly the same as those of the scalar text function.
+"""
+
+import math
+from functools import reduce
+from typing import Any, Dict, List, Optional, Tuple, Union
+
+from excel_text._array_dates import (
+    SerialComponents,
+    datetime_serials,
+    render_date_token,
+)
+from excel_text._compiled import (
+    CompiledFormat,
+    conditional_token_types,
+    date_token_types,
+)
+from excel_text._errors import ExcelError
+from excel_text._factory import compile_format, get_full_config
+from excel_text._numbers import (
+    NumberLayout,
+    mantissa_layout,
+    min_power_of_ten,
+    powers_of_ten,
+    render_exponent,
+    scale_decimal,
+)
+from excel_text._tokens import (
+    BinaryConditionalToken,
+    TernaryConditionalToken,
+    FormatStringToken,
+    NumberToken,
+    VerbatimToken,
+    ElapsedHoursToken,
+    ElapsedMinutesToken,
+    ElapsedSecondsToken,
+)
+
+try:
+    import numpy as np
+
+    HAS_NUMPY = True
+except ImportError:  # pragma: no cover
+    HAS_NUMPY = False
+
+_ZERO = ord("0")
+
+_MAX_INTEGER = 10**18
+"""
+Larger numbers don't fit in an int64 after scaling, so they are rendered one at a time.
+"""
+
+_MAX_EXACT_FLOAT = 2.0**53
+"""
+Larger floats are not exact integers after scaling, so they are rendered one at a time.
+"""
+
+_MIN_NORMAL_FLOAT = 2.0**-1022
+"""
+Smaller floats have too few bits to scale them to their shortest decimal representation, so they are rendered one at a
+time in scientific notation.
+"""
+
+_LOG10_2 = math.log10(2)
+
+
+def require_numpy() -> None:
+    if not HAS_NUMPY:
+        raise ImportError(
+            "NumPy is required for array formatting. Install it with `pip install excel-text[numpy]`."
+        )
+
+
+def text_array(
+    values: Any,
+    fmt: str,
+    config: Optional[Dict[str, Any]] = None,
+) -> "np.ndarray[Any, Any]":
+    """
+    The same as the text function, but for a whole array of values at once.
+
+    >>> text_array([1234.5678, 0.5, 12], "$#,##0.00").tolist()
+    ['$1,234.57', '$0.50', '$12.00']
+
+    :param values: Array-like of values that will be formatted.
+    :param fmt: The format string that describes how the output should look.
+    :param config: Dictionary with config options, like for :func:`get_text_function`.
+    :return: A fixed-width unicode array with the same shape as `values`. If the `raise` option is off, and any of the
+        values result in an error, an object array containing the strings and errors is returned instead.
+    """
+    require_numpy()
+    full_config = get_full_config(config)
+    values = np.asarray(values)
+
+    try:
+        compiled = compile_format(fmt, full_config)
+    except ExcelError as e:
+        if full_config["raise"]:
+            raise e
+        return np.full(values.shape, e, dtype=object)
+
+    return render_array(compiled, values, raise_errors=full_config["raise"])
+
+
+def render_array(
+    compiled: CompiledFormat,
+    values: "np.ndarray[Any, Any]",
+    raise_errors: bool = True,
+) -> "np.ndarray[Any, Any]":
+    """
+    Render an array of values with a compiled format. See :func:`text_array`.
+    """
+    require_numpy()
+    flat = values.ravel()
+
+    if flat.dtype.kind == "M":
+        rendered = render_datetimes(compiled.tokens, flat)
+        # Like `tolist`, but with datetimes instead of integers for units smaller than microseconds.
+        flat = flat.astype("datetime64[us]") if flat.dtype != "datetime64[D]" else flat
+    else:
+        rendered = render_tokens(compiled.tokens, flat)
+
+    if rendered is None:
+        strings = np.zeros(len(flat), dtype="U1")
+        ok = np.zeros(len(flat), dtype=bool)
+    else:
+        strings, ok = rendered
+
+    # Render the values that could not be vectorized one at a time.
+    fallback_indices = np.flatnonzero(~ok)
+    fallback: List[Union[str, ExcelError]] = []
+    for value in flat[fallback_indices].tolist():
+        try:
+            fallback.append(compiled.render(value))
+        except ExcelError as e:
+            if raise_errors:
+                raise e
+            fallback.append(e)
+
+    if any(isinstance(s, ExcelError) for s in fallback):
+        result = strings.astype(object)
+    else:
+        width = max([strings.dtype.itemsize // 4, *(len(str(s)) for s in fallback)])
+        result = strings.astype(f"U{width}")
+
+    if fallback:
+        result[fallback_indices] = fallback
+
+    return result.reshape(values.shape)
+
+
+def render_tokens(
+    tokens: Tuple[FormatStringToken, ...],
+    values: "np.ndarray[Any, Any]",
+    hoist_minus: bool = True,
+) -> Optional[Tuple["np.ndarray[Any, Any]", "np.ndarray[Any, Any]"]]:
+    """
+    Render a token list for a flat array of values.
+
+    :param hoist_minus: See :attr:`CompiledFormat.hoist_minus`.
+    :return: The rendered strings, and a mask of the values for which they are valid. `None` if the token list can't be
+        vectorized at all.
+    """
+    if len(tokens) == 1 and isinstance(tokens[0], conditional_token_types):
+        return render_sections(tokens[0], values)
+
+    n = len(values)
+    ok = np.ones(n, dtype=bool)
+    minus_signs = np.zeros(n, dtype=np.int64)
+    parts: List[Any] = []
+    components = SerialComponents(values) if values.dtype.kind in "iuf" else None
+
+    for token in tokens:
+        if isinstance(token, VerbatimToken):
+            parts.append(token.text)
+        elif isinstance(token, date_token_types):
+            if components is None:
+                return None
+            rendered_date = render_date_token(token, values, components)
+            if rendered_date is None:
+                return None
+            parts.append(rendered_date[0])
+            ok &= rendered_date[1]
+        elif isinstance(token, NumberToken):
+            rendered = render_number(token, values)
+            if rendered is None:
+                return None
+            strings, negative, number_ok = rendered
+            if hoist_minus:
+                minus_signs += negative
+                # The scalar renderer also moves a minus sign that the format starts with, which is left to it.
+                number_ok = number_ok & ~np.char.startswith(strings, "-")
+            else:
+                strings = np.where(negative, np.char.add("-", strings), strings)
+            parts.append(strings)
+            ok &= number_ok
+        else:
+            return None
+
+    if not parts:
+        return np.zeros(n, dtype="U1"), ok
+
+    result = np.asarray(reduce(np.char.add, [np.full(n, "", dtype="U1"), *parts]))
+
+    # Like the scalar renderer, move the minus signs of numbers to the front. The results get longer, so they are a new
+    # array, instead of being assigned to the old one.
+    if minus_signs.any():
+        prefixes = np.array(["-" * count for count in range(minus_signs.max() + 1)])
+        result = np.char.add(prefixes[minus_signs], result)
+
+    return result, ok
+
+
+def render_sections(
+    token: Union[BinaryConditionalToken, TernaryConditionalToken],
+    values: "np.ndarray[Any, Any]",
+) -> Optional[Tuple["np.ndarray[Any, Any]", "np.ndarray[Any, Any]"]]:
+    """
+    Render a conditional token for a flat array of numbers. The values are partitioned by the section that applies to
+    them first, and then each section is rendered for its own values at once.
+
+    :return: Like :func:`render_tokens`. Sections that can't be vectorized are left to the scalar renderer.
+    """
+    if values.dtype.kind not in "iuf":
+        return None
+
+    selections: List[Tuple[Tuple[FormatStringToken, ...], "np.ndarray[Any, Any]"]]
+    if isinstance(token, BinaryConditionalToken):
+        if token.condition.threshold is None:
+            return None
+        # Like `Condition.eval`, which compares the values as floats.
+        true: Any = token.condition.compare(
+            values.astype(np.float64), token.condition.threshold
+        )
+        selections = [(token.true_tokens, true), (token.false_tokens, ~true)]
+    else:
+        gt = values > 0
+        lt = values < 0
+        selections = [
+            (token.gt_tokens, gt),
+            (token.lt_tokens, lt),
+            (token.eq_tokens, ~(gt | lt)),
+        ]
+
+    strings = np.zeros(len(values), dtype="U1")
+    ok = np.zeros(len(values), dtype=bool)
+    for section, selected in selections:
+        indices = np.flatnonzero(selected)
+        if not len(indices):
+            continue
+        # Like the scalar renderer, the minus signs are not moved within sections.
+        rendered = render_tokens(section, values[indices], hoist_minus=False)
+        if rendered is None:
+            continue
+        section_strings, section_ok = rendered
+        if section_strings.dtype.itemsize > strings.dtype.itemsize:
+            strings = strings.astype(section_strings.dtype)
+        strings[indices] = section_strings
+        ok[indices] = section_ok
+
+    return strings, ok
+
+
+def render_datetimes(
+    tokens: Tuple[FormatStringToken, ...],
+    values: "np.ndarray[Any, Any]",
+) -> Optional[Tuple["np.ndarray[Any, Any]", "np.ndarray[Any, Any]"]]:
+    """
+    Render a token list for a flat array of NumPy datetimes, through their serial numbers where that gives exactly the
+    same results.
+
+    Only date, time and verbatim tokens are rendered like that. Elapsed times are computed differently for datetimes,
+    and other tokens don't accept them at all.
+    """
+    if not all(
+        isinstance(token, (VerbatimToken, *date_token_types))
+        and not isinstance(
+            token, (ElapsedHoursToken, ElapsedMinutesToken, ElapsedSecondsToken)
+        )
+        for token in tokens
+    ):
+        return None
+
+    serials, exact = datetime_serials(values)
+    rendered = render_tokens(tokens, serials)
+    if rendered is None:
+        return None
+    return rendered[0], rendered[1] & exact
+
+
+def render_number(
+    token: NumberToken,
+    values: "np.ndarray[Any, Any]",
+) -> Optional[
+    Tuple["np.ndarray[Any, Any]", "np.ndarray[Any, Any]", "np.ndarray[Any, Any]"]
+]:
+    """
+    Vectorized version of :meth:`NumberToken.render`.
+
+    :return: The rendered strings without their leading minus signs, a mask of which strings had a leading minus sign,
+        and a mask of the values for which the strings are valid. `None` if the token can't be vectorized at all.
+    """
+    layout = token._layout
+    if len(token.decimal_char) != 1 or len(token.thousands_char) != 1:
+        return None
+    n_decimals = layout.n_decimals
+    if 10**n_decimals > _MAX_INTEGER:
+        # The decimals don't fit in an int64.
+        return None
+
+    n = len(values)
+    exponents = None
+    if layout.exponent:
+        scaled, exponents, ok = scale_mantissas(values, layout)
+    else:
+        scaled, ok = scale_decimals(
+            values, n_decimals + 2 if layout.percent else n_decimals
+        )
+    if scaled is None:
+        return None
+    integers, fractions = np.divmod(scaled, 10**n_decimals)
+    negative = (values < 0) & (scaled != 0)
+
+    # The codes of each item after the decimal point are the same for all values, regardless of their integer part.
+    mantissa_columns: List[Any] = []
+    if not layout.integer:
+        mantissa_columns.append(token.decimal_char)
+        for item in mantissa_layout(token._mantissa or ""):
+            if isinstance(item, str):
+                mantissa_columns.append(item)
+            else:
+                power = 10 ** (n_decimals - 1 - item)
+                mantissa_columns.append(_ZERO + fractions // power % 10)
+
+    n_digits = np.ones(n, dtype=np.int64)
+    for power in range(1, 19):
+        n_digits += integers >= 10**power
+
+    strings = np.zeros(n, dtype="U1")
+    for group in np.unique(n_digits).tolist():
+        indices = np.flatnonzero(n_digits == group)
+        characteristic_items: Tuple[Any, ...] = layout.characteristic.layout(group)
+
+        width = max(len(characteristic_items) + len(mantissa_columns), 1)
+        codes = np.zeros((len(indices), width), dtype=np.uint32)
+        for column, item in enumerate(characteristic_items):
+            if isinstance(item, str):
+                codes[:, column] = ord(item)
+            else:
+                codes[:, column] = _ZERO + integers[indices] // 10**item % 10
+        for column, mantissa_column in enumerate(
+            mantissa_columns, start=len(characteristic_items)
+        ):
+            if isinstance(mantissa_column, str):
+                codes[:, column] = ord(mantissa_column)
+            else:
+                codes[:, column] = mantissa_column[indices]
+
+        group_strings = codes.view(f"U{codes.shape[1]}").ravel()
+        if group_strings.dtype.itemsize > strings.dtype.itemsize:
+            strings = strings.astype(group_strings.dtype)
+        strings[indices] = group_strings
+
+    if exponents is not None:
+        # There are only a few different exponents, so each is rendered once.
+        unique, inverse = np.unique(exponents, return_inverse=True)
+        suffixes = np.array([render_exponent(layout, e) for e in unique.tolist()])
+        strings = np.char.add(strings, suffixes[inverse.ravel()])
+
+    return strings, negative, ok
+
+
+def scale_decimals(
+    values: "np.ndarray[Any, Any]",
+    decimals: int,
+) -> Tuple[Optional["np.ndarray[Any, Any]"], "np.ndarray[Any, Any]"]:
+    """
+    Vectorized version of :func:`excel_text._numbers.scale_decimal`.
+
+    Floats are scaled in floating point, which is off from their shortest decimal representation by a few units in the
+    last place at most. That only matters when the result is within that distance of a half, and those values are
+    scaled one at a time instead.
+
+    :return: The scaled values as integers, and a mask of the values that fit. `None` if the dtype is not numeric.
+    """
+    n = len(values)
+    if values.dtype.kind in "iu":
+        if not -18 <= decimals < 18:
+            # Any value other than zero is too large, or rounds to zero or one, which is rare enough to not vectorize.
+            return np.zeros(n, dtype=np.int64), np.zeros(n, dtype=bool)
+        bound = _MAX_INTEGER // 10 ** max(decimals, 0)
+        ok = (values < bound) & (values > -bound)
+        magnitudes = np.abs(np.where(ok, values, 0).astype(np.int64))
+        if decimals >= 0:
+            return magnitudes * 10**decimals, ok
+        # Rounded half away from zero, with integer division.
+        unit = 10**-decimals
+        return (magnitudes + unit // 2) // unit, ok
+
+    if values.dtype.kind != "f":
+        return None, np.zeros(n, dtype=bool)
+
+    x = np.abs(values.astype(np.float64))
+    # Values that overflow, and NaN, are left to the scalar renderer by `ok`, so they needn't warn.
+    with np.errstate(over="ignore", invalid="ignore"):
+        # Only powers of ten up to 1e22 are exact floats, so larger ones take two roundings instead of one.
+        if decimals > 22:
+            x = x * 1e22 * 10.0 ** (decimals - 22)
+        elif decimals >= 0:
+            x = x * 10.0**decimals
+        else:
+            x = x / 10.0**-decimals
+    ok = np.isfinite(x) & (x < _MAX_EXACT_FLOAT)
+    x = np.where(ok, x, 0.0)
+    whole = np.floor(x)
+    fraction = x - whole
+    scaled = whole.astype(np.int64) + (fraction >= 0.5)
+
+    too_close = np.flatnonzero(np.abs(fraction - 0.5) <= x * 2.0**-50)
+    for i, value in zip(too_close.tolist(), values[too_close].tolist()):
+        scaled[i] = scale_decimal(value, decimals)
+    return scaled, ok
+
+
+def scale_mantissas(
+    values: "np.ndarray[Any, Any]",
+    layout: NumberLayout,
+) -> Tuple[
+    Optional["np.ndarray[Any, Any]"], "np.ndarray[Any, Any]", "np.ndarray[Any, Any]"
+]:
+    """
+    Vectorized version of :func:`excel_text._numbers.scale_scientific`.
+
+    The exponents are estimated from the binary exponents of all values at once. Then the values are scaled with
+    :func:`scale_decimals`, once for each different exponent, and those that have too many digits are scaled again
+    with a larger exponent.
+
+    :return: The scaled mantissas as integers, the exponents, and a mask of the values that fit. `None` if the dtype is
+        not numeric.
+    """
+    n = len(values)
+    exponents = np.zeros(n, dtype=np.int64)
+    # The mantissas that are too large can be larger than an int64.
+    if values.dtype.kind not in "iuf" or layout.scientific_limit > _MAX_INTEGER:
+        return None, exponents, np.zeros(n, dtype=bool)
+
+    magnitudes = np.abs(values.astype(np.float64))
+    zero = magnitudes == 0
+    ok = np.isfinite(magnitudes) & ((magnitudes >= _MIN_NORMAL_FLOAT) | zero)
+
+    magnitudes = np.where(ok & ~zero, magnitudes, 1.0)
+    binary_exponents = np.frexp(magnitudes)[1]
+    powers = np.floor((binary_exponents - 1) * _LOG10_2).astype(np.int64)
+    # Like the scalar version, which compares the value to the next power of ten.
+    next_powers = np.minimum(powers + 1, 308) - min_power_of_ten
+    powers += magnitudes > np.array(powers_of_ten)[next_powers]
+    shift = layout.n_decimals
+    if layout.percent:
+        powers += 2
+        shift += 2
+    step = layout.exponent_step
+    exponents = np.where(zero, 0, powers // step * step - layout.exponent_offset)
+
+    scaled = np.zeros(n, dtype=np.int64)
+    pending = np.flatnonzero(ok)
+    while len(pending):
+        pending_exponents = exponents[pending]
+        for exponent in np.unique(pending_exponents).tolist():
+            indices = pending[pending_exponents == exponent]
+            group: Any
+            group, group_ok = scale_decimals(values[indices], shift - exponent)
+            scaled[indices] = group
+            ok[indices] &= group_ok
+        # Rounding carried into another digit, or the exponent was estimated one too small.
+        pending = pending[ok[pending] & (scaled[pending] >= layout.scientific_limit)]
+        exponents[pending] += step
+
+    return scaled, exponents, ok
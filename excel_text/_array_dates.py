@@ -0,0 +1,379 @@
+"""
+Render date, time and elapsed time tokens for whole arrays of Excel serial numbers at once with NumPy.
+
+See :mod:`excel_text._array`.
+"""
+
+import datetime
+from functools import cached_property
+from typing import Any, List, Optional, Tuple
+
+from excel_text._tokens import (
+    FormatStringToken,
+    YearToken,
+    MonthToken,
+    DayToken,
+    HourToken,
+    MinuteToken,
+    SecondToken,
+    AmPmToken,
+    ElapsedHoursToken,
+    ElapsedMinutesToken,
+    ElapsedSecondsToken,
+)
+
+try:
+    import numpy as np
+except ImportError:  # pragma: no cover
+    pass
+
+_ZERO = ord("0")
+
+_US_PER_DAY = 86400 * 1000000
+
+_MAX_SERIAL = 2958465
+"""
+The serial number of 9999/12/31. Python's `datetime` can't represent anything after that day, so it's left to the
+scalar renderers to raise the appropriate errors.
+"""
+
+_MAX_FRACTION_DIGITS = 9
+"""
+Seconds with more decimals expose floating point noise, so they are rendered one at a time.
+"""
+
+
+def timedelta_microseconds(days: "np.ndarray[Any, Any]") -> "np.ndarray[Any, Any]":
+    """
+    The number of microseconds in `datetime.timedelta(days=d)` for each of the given non-negative days, rounded exactly
+    like CPython does it.
+    """
+    fraction, whole = np.modf(days)
+    fraction_us, whole_us = np.modf(fraction * _US_PER_DAY)
+    total = whole.astype(np.int64) * _US_PER_DAY + whole_us.astype(np.int64)
+
+    # The leftover is rounded half to even, taking the parity of the total into account.
+    half = fraction_us == 0.5
+    rounded = np.where(half, total % 2, np.rint(fraction_us))
+    result: "np.ndarray[Any, Any]" = total + rounded.astype(np.int64)
+    return result
+
+
+class SerialComponents:
+    """
+    The date and time components of an array of Excel serial numbers, computed at most once for all tokens.
+
+    The components are the same as those of `ensure_python_date` and `ensure_python_time` from `excel_dates`, including
+    the 1900 leap year bug. Each comes with a mask of the values for which they are valid.
+    """
+
+    def __init__(self, values: "np.ndarray[Any, Any]") -> None:
+        self.serials = values.astype(np.float64)
+        self.in_range = (self.serials >= 0) & (self.serials < _MAX_SERIAL)
+        self.serials = np.where(self.in_range, self.serials, 0.0)
+
+    @cached_property
+    def dates(self) -> "np.ndarray[Any, Any]":
+        # Compensate for 1900/02/29, which Excel thinks exists, but Python does not.
+        compensation = np.where(self.serials < 60, 1.0, 0.0)
+        days = timedelta_microseconds(self.serials + compensation) // _US_PER_DAY
+        result: "np.ndarray[Any, Any]" = np.datetime64("1899-12-30", "D") + days
+        return result
+
+    @cached_property
+    def date_ok(self) -> "np.ndarray[Any, Any]":
+        # The phantom 1900/02/29 can't be represented in Python, so it raises an error.
+        result: "np.ndarray[Any, Any]" = self.in_range & ~(
+            (self.serials >= 60) & (self.serials < 61)
+        )
+        return result
+
+    @cached_property
+    def year(self) -> "np.ndarray[Any, Any]":
+        result: "np.ndarray[Any, Any]" = (
+            self.dates.astype("datetime64[Y]").astype(np.int64) + 1970
+        )
+        return result
+
+    @cached_property
+    def month(self) -> "np.ndarray[Any, Any]":
+        result: "np.ndarray[Any, Any]" = (
+            self.dates.astype("datetime64[M]").astype(np.int64) % 12 + 1
+        )
+        return result
+
+    @cached_property
+    def day(self) -> "np.ndarray[Any, Any]":
+        result: "np.ndarray[Any, Any]" = (
+            self.dates - self.dates.astype("datetime64[M]")
+        ).astype(np.int64) + 1
+        return result
+
+    @cached_property
+    def weekday(self) -> "np.ndarray[Any, Any]":
+        # 1970/01/01 was a Thursday, and Monday is 0.
+        result: "np.ndarray[Any, Any]" = (self.dates.astype(np.int64) + 3) % 7
+        return result
+
+    @cached_property
+    def time_us(self) -> "np.ndarray[Any, Any]":
+        result: "np.ndarray[Any, Any]" = (
+            timedelta_microseconds(self.serials) % _US_PER_DAY
+        )
+        return result
+
+    @cached_property
+    def hour(self) -> "np.ndarray[Any, Any]":
+        result: "np.ndarray[Any, Any]" = self.time_us // (3600 * 1000000)
+        return result
+
+    @cached_property
+    def minute(self) -> "np.ndarray[Any, Any]":
+        result: "np.ndarray[Any, Any]" = self.time_us // (60 * 1000000) % 60
+        return result
+
+    @cached_property
+    def second_us(self) -> "np.ndarray[Any, Any]":
+        """
+        The seconds and microseconds, in microseconds.
+        """
+        result: "np.ndarray[Any, Any]" = self.time_us % (60 * 1000000)
+        return result
+
+
+def datetime_serials(
+    values: "np.ndarray[Any, Any]",
+) -> Tuple["np.ndarray[Any, Any]", "np.ndarray[Any, Any]"]:
+    """
+    The Excel serial numbers of an array of NumPy datetimes.
+
+    :return: The serial numbers, and a mask of the values for which their :class:`SerialComponents` are exactly those
+        of the datetimes themselves. Serial numbers only have a precision of about a microsecond, and dates before
+        1900/03/01 are shifted by the 1900 leap year bug.
+    """
+    microseconds = values.astype("datetime64[us]")
+    since_epoch = (microseconds - np.datetime64("1899-12-30", "us")).astype(np.int64)
+    serials = since_epoch / _US_PER_DAY
+
+    components = SerialComponents(serials)
+    exact = (
+        (microseconds == values)
+        & (microseconds >= np.datetime64("1900-03-01", "us"))
+        & components.in_range
+        & (components.dates == microseconds.astype("datetime64[D]"))
+        & (components.time_us == since_epoch % _US_PER_DAY)
+    )
+    return serials, exact
+
+
+def render_date_token(
+    token: FormatStringToken,
+    values: "np.ndarray[Any, Any]",
+    components: SerialComponents,
+) -> Optional[Tuple["np.ndarray[Any, Any]", "np.ndarray[Any, Any]"]]:
+    """
+    Vectorized version of the `render` methods of the date, time and elapsed time tokens.
+
+    :return: The rendered strings, and a mask of the values for which they are valid. `None` if the token can't be
+        vectorized at all.
+    """
+    n = len(token.text)
+
+    if isinstance(token, YearToken):
+        if n > 2:
+            return integer_strings(components.year), components.date_ok
+        return integer_strings(components.year % 100, 2), components.date_ok
+
+    if isinstance(token, MonthToken):
+        month = components.month - 1
+        if n >= 6 or n == 4:
+            names = name_table("%B", [datetime.date(2000, m, 1) for m in range(1, 13)])
+            return names[month], components.date_ok
+        if n == 5:
+            names = name_table("%b", [datetime.date(2000, m, 1) for m in range(1, 13)])
+            return names.astype("U1")[month], components.date_ok
+        if n == 3:
+            names = name_table("%b", [datetime.date(2000, m, 1) for m in range(1, 13)])
+            return names[month], components.date_ok
+        if n == 2:
+            return integer_strings(components.month, 2), components.date_ok
+        if n == 1:
+            return integer_strings(components.month), components.date_ok
+        return None
+
+    if isinstance(token, DayToken):
+        if n > 3:
+            # 2000/01/03 was a Monday.
+            names = name_table("%A", [datetime.date(2000, 1, d) for d in range(3, 10)])
+            return names[components.weekday], components.date_ok
+        if n > 2:
+            names = name_table("%a", [datetime.date(2000, 1, d) for d in range(3, 10)])
+            return names[components.weekday], components.date_ok
+        if n > 1:
+            return integer_strings(components.day, 2), components.date_ok
+        return integer_strings(components.day), components.date_ok
+
+    if isinstance(token, HourToken):
+        if token.twelve:
+            if n >= 2:
+                return (
+                    integer_strings((components.hour + 11) % 12 + 1, 2),
+                    components.in_range,
+                )
+            if n == 1:
+                return (
+                    integer_strings((components.hour + 11) % 12 + 1),
+                    components.in_range,
+                )
+        else:
+            if n >= 2:
+                return integer_strings(components.hour, 2), components.in_range
+            if n == 1:
+                return integer_strings(components.hour), components.in_range
+        return None
+
+    if isinstance(token, MinuteToken):
+        if n == 2:
+            return integer_strings(components.minute, 2), components.in_range
+        if n == 1:
+            return integer_strings(components.minute), components.in_range
+        return None
+
+    if isinstance(token, SecondToken):
+        return render_seconds(token, components)
+
+    if isinstance(token, AmPmToken):
+        return render_am_pm(token, components)
+
+    if isinstance(token, (ElapsedHoursToken, ElapsedMinutesToken, ElapsedSecondsToken)):
+        return render_elapsed(token, values)
+
+    return None
+
+
+def render_seconds(
+    token: SecondToken,
+    components: SerialComponents,
+) -> Optional[Tuple["np.ndarray[Any, Any]", "np.ndarray[Any, Any]"]]:
+    """
+    Vectorized version of :meth:`SecondToken.render`.
+
+    The scalar version formats a float with a fixed number of decimals. Here, the seconds are rounded as integer
+    microseconds instead, which gives the same result except when they are exactly halfway, because then it depends on
+    the float's representation error. Those values are left to the scalar renderer.
+    """
+    parts = token.text.split(token.decimal_char)
+    n_int = len(parts[0])
+    n_frac = len(parts[1]) if len(parts) > 1 else 0
+    if n_frac > _MAX_FRACTION_DIGITS:
+        return None
+
+    ok = components.in_range
+    if n_frac < 6:
+        divisor = 10 ** (6 - n_frac)
+        quotient, remainder = np.divmod(components.second_us, divisor)
+        ok = ok & (remainder * 2 != divisor)
+        rounded = quotient + (remainder * 2 > divisor)
+    else:
+        rounded = components.second_us * 10 ** (n_frac - 6)
+
+    scale = 10**n_frac
+    strings = integer_strings(rounded // scale, n_int)
+    if n_frac:
+        strings = np.char.add(
+            np.char.add(strings, "."), integer_strings(rounded % scale, n_frac)
+        )
+    return np.asarray(strings), ok
+
+
+def render_am_pm(
+    token: AmPmToken,
+    components: SerialComponents,
+) -> Optional[Tuple["np.ndarray[Any, Any]", "np.ndarray[Any, Any]"]]:
+    """
+    Vectorized version of :meth:`AmPmToken.render`.
+    """
+    am, pm = [datetime.time(h).strftime("%p") for h in (0, 12)]
+    if not am or not pm:
+        return None
+
+    if token.text == "am/pm":
+        choices = am.lower(), pm.lower()
+    elif token.text == "AM/PM":
+        choices = am.upper(), pm.upper()
+    elif token.text == "a/p":
+        choices = am[0].lower(), pm[0].lower()
+    elif token.text == "A/P":
+        choices = am[0].upper(), pm[0].upper()
+    elif token.text == "A/p":
+        choices = "A" if am.lower() == "am" else "p", "A" if pm.lower() == "am" else "p"
+    elif token.text == "a/P":
+        choices = "a" if am.lower() == "am" else "P", "a" if pm.lower() == "am" else "P"
+    else:
+        return None
+
+    return (
+        np.array(choices)[(components.hour >= 12).astype(np.int64)],
+        components.in_range,
+    )
+
+
+def render_elapsed(
+    token: FormatStringToken,
+    values: "np.ndarray[Any, Any]",
+) -> Tuple["np.ndarray[Any, Any]", "np.ndarray[Any, Any]"]:
+    """
+    Vectorized version of the `render` methods of the elapsed time tokens, with the same floating point operations.
+    """
+    # Values that overflow are left to the scalar renderer by `ok`, so they needn't warn.
+    with np.errstate(over="ignore", invalid="ignore"):
+        seconds = values.astype(np.float64) * 86400
+    if isinstance(token, ElapsedHoursToken):
+        elapsed = seconds / 3600
+    elif isinstance(token, ElapsedMinutesToken):
+        elapsed = seconds / 60
+    else:
+        elapsed = seconds
+
+    ok = np.isfinite(elapsed) & (np.abs(elapsed) < 10**18)
+    integers = np.trunc(np.where(ok, elapsed, 0.0)).astype(np.int64)
+    return integer_strings(integers), ok
+
+
+def name_table(directive: str, dates: List[datetime.date]) -> "np.ndarray[Any, Any]":
+    """
+    Look up names with `strftime`, so that they match the scalar renderers in the current locale.
+    """
+    return np.array([d.strftime(directive) for d in dates])
+
+
+def integer_strings(
+    integers: "np.ndarray[Any, Any]",
+    min_width: int = 1,
+) -> "np.ndarray[Any, Any]":
+    """
+    Vectorized version of `f"{i:0{min_width}d}"`.
+
+    >>> integer_strings(np.array([0, 7, 12, -345]), 2).tolist()
+    ['00', '07', '12', '-345']
+    """
+    magnitudes = np.abs(integers)
+    widths = np.full(len(integers), min_width, dtype=np.int64)
+    for power in range(min_width, 19):
+        widths += magnitudes >= 10**power
+
+    result = np.zeros(len(integers), dtype=f"U{max(widths.max(initial=1), 1)}")
+    for width in np.unique(widths).tolist():
+        indices = np.flatnonzero(widths == width)
+        codes = np.empty((len(indices), width), dtype=np.uint32)
+        for column in range(width):
+            codes[:, column] = (
+                _ZERO + magnitudes[indices] // 10 ** (width - 1 - column) % 10
+            )
+        result[indices] = codes.view(f"U{width}").ravel()
+
+    negative = integers < 0
+    if negative.any():
+        result = result.astype(f"U{result.dtype.itemsize // 4 + 1}")
+        result[negative] = np.char.add("-", result[negative])
+    return result
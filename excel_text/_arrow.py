@@ -0,0 +1,208 @@
+"""
+Format Apache Arrow arrays into Arrow string arrays, without creating a Python object per value.
+
+The values are read from the buffers of the input array, rendered with :func:`excel_text._array.render_array`, and the
+resulting unicode array is encoded to UTF-8 straight into the offset and data buffers of the output array.
+"""
+
+from typing import Any, Dict, Optional, Tuple
+
+from excel_text._array import render_array, require_numpy
+from excel_text._compiled import CompiledFormat
+from excel_text._errors import ExcelError
+from excel_text._factory import compile_format, get_full_config
+
+try:
+    import numpy as np
+except ImportError:  # pragma: no cover
+    pass
+
+_MAX_STRING_DATA = 2**31 - 1
+"""
+Larger data doesn't fit the 32-bit offsets of `pa.string()`, so `pa.large_string()` is used instead.
+"""
+
+
+def text_arrow(
+    array: Any,
+    fmt: str,
+    config: Optional[Dict[str, Any]] = None,
+) -> Any:
+    """
+    The same as calling the text function for each value of a `pyarrow` array, but the results are written straight
+    into a string array.
+
+    Integer, floating point, date and timestamp arrays without a time zone are formatted as NumPy arrays. Other arrays
+    are formatted one value at a time. Nulls stay null. Arrow arrays can't hold errors, so if the `raise` option is off,
+    those become nulls too.
+
+    >>> import pyarrow as pa
+    >>> text_arrow(pa.array([1234.5678, None, 0.5]), "$#,##0.00").to_pylist()
+    ['$1,234.57', None, '$0.50']
+
+    :param array: A `pyarrow.Array` or `pyarrow.ChunkedArray`.
+    :param fmt: The format string that describes how the output should look.
+    :param config: Dictionary with config options, like for :func:`get_text_function`.
+    :return: A `pyarrow.StringArray`, or a `pyarrow.ChunkedArray` of them. If the strings take up more than 2 GiB, the
+        array is a `pyarrow.LargeStringArray` instead, and so are all chunks if one of them is.
+    """
+    import pyarrow as pa
+
+    require_numpy()
+    full_config = get_full_config(config)
+    try:
+        compiled: Optional[CompiledFormat] = compile_format(fmt, full_config)
+    except ExcelError as e:
+        if full_config["raise"]:
+            raise e
+        compiled = None
+
+    if isinstance(array, pa.ChunkedArray):
+        chunks = [
+            render_arrow(compiled, chunk, full_config["raise"])
+            for chunk in array.chunks
+        ]
+        # The chunks must all have the same type, and each one is only large if its own strings need it.
+        string_type: Any = pa.string()
+        if any(chunk.type == pa.large_string() for chunk in chunks):
+            string_type = pa.large_string()
+            chunks = [chunk.cast(string_type) for chunk in chunks]
+        return pa.chunked_array(chunks, type=string_type)
+    return render_arrow(compiled, array, full_config["raise"])
+
+
+def render_arrow(
+    compiled: Optional[CompiledFormat],
+    array: Any,
+    raise_errors: bool,
+) -> Any:
+    """
+    Render an Arrow array with a compiled format, or with nothing but nulls if there is none.
+    """
+    import pyarrow as pa
+
+    n = len(array)
+    if compiled is None:
+        return pa.nulls(n, type=pa.string())
+
+    valid = np.ones(n, dtype=bool)
+    if array.null_count:
+        valid = ~array.is_null().to_numpy(zero_copy_only=False)
+    # Without nulls, a slice lets the values below be a view instead of a copy.
+    present: Any = np.flatnonzero(valid) if array.null_count else slice(None)
+
+    values = primitive_values(array)
+    if values is None:
+        values = np.empty(n, dtype=object)
+        values[:] = array.to_pylist()
+    strings = render_array(compiled, values[present], raise_errors)
+
+    if strings.dtype == object:
+        # Only errors, which are not raised, can make it an object array.
+        errors = np.array([isinstance(s, ExcelError) for s in strings], dtype=bool)
+        strings[errors] = ""
+        strings = strings.astype(str)
+        valid[np.arange(n)[present][errors]] = False
+
+    lengths, data = encode_utf8(strings)
+    all_lengths = np.zeros(n, dtype=np.int64)
+    all_lengths[present] = lengths
+    offsets = np.zeros(n + 1, dtype=np.int64)
+    np.cumsum(all_lengths, out=offsets[1:])
+
+    string_type: Any
+    if len(data) > _MAX_STRING_DATA:
+        string_type = pa.large_string()
+    else:
+        string_type = pa.string()
+        offsets = offsets.astype(np.int32)
+
+    null_count = n - int(np.count_nonzero(valid))
+    validity = (
+        pa.py_buffer(np.packbits(valid, bitorder="little").data) if null_count else None
+    )
+    return pa.Array.from_buffers(
+        string_type,
+        n,
+        [validity, pa.py_buffer(offsets.data), pa.py_buffer(data.data)],
+        null_count=null_count,
+    )
+
+
+def primitive_values(array: Any) -> Optional["np.ndarray[Any, Any]"]:
+    """
+    The values of an Arrow array of numbers, dates or timestamps without a time zone, as a NumPy array that shares the
+    memory of the Arrow array where possible. The values of the null slots are undefined.
+
+    :return: `None` for other types of arrays.
+    """
+    import pyarrow as pa
+
+    array_type = array.type
+    if pa.types.is_integer(array_type) or pa.types.is_floating(array_type):
+        storage, unit = np.dtype(array_type.to_pandas_dtype()), None
+    elif pa.types.is_date32(array_type):
+        storage, unit = np.dtype(np.int32), "D"
+    elif pa.types.is_date64(array_type):
+        storage, unit = np.dtype(np.int64), "ms"
+    elif pa.types.is_timestamp(array_type) and array_type.tz is None:
+        storage, unit = np.dtype(np.int64), array_type.unit
+    else:
+        return None
+
+    values: "np.ndarray[Any, Any]" = np.frombuffer(
+        array.buffers()[1], dtype=storage, count=array.offset + len(array)
+    )[array.offset :]
+    if unit is not None:
+        values = values.astype(np.int64, copy=False).view(f"datetime64[{unit}]")
+    if pa.types.is_date64(array_type):
+        # These are dates, that happen to be stored in milliseconds.
+        values = values.astype("datetime64[D]")
+    return values
+
+
+def encode_utf8(
+    strings: "np.ndarray[Any, Any]",
+) -> Tuple["np.ndarray[Any, Any]", "np.ndarray[Any, Any]"]:
+    """
+    Encode a unicode array to UTF-8 with array operations.
+
+    >>> encode_utf8(np.array(["ab", "", "€1"]))
+    (array([2, 0, 4]), array([ 97,  98, 226, 130, 172,  49], dtype=uint8))
+
+    :return: The number of bytes of each string, and the bytes of all strings, concatenated.
+    :raise UnicodeEncodeError: If a string has a lone surrogate, like :meth:`str.encode`.
+    """
+    codes = strings.view(np.uint32).reshape(len(strings), strings.dtype.itemsize // 4)
+    # NumPy pads strings with zeros after their last character, but zeros before it are part of them.
+    in_string = np.arange(codes.shape[1]) < np.char.str_len(strings)[:, np.newaxis]
+    n_bytes = (
+        in_string.astype(np.uint8)
+        + (codes >= 0x80)
+        + (codes >= 0x800)
+        + (codes >= 0x10000)
+    )
+    lengths = n_bytes.sum(axis=1, dtype=np.int64)
+
+    chars = codes[in_string]
+    char_bytes = n_bytes[in_string]
+    if not len(chars) or char_bytes.max() == 1:
+        return lengths, chars.astype(np.uint8)
+    if np.any(chars & 0xFFFFF800 == 0xD800):
+        # A lone surrogate. This fails with the same error as encoding the string on its own.
+        strings[np.any(codes & 0xFFFFF800 == 0xD800, axis=1)][0].encode("utf-8")
+
+    data = np.empty(int(lengths.sum()), dtype=np.uint8)
+    starts = np.cumsum(char_bytes) - char_bytes
+    for n in range(1, 5):
+        mask = char_bytes == n
+        c = chars[mask]
+        s = starts[mask]
+        if n == 1:
+            data[s] = c
+            continue
+        # The lead byte has n leading ones, and each continuation byte holds 6 bits.
+        data[s] = (0xFF00 >> n) & 0xFF | c >> (6 * (n - 1))
+        for i in range(1, n):
+            data[s + i] = 0x80 | (c >> (6 * (n - 1 - i))) & 0x3F
+    return lengths, data
@@ -0,0 +1,183 @@
+"""
+Format many values at once, without paying for a text function call per value.
+"""
+
+from itertools import islice
+from typing import Any, Dict, Iterable, Iterator, List, Optional, Tuple, Union
+
+from excel_text._array import HAS_NUMPY, render_array
+from excel_text._compiled import CompiledFormat
+from excel_text._errors import ExcelError
+from excel_text._factory import compile_format, get_full_config
+
+if HAS_NUMPY:
+    import numpy as np
+
+_MIN_ARRAY_SIZE = 64
+"""
+Converting fewer values to an array costs more than it saves.
+"""
+
+
+def text_many(
+    values: Iterable[Any],
+    fmt: str,
+    config: Optional[Dict[str, Any]] = None,
+) -> List[Union[str, ExcelError]]:
+    """
+    The same as calling the text function for each value, but the format string is only compiled once.
+
+    If the `raise` option is off, errors are returned in place of the strings of the values that caused them, and the
+    other values are still formatted.
+
+    >>> text_many([1234.5678, 0.5, 12], "$#,##0.00")
+    ['$1,234.57', '$0.50', '$12.00']
+
+    :param values: Values that will be formatted.
+    :param fmt: The format string that describes how the output should look.
+    :param config: Dictionary with config options, like for :func:`get_text_function`.
+    :return: The formatted strings (or errors), in the same order as the values.
+    """
+    full_config = get_full_config(config)
+    values = as_list(values)
+
+    try:
+        compiled = compile_format(fmt, full_config)
+    except ExcelError as e:
+        if full_config["raise"]:
+            raise e
+        return [e] * len(values)
+
+    return render_values(compiled, values, full_config["raise"])
+
+
+def text_pairs(
+    pairs: Iterable[Tuple[Any, str]],
+    config: Optional[Dict[str, Any]] = None,
+    chunksize: int = 4096,
+) -> Iterator[Union[str, ExcelError]]:
+    """
+    The same as calling the text function for each pair of value and format string, but each distinct format string is
+    only compiled once.
+
+    The pairs are consumed in chunks, so that the results can be streamed with constant memory. Within a chunk, the
+    values with the same format string are formatted together.
+
+    >>> list(text_pairs([(1234.5678, "#,##0.0"), (44259.5, "yyyy/mm/dd"), ("abc", '"x"@')]))
+    ['1,234.6', '2021/03/04', 'xabc']
+
+    :param pairs: Pairs of a value that will be formatted, and the format string that describes how it should look.
+    :param config: Dictionary with config options, like for :func:`get_text_function`.
+    :param chunksize: The number of pairs to format at a time.
+    :return: The formatted strings (or errors), in the same order as the pairs.
+    """
+    full_config = get_full_config(config)
+    raise_errors = full_config["raise"]
+    compiled_formats: Dict[str, Union[CompiledFormat, ExcelError]] = {}
+    iterator = iter(pairs)
+
+    while True:
+        chunk = list(islice(iterator, chunksize))
+        if not chunk:
+            return
+
+        indices_by_format: Dict[str, List[int]] = {}
+        for i, (_, fmt) in enumerate(chunk):
+            indices_by_format.setdefault(fmt, []).append(i)
+
+        results: List[Union[str, ExcelError]] = [""] * len(chunk)
+        for fmt, indices in indices_by_format.items():
+            if fmt not in compiled_formats:
+                try:
+                    compiled_formats[fmt] = compile_format(fmt, full_config)
+                except ExcelError as e:
+                    compiled_formats[fmt] = e
+
+            compiled = compiled_formats[fmt]
+            if isinstance(compiled, ExcelError):
+                rendered: List[Union[str, ExcelError]] = [compiled] * len(indices)
+            else:
+                # Errors are raised below, so that everything before them is yielded first, like one at a time.
+                rendered = render_values(
+                    compiled, [chunk[i][0] for i in indices], False
+                )
+
+            for i, result in zip(indices, rendered):
+                results[i] = result
+
+        for result in results:
+            if raise_errors and isinstance(result, ExcelError):
+                raise result
+            yield result
+
+
+def as_list(values: Iterable[Any]) -> List[Any]:
+    """
+    Turn values into a list. NumPy arrays are flattened, and their items converted to Python scalars, like
+    :func:`excel_text.text_array` does when it formats values one at a time.
+    """
+    if HAS_NUMPY and isinstance(values, np.ndarray):
+        result: List[Any] = values.ravel().tolist()
+        return result
+    return list(values)
+
+
+def render_column(
+    compiled: CompiledFormat,
+    values: "np.ndarray[Any, Any]",
+    missing: "np.ndarray[Any, Any]",
+    raise_errors: bool,
+) -> "np.ndarray[Any, Any]":
+    """
+    Render a column of a data frame, given as a flat array and a mask of its missing values, which stay `None`.
+
+    Numeric and datetime columns are rendered as arrays, and all others one value at a time.
+
+    :return: A unicode array if no values are missing, and an object array otherwise.
+    """
+    if values.dtype.kind in "iufM" and not missing.any():
+        return render_array(compiled, values, raise_errors)
+
+    result = np.full(len(values), None, dtype=object)
+    present = np.flatnonzero(~missing)
+    if values.dtype.kind in "iufM":
+        result[present] = render_array(compiled, values[present], raise_errors)
+    else:
+        result[present] = render_values(
+            compiled, values[present].tolist(), raise_errors
+        )
+    return result
+
+
+def render_values(
+    compiled: CompiledFormat,
+    values: List[Any],
+    raise_errors: bool,
+) -> List[Union[str, ExcelError]]:
+    """
+    Render a list of values with a compiled format.
+
+    Lists of only floats or only integers are rendered as an array if NumPy is installed, since that gives the same
+    results. Mixed lists are not, because the array would turn their integers into floats.
+    """
+    if HAS_NUMPY and len(values) >= _MIN_ARRAY_SIZE:
+        first_type = type(values[0])
+        if first_type in (float, int) and all(type(v) is first_type for v in values):
+            array = np.asarray(values)
+            if array.dtype.kind in "iuf":
+                strings: List[Union[str, ExcelError]] = render_array(
+                    compiled, array, raise_errors
+                ).tolist()
+                return strings
+
+    render = compiled.renderer or compiled.render
+    if raise_errors:
+        return [render(value) for value in values]
+
+    results: List[Union[str, ExcelError]] = []
+    for value in values:
+        try:
+            results.append(render(value))
+        except ExcelError as e:
+            results.append(e)
+    return results
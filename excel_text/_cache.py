@@ -0,0 +1,106 @@
+from collections import OrderedDict
+from threading import Lock
+from typing import Callable, Generic, Hashable, NamedTuple, Optional, TypeVar
+
+V = TypeVar("V")
+
+
+class CacheInfo(NamedTuple):
+    """
+    Statistics of a :class:`FormatCache`, in the same shape as :func:`functools.lru_cache`'s ``cache_info()``.
+    """
+
+    hits: int
+    misses: int
+    maxsize: Optional[int]
+    currsize: int
+
+
+class FormatCache(Generic[V]):
+    """
+    A thread-safe least-recently-used cache for compiled format strings.
+
+    >>> cache = FormatCache(maxsize=2)
+    >>> cache.get_or_create("a", lambda: 1)
+    1
+    >>> cache.get_or_create("a", lambda: 2)
+    1
+    >>> cache.get_or_create("b", lambda: 3)
+    3
+    >>> cache.get_or_create("c", lambda: 4)
+    4
+    >>> "a" in cache
+    False
+    >>> cache.info()
+    CacheInfo(hits=1, misses=3, maxsize=2, currsize=2)
+
+    :param maxsize: The maximum number of entries to keep. Use `None` for an unbounded cache, and `0` to disable
+        caching altogether.
+    """
+
+    def __init__(self, maxsize: Optional[int] = 1024) -> None:
+        if maxsize is not None and maxsize < 0:
+            raise ValueError(f"Cache size must be positive or None, not {maxsize}.")
+
+        self.maxsize = maxsize
+        self._entries: "OrderedDict[Hashable, V]" = OrderedDict()
+        self._lock = Lock()
+        self._hits = 0
+        self._misses = 0
+
+    def get_or_create(self, key: Hashable, factory: Callable[[], V]) -> V:
+        """
+        Get the entry for `key`, or create it using `factory` if it is not cached yet.
+
+        The factory is called outside the lock, so it may be called more than once for the same key when multiple
+        threads miss at the same time. Exceptions raised by the factory propagate, and nothing is cached.
+        """
+        with self._lock:
+            try:
+                value = self._entries[key]
+            except KeyError:
+                self._misses += 1
+            else:
+                self._hits += 1
+                self._entries.move_to_end(key)
+                return value
+
+        value = factory()
+
+        if self.maxsize == 0:
+            return value
+
+        with self._lock:
+            self._entries[key] = value
+            self._entries.move_to_end(key)
+            if self.maxsize is not None:
+                while len(self._entries) > self.maxsize:
+                    self._entries.popitem(last=False)
+
+        return value
+
+    def info(self) -> CacheInfo:
+        with self._lock:
+            return CacheInfo(
+                hits=self._hits,
+                misses=self._misses,
+                maxsize=self.maxsize,
+                currsize=len(self._entries),
+            )
+
+    def clear(self) -> None:
+        """
+        Remove all entries and reset the statistics.
+        """
+        with self._lock:
+            self._entries.clear()
+            self._hits = 0
+            self._misses = 0
+
+    def __contains__(self, key: Hashable) -> bool:
+        with self._lock:
+            return key in self._entries
+
+    def __len__(self) -> int:
+        with self._lock:
+            return len(self._entries)
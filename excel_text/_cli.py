@@ -0,0 +1,339 @@
+"""
+Apply format strings to the columns of a CSV or TSV file.
+
+    python -m excel_text -f Amount='$#,##0.00' -f Date=yyyy/mm/dd input.csv -o output.csv
+
+Rows are streamed in chunks, so files of any size can be processed with constant memory. Cells that look like integers
+or decimal numbers (with a `.` as decimal separator) are formatted as numbers, cells in ISO 8601 format as dates, and
+all others as text. Empty cells are left empty.
+"""
+
+import argparse
+import csv
+import datetime
+import json
+import sys
+from collections import deque
+from concurrent.futures import Future, ProcessPoolExecutor
+from contextlib import ExitStack
+from dataclasses import dataclass
+from itertools import islice
+from typing import IO, Any, Deque, Dict, Iterator, List, Optional, Sequence
+
+from excel_text._batch import render_values
+from excel_text._compiled import CompiledFormat
+from excel_text._errors import ExcelError
+from excel_text._factory import compile_format
+
+_BUFFER_SIZE = 1 << 20
+
+_worker_formatter: Optional["RowFormatter"] = None
+
+
+class FormatFailed(Exception):
+    """
+    A cell could not be formatted.
+    """
+
+    pass
+
+
+def parse_cell(cell: str) -> Any:
+    """
+    Turn a cell into the value that it most likely represents.
+
+    Like in Excel, cells that Python would only read as numbers with underscores, whitespace or other digits than 0-9,
+    like "1_000", stay text.
+
+    >>> [parse_cell(c) for c in ["12", "-1.5", "2021-03-04", "abc", "1_000", "12 "]]
+    [12, -1.5, datetime.datetime(2021, 3, 4, 0, 0), 'abc', '1_000', '12 ']
+    """
+    if not cell or not (cell[0].isdigit() or cell[0] in "+-."):
+        return cell
+    if "_" in cell or cell[-1].isspace() or not cell.isascii():
+        return cell
+    try:
+        return int(cell)
+    except ValueError:
+        pass
+    try:
+        return float(cell)
+    except ValueError:
+        pass
+    try:
+        return datetime.datetime.fromisoformat(cell)
+    except ValueError:
+        return cell
+
+
+@dataclass
+class RowFormatter:
+    """
+    Format the cells of some of the columns of rows.
+
+    :param formats: The compiled format for each column index.
+    :param on_error: What to do with cells that can't be formatted: "raise", "keep" the original cell, or write an
+        "empty" cell instead.
+    """
+
+    formats: Dict[int, CompiledFormat]
+    on_error: str
+
+    def format_rows(self, rows: List[List[str]], first_row: int) -> List[List[str]]:
+        """
+        Format a chunk of rows, in place.
+
+        :param first_row: The number of the first row in the file, for error messages.
+        """
+        for column, compiled in self.formats.items():
+            cells = [row[column] if column < len(row) else "" for row in rows]
+            indices = [i for i, cell in enumerate(cells) if cell]
+            values = [parse_cell(cells[i]) for i in indices]
+
+            try:
+                results: Sequence[Any] = render_values(compiled, values, True)
+            except Exception:
+                results = [
+                    self.format_cell(compiled, value, first_row + i, column)
+                    for i, value in zip(indices, values)
+                ]
+
+            for i, result in zip(indices, results):
+                if result is not None:
+                    rows[i][column] = result
+
+        return rows
+
+    def format_cell(
+        self,
+        compiled: CompiledFormat,
+        value: Any,
+        row: int,
+        column: int,
+    ) -> Optional[str]:
+        """
+        Format a single cell, and handle its errors.
+
+        :return: The formatted string, or `None` to keep the original cell.
+        """
+        try:
+            return compiled.render(value)
+        except Exception as e:
+            if self.on_error == "keep":
+                return None
+            if self.on_error == "empty":
+                return ""
+            error = type(e).__name__ if isinstance(e, ExcelError) else repr(e)
+            raise FormatFailed(
+                f"Row {row}, column {column + 1}: can't format {value!r} with {compiled.fmt!r}: {error}"
+            ) from e
+
+
+def init_worker(
+    formats: Dict[int, str],
+    config: Dict[str, Any],
+    on_error: str,
+) -> None:
+    global _worker_formatter
+    _worker_formatter = create_formatter(formats, config, on_error)
+
+
+def format_rows_in_worker(rows: List[List[str]], first_row: int) -> List[List[str]]:
+    assert _worker_formatter is not None
+    return _worker_formatter.format_rows(rows, first_row)
+
+
+def create_formatter(
+    formats: Dict[int, str],
+    config: Dict[str, Any],
+    on_error: str,
+) -> RowFormatter:
+    return RowFormatter(
+        formats={
+            column: compile_format(fmt, config) for column, fmt in formats.items()
+        },
+        on_error=on_error,
+    )
+
+
+def format_chunks(
+    chunks: Iterator[List[List[str]]],
+    formats: Dict[int, str],
+    config: Dict[str, Any],
+    on_error: str,
+    first_row: int,
+    workers: int,
+) -> Iterator[List[List[str]]]:
+    """
+    Format chunks of rows, in order.
+
+    With multiple workers, at most two chunks per worker are in flight at a time, to keep the memory use constant.
+    """
+    formatter = create_formatter(formats, config, on_error)
+    if workers <= 1:
+        for chunk in chunks:
+            yield formatter.format_rows(chunk, first_row)
+            first_row += len(chunk)
+        return
+
+    with ProcessPoolExecutor(
+        max_workers=workers,
+        initializer=init_worker,
+        initargs=(formats, config, on_error),
+    ) as executor:
+        pending: Deque["Future[List[List[str]]]"] = deque()
+        for chunk in chunks:
+            pending.append(executor.submit(format_rows_in_worker, chunk, first_row))
+            first_row += len(chunk)
+            if len(pending) >= workers * 2:
+                yield pending.popleft().result()
+        while pending:
+            yield pending.popleft().result()
+
+
+def parse_args(argv: Optional[Sequence[str]]) -> argparse.Namespace:
+    assert __doc__ is not None
+    arg_parser = argparse.ArgumentParser(
+        prog="python -m excel_text",
+        description=__doc__.strip().split("\n\n")[0],
+        epilog=__doc__.strip().split("\n\n", 2)[2],
+    )
+    arg_parser.add_argument(
+        "input", nargs="?", default="-", help="Input file, or - for stdin (default)."
+    )
+    arg_parser.add_argument(
+        "-o", "--output", default="-", help="Output file, or - for stdout (default)."
+    )
+    arg_parser.add_argument(
+        "-f",
+        "--format",
+        action="append",
+        default=[],
+        metavar="COLUMN=FORMAT",
+        help="Format a column. The column is a header name, or a 0-based index with --no-header. Can be repeated.",
+    )
+    arg_parser.add_argument(
+        "--formats",
+        metavar="JSON_FILE",
+        help="A JSON file with an object that maps columns to formats, like --format.",
+    )
+    arg_parser.add_argument("-d", "--delimiter", default=",")
+    arg_parser.add_argument("--tsv", action="store_true", help="Use tabs as delimiter.")
+    arg_parser.add_argument(
+        "--no-header",
+        action="store_true",
+        help="The first row is data, not column names.",
+    )
+    arg_parser.add_argument("--encoding", default="utf-8")
+    arg_parser.add_argument(
+        "--decimal", default=".", help="Decimal separator in the formats."
+    )
+    arg_parser.add_argument(
+        "--thousands", default=",", help="Thousands separator in the formats."
+    )
+    arg_parser.add_argument(
+        "--on-error",
+        choices=["raise", "keep", "empty"],
+        default="raise",
+        help="What to do with cells that can't be formatted: stop (default), keep the original cell, or empty it.",
+    )
+    arg_parser.add_argument(
+        "--workers", type=int, default=1, help="Number of processes (default 1)."
+    )
+    arg_parser.add_argument(
+        "--chunk-rows",
+        type=int,
+        default=10000,
+        help="Number of rows to format at a time (default 10000).",
+    )
+    args = arg_parser.parse_args(argv)
+
+    args.column_formats = {}
+    if args.formats:
+        with open(args.formats, encoding="utf-8") as f:
+            args.column_formats.update(json.load(f))
+    for mapping in args.format:
+        column, sep, fmt = mapping.partition("=")
+        if not sep:
+            arg_parser.error(f"Expected COLUMN=FORMAT, not {mapping!r}.")
+        args.column_formats[column] = fmt
+    if not args.column_formats:
+        arg_parser.error("No formats given. Use --format or --formats.")
+    if args.chunk_rows < 1:
+        arg_parser.error("--chunk-rows must be positive.")
+    if args.tsv:
+        args.delimiter = "\t"
+
+    args.arg_parser = arg_parser
+    return args
+
+
+def open_text(path: str, mode: str, encoding: str, stack: ExitStack) -> IO[str]:
+    std = sys.stdin if mode == "r" else sys.stdout
+    return stack.enter_context(
+        open(
+            std.fileno() if path == "-" else path,
+            mode,
+            buffering=_BUFFER_SIZE,
+            encoding=encoding,
+            newline="",
+            closefd=path != "-",
+        )
+    )
+
+
+def main(argv: Optional[Sequence[str]] = None) -> int:
+    """
+    Run the command-line interface.
+
+    :param argv: The arguments, without the program name. Defaults to those of the current process.
+    :return: The exit code.
+    """
+    args = parse_args(argv)
+    config = {"decimal": args.decimal, "thousands": args.thousands}
+
+    with ExitStack() as stack:
+        reader = csv.reader(
+            open_text(args.input, "r", args.encoding, stack), delimiter=args.delimiter
+        )
+
+        header = None if args.no_header else next(reader, None)
+        formats = {}
+        for column, fmt in args.column_formats.items():
+            if header is not None and column in header:
+                formats[header.index(column)] = fmt
+            elif args.no_header and column.isdigit():
+                formats[int(column)] = fmt
+            else:
+                args.arg_parser.error(f"Unknown column: {column!r}")
+
+        try:
+            for fmt in set(formats.values()):
+                compile_format(fmt, config)
+        except Exception as e:
+            args.arg_parser.error(f"Invalid format {fmt!r}: {e!r}")
+
+        writer = csv.writer(
+            open_text(args.output, "w", args.encoding, stack),
+            delimiter=args.delimiter,
+            lineterminator="\n",
+        )
+        if header is not None:
+            writer.writerow(header)
+
+        chunks = iter(lambda: list(islice(reader, args.chunk_rows)), [])
+        try:
+            for chunk in format_chunks(
+                chunks,
+                formats,
+                config,
+                args.on_error,
+                first_row=1 if header is None else 2,
+                workers=args.workers,
+            ):
+                writer.writerows(chunk)
+        except FormatFailed as e:
+            print(f"error: {e}", file=sys.stderr)
+            return 1
+
+    return 0
@@ -0,0 +1,331 @@
+"""
+Compile a token list into the Python source of a single function, which renders values without interpreting tokens.
+
+The generated code mirrors the `render` methods in :mod:`excel_text._tokens`, with everything that only depends on the
+format string worked out up front. Tokens or token shapes that are not specialized here are rendered by calling their
+`render` method, so the results are always exactly the same as those of the token interpreter.
+"""
+
+from dataclasses import dataclass, field
+from typing import Any, Callable, Dict, List, Sequence, Tuple
+
+from excel_dates import ensure_python_date, ensure_python_time
+
+from excel_text._elapsed import elapsed_seconds
+from excel_text._numbers import render_fixed, render_scientific
+from excel_text._tokens import (
+    FormatStringToken,
+    YearToken,
+    MonthToken,
+    DayToken,
+    HourToken,
+    MinuteToken,
+    SecondToken,
+    AmPmToken,
+    ElapsedHoursToken,
+    ElapsedMinutesToken,
+    ElapsedSecondsToken,
+    VerbatimToken,
+    NumberToken,
+    StringToken,
+    BinaryConditionalToken,
+    TernaryConditionalToken,
+)
+
+_am_pm_expressions = {
+    "am/pm": "{p}.lower()",
+    "AM/PM": "{p}.upper()",
+    "a/p": "{p}[0].lower()",
+    "A/P": "{p}[0].upper()",
+    "A/p": '("A" if {p}.lower() == "am" else "p")',
+    "a/P": '("a" if {p}.lower() == "am" else "P")',
+}
+
+
+@dataclass
+class _Block:
+    """
+    The state of a block of generated statements.
+    """
+
+    indent: str
+    lines: List[str]
+    date_var: str = ""
+    time_var: str = ""
+    elapsed_var: str = ""
+    parts: List[str] = field(default_factory=list)
+
+
+class _Generator:
+    def __init__(self) -> None:
+        self.namespace: Dict[str, Any] = {
+            "ensure_python_date": ensure_python_date,
+            "ensure_python_time": ensure_python_time,
+            "elapsed_seconds": elapsed_seconds,
+            "render_fixed": render_fixed,
+            "render_scientific": render_scientific,
+        }
+        self.counter = 0
+
+    def name(self, prefix: str) -> str:
+        self.counter += 1
+        return f"_{prefix}{self.counter}"
+
+    def constant(self, value: Any) -> str:
+        name = self.name("c")
+        self.namespace[name] = value
+        return name
+
+    def date(self, block: _Block) -> str:
+        if not block.date_var:
+            block.date_var = self.name("d")
+            block.lines.append(
+                f"{block.indent}{block.date_var} = ensure_python_date(value)"
+            )
+        return block.date_var
+
+    def time(self, block: _Block) -> str:
+        if not block.time_var:
+            block.time_var = self.name("t")
+            block.lines.append(
+                f"{block.indent}{block.time_var} = ensure_python_time(value)"
+            )
+        return block.time_var
+
+    def elapsed(self, block: _Block) -> str:
+        if not block.elapsed_var:
+            block.elapsed_var = self.name("e")
+            block.lines.append(
+                f"{block.indent}{block.elapsed_var} = elapsed_seconds(value)"
+            )
+        return block.elapsed_var
+
+    def tokens(
+        self,
+        tokens: Sequence[FormatStringToken],
+        block: _Block,
+        hoist_minus: bool,
+    ) -> str:
+        """
+        Generate the statements for a token list, and return an expression for the rendered string.
+        """
+        minus = ""
+        if hoist_minus and any(isinstance(t, NumberToken) for t in tokens):
+            minus = self.name("m")
+            block.lines.append(f'{block.indent}{minus} = ""')
+
+        parts: List[str] = []
+        for token in tokens:
+            part = self.token(token, block)
+            if hoist_minus and hasattr(token, "thousands_char"):
+                # Move the minus sign of numbers to the front, like the interpreter.
+                block.lines += [
+                    f'{block.indent}if {part}[0] == "-":',
+                    f'{block.indent}    {minus} += "-"',
+                    f"{block.indent}    {part} = {part}[1:]",
+                ]
+            parts.append(part)
+
+        if minus:
+            parts.insert(0, minus)
+        return " + ".join(parts) or '""'
+
+    def token(self, token: FormatStringToken, block: _Block) -> str:
+        """
+        Generate the statements for a token, and return an expression for the rendered string.
+
+        Every expression is evaluated into a variable straight away, so that errors are raised in the same order as by
+        the interpreter.
+        """
+        n = len(token.text)
+        expression = None
+
+        if isinstance(token, VerbatimToken):
+            return repr(token.text)
+
+        if isinstance(token, StringToken):
+            expression = "str(value)"
+
+        elif isinstance(token, YearToken):
+            d = self.date(block)
+            expression = f'{d}.strftime("%Y")' if n > 2 else f'{d}.strftime("%y")'
+
+        elif isinstance(token, MonthToken):
+            d = self.date(block)
+            if n >= 6 or n == 4:
+                expression = f'{d}.strftime("%B")'
+            elif n == 5:
+                expression = f'{d}.strftime("%b")[0]'
+            elif n == 3:
+                expression = f'{d}.strftime("%b")'
+            elif n == 2:
+                expression = f'format({d}.month, "02d")'
+            elif n == 1:
+                expression = f"str({d}.month)"
+
+        elif isinstance(token, DayToken):
+            d = self.date(block)
+            if n > 3:
+                expression = f'{d}.strftime("%A")'
+            elif n > 2:
+                expression = f'{d}.strftime("%a")'
+            elif n > 1:
+                expression = f'format({d}.day, "02d")'
+            else:
+                expression = f"str({d}.day)"
+
+        elif isinstance(token, HourToken):
+            t = self.time(block)
+            if token.twelve and n >= 2:
+                expression = f'{t}.strftime("%I")'
+            elif token.twelve and n == 1:
+                expression = f'{t}.strftime("%I").lstrip("0")'
+            elif n >= 2:
+                expression = f'format({t}.hour, "02d")'
+            elif n == 1:
+                expression = f"str({t}.hour)"
+
+        elif isinstance(token, MinuteToken):
+            t = self.time(block)
+            if n == 2:
+                expression = f'format({t}.minute, "02d")'
+            elif n == 1:
+                expression = f"str({t}.minute)"
+
+        elif isinstance(token, SecondToken):
+            t = self.time(block)
+            parts = token.text.split(token.decimal_char)
+            n_int = len(parts[0])
+            if len(parts) > 1:
+                n_frac = len(parts[1])
+                spec = f"0{1 + n_frac + n_int}.{n_frac}f"
+            else:
+                spec = f"0{n_int}.0f"
+            expression = f"format({t}.second + {t}.microsecond / 1000000, {spec!r})"
+
+        elif isinstance(token, AmPmToken):
+            if token.text in _am_pm_expressions:
+                t = self.time(block)
+                p = f'{t}.strftime("%p")'
+                expression = _am_pm_expressions[token.text].format(p=p)
+
+        elif isinstance(token, ElapsedHoursToken):
+            expression = f"str(int({self.elapsed(block)} / 3600))"
+
+        elif isinstance(token, ElapsedMinutesToken):
+            expression = f"str(int({self.elapsed(block)} / 60))"
+
+        elif isinstance(token, ElapsedSecondsToken):
+            expression = f"str(int({self.elapsed(block)}))"
+
+        elif isinstance(token, NumberToken):
+            expression = self.number(token, block)
+
+        elif isinstance(token, BinaryConditionalToken):
+            return self.binary_conditional(token, block)
+
+        elif isinstance(token, TernaryConditionalToken):
+            return self.ternary_conditional(token, block)
+
+        if expression is None:
+            # Not specialized, so let the token render itself.
+            expression = f"{self.constant(token.render)}(value)"
+
+        part = self.name("p")
+        block.lines.append(f"{block.indent}{part} = {expression}")
+        return part
+
+    def number(self, token: NumberToken, block: _Block) -> str:
+        """
+        Generate the statements of :meth:`NumberToken.render`, with the layout of the format already worked out.
+        """
+        i = block.indent
+        block.lines += [
+            f"{i}if not isinstance(value, (float, int)):",
+            f'{i}    raise ValueError("Value is not numeric.")',
+        ]
+        function = "render_scientific" if token._layout.exponent else "render_fixed"
+        return (
+            f"{function}({self.constant(token._layout)}, {token.decimal_char!r}, value)"
+        )
+
+    def branch(self, tokens: Sequence[FormatStringToken], block: _Block) -> _Block:
+        """
+        Generate a nested block that renders the tokens of a conditional branch.
+        """
+        nested = _Block(indent=block.indent + "    ", lines=block.lines)
+        # Like the interpreter, the minus signs are not moved within conditional branches.
+        nested.parts.append(self.tokens(tokens, nested, hoist_minus=False))
+        return nested
+
+    def binary_conditional(self, token: BinaryConditionalToken, block: _Block) -> str:
+        i = block.indent
+        part = self.name("p")
+        if token.condition.threshold is not None:
+            # Not its repr, which is "inf" for thresholds with hundreds of digits.
+            rhs = self.constant(token.condition.threshold)
+        else:
+            # Let it fail at render time, like the interpreter.
+            rhs = f"float({token.condition.rhs!r})"
+
+        operator = "==" if token.condition.operator == "=" else token.condition.operator
+        block.lines.append(f"{i}if float(value) {operator} {rhs}:")
+        nested = self.branch(token.true_tokens, block)
+        block.lines += [f"{nested.indent}{part} = {nested.parts[0]}", f"{i}else:"]
+        nested = self.branch(token.false_tokens, block)
+        block.lines.append(f"{nested.indent}{part} = {nested.parts[0]}")
+        return part
+
+    def ternary_conditional(
+        self,
+        token: TernaryConditionalToken,
+        block: _Block,
+    ) -> str:
+        i = block.indent
+        part = self.name("p")
+        for statement, tokens in [
+            ("if value > 0:", token.gt_tokens),
+            ("elif value < 0:", token.lt_tokens),
+            ("else:", token.eq_tokens),
+        ]:
+            block.lines.append(f"{i}{statement}")
+            nested = self.branch(tokens, block)
+            block.lines.append(f"{nested.indent}{part} = {nested.parts[0]}")
+        return part
+
+
+def generate_source(
+    tokens: Sequence[FormatStringToken],
+) -> Tuple[str, Dict[str, Any]]:
+    """
+    Generate the source code of a function that renders a value with the given preprocessed tokens.
+
+    >>> from excel_text import compile_format
+    >>> print(generate_source(compile_format('"Total: "0.0').tokens)[0])
+    def render(value):
+        _m1 = ""
+        if not isinstance(value, (float, int)):
+            raise ValueError("Value is not numeric.")
+        _p3 = render_fixed(_c2, '.', value)
+        if _p3[0] == "-":
+            _m1 += "-"
+            _p3 = _p3[1:]
+        return _m1 + 'Total: ' + _p3
+
+    :return: The source code, and the namespace in which it must be executed.
+    """
+    generator = _Generator()
+    block = _Block(indent="    ", lines=["def render(value):"])
+    expression = generator.tokens(tokens, block, hoist_minus=True)
+    block.lines.append(f"    return {expression}")
+    return "\n".join(block.lines), generator.namespace
+
+
+def generate_renderer(tokens: Sequence[FormatStringToken]) -> Callable[[Any], str]:
+    """
+    Compile the given preprocessed tokens into a single function that renders a value.
+    """
+    source, namespace = generate_source(tokens)
+    exec(compile(source, "<excel_text._codegen>", "exec"), namespace)
+    renderer: Callable[[Any], str] = namespace["render"]
+    return renderer
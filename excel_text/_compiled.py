@@ -0,0 +1,212 @@
+from dataclasses import dataclass, field, replace
+from functools import cached_property
+from typing import Any, Callable, Iterable, List, Optional, Tuple
+
+from excel_text._codegen import generate_renderer
+from excel_text._preprocess import preprocess
+from excel_text._tokens import (
+    FormatStringToken,
+    BinaryConditionalToken,
+    TernaryConditionalToken,
+    DateToken,
+    SecondToken,
+    AmPmToken,
+    ElapsedHoursToken,
+    ElapsedMinutesToken,
+    ElapsedSecondsToken,
+    NumberToken,
+    ValueParts,
+)
+from excel_text._tokenizer import Tokenizer
+
+date_token_types = (
+    DateToken,
+    SecondToken,
+    AmPmToken,
+    ElapsedHoursToken,
+    ElapsedMinutesToken,
+    ElapsedSecondsToken,
+)
+
+conditional_token_types = (BinaryConditionalToken, TernaryConditionalToken)
+
+
+@dataclass(frozen=True)
+class CompiledFormat:
+    """
+    A format string that has been parsed and preprocessed, ready to render any number of values.
+
+    Use :func:`excel_text.compile_format` to create one. Errors are always raised, never returned.
+
+    By default, values are rendered by interpreting the tokens. If a `renderer` is given, e.g. one generated by
+    :func:`excel_text._codegen.generate_renderer`, that is used instead.
+
+    >>> from excel_text import compile_format
+    >>> cf = compile_format("$#,##0.00")
+    >>> cf.render(1234.5678)
+    '$1,234.57'
+    >>> cf.render_many([1, 22.5])
+    ['$1.00', '$22.50']
+    >>> cf.is_numeric_format, cf.is_date_format
+    (True, False)
+    """
+
+    fmt: str
+    decimal_char: str
+    thousands_char: str
+    tokens: Tuple[FormatStringToken, ...]
+    renderer: Optional[Callable[[Any], str]] = field(
+        default=None, repr=False, compare=False
+    )
+    hoist_minus: bool = field(default=True, repr=False, compare=False)
+    """
+    Whether the minus signs of numbers are moved to the front. They are not within the sections of conditional formats.
+    """
+
+    @property
+    def sections(self) -> Tuple[Tuple[FormatStringToken, ...], ...]:
+        """
+        The token lists of the `;`-separated sections of the format string, in the order they appear in it.
+        """
+        if len(self.tokens) == 1:
+            token = self.tokens[0]
+            if isinstance(token, BinaryConditionalToken):
+                return token.true_tokens, token.false_tokens
+            if isinstance(token, TernaryConditionalToken):
+                return token.gt_tokens, token.eq_tokens, token.lt_tokens
+
+        return (self.tokens,)
+
+    @property
+    def is_date_format(self) -> bool:
+        """
+        Whether any section renders a part of a date, time or elapsed time.
+        """
+        return any(
+            isinstance(token, date_token_types)
+            for section in self.sections
+            for token in section
+        )
+
+    @property
+    def is_numeric_format(self) -> bool:
+        """
+        Whether any section renders a number.
+        """
+        return any(
+            isinstance(token, NumberToken)
+            for section in self.sections
+            for token in section
+        )
+
+    @cached_property
+    def branches(self) -> Optional[Tuple["CompiledFormat", ...]]:
+        """
+        For conditional formats, a compiled format for each section, in the same order as :attr:`sections`, so that
+        rendering a value only has to pick one. `None` for other formats.
+        """
+        if len(self.sections) == 1:
+            return None
+        return tuple(
+            replace(self, tokens=section, renderer=None, hoist_minus=False)
+            for section in self.sections
+        )
+
+    def branch(self, value: Any) -> int:
+        """
+        The index of the section of a conditional format that renders a value.
+        """
+        token = self.tokens[0]
+        if isinstance(token, BinaryConditionalToken):
+            return 0 if token.condition.eval(value) else 1
+        if value > 0:
+            return 0
+        if value < 0:
+            return 2
+        return 1
+
+    @cached_property
+    def _shares_parts(self) -> bool:
+        """
+        Whether rendering a value computes its date, time or elapsed time, which is worth sharing between tokens.
+        """
+        return self.is_date_format
+
+    def render(self, value: Any) -> str:
+        """
+        Render a single value.
+
+        :param value: Value that will be formatted.
+        :return: The formatted string.
+        """
+        if self.renderer is not None:
+            return self.renderer(value)
+
+        branches = self.branches
+        if branches is not None:
+            return branches[self.branch(value)].render(value)
+
+        # The date and time of the value are computed at most once, for all tokens.
+        parts = ValueParts(value) if self._shares_parts else None
+        return_string = ""
+        filler_chars = ""
+        for token in self.tokens:
+            entry = token.render(value) if parts is None else token.render_parts(parts)
+            if self.hoist_minus and hasattr(token, "thousands_char"):
+                if entry[0] == "-":
+                    filler_chars += "-"
+                    entry = entry[1:]
+            return_string += entry
+        return filler_chars + return_string
+
+    def render_many(self, values: Iterable[Any]) -> List[str]:
+        """
+        Render each of the given values.
+
+        :param values: Values that will be formatted.
+        :return: The formatted strings, in the same order as the values.
+        """
+        render = self.renderer or self.render
+        return [render(value) for value in values]
+
+
+def compile_tokens(
+    fmt: str,
+    tokenizer: Tokenizer,
+    renderer: str = "interpreter",
+) -> CompiledFormat:
+    """
+    Tokenize and preprocess a format string.
+
+    :param renderer: See :func:`create_compiled_format`.
+    """
+    # The tokens are immutable, so compiled formats can be shared between calls and threads.
+    tokens = preprocess(tokenizer.tokenize(fmt))
+    return create_compiled_format(
+        fmt, tokenizer.decimal_char, tokenizer.thousands_char, tokens, renderer
+    )
+
+
+def create_compiled_format(
+    fmt: str,
+    decimal_char: str,
+    thousands_char: str,
+    tokens: Tuple[FormatStringToken, ...],
+    renderer: str = "interpreter",
+) -> CompiledFormat:
+    """
+    Create a compiled format from tokens that were already preprocessed.
+
+    :param renderer: Either "interpreter" to render by interpreting the tokens, or "codegen" to compile the tokens into
+        a Python function first.
+    """
+    if renderer not in ("interpreter", "codegen"):
+        raise ValueError(f"Unknown renderer: {renderer!r}")
+
+    return CompiledFormat(
+        fmt=fmt,
+        decimal_char=decimal_char,
+        thousands_char=thousands_char,
+        tokens=tokens,
+        renderer=generate_renderer(tokens) if renderer == "codegen" else None,
+    )
@@ -1,23 +1,52 @@
-from dataclasses import dataclass
-from typing import Any, Dict, Callable
+import operator
+from dataclasses import dataclass, field
+from types import MappingProxyType
+from typing import Any, Callable, Mapping, Optional
 
-operations: Dict[str, Callable[[Any, Any], bool]] = {
-    ">": lambda lhs, rhs: bool(lhs > rhs),
-    "<": lambda lhs, rhs: bool(lhs < rhs),
-    ">=": lambda lhs, rhs: bool(lhs >= rhs),
-    "<=": lambda lhs, rhs: bool(lhs <= rhs),
-    "=": lambda lhs, rhs: bool(lhs == rhs),
-}
+# Read-only, because it is shared by all threads.
+operations: Mapping[str, Callable[[Any, Any], bool]] = MappingProxyType(
+    {
+        ">": operator.gt,
+        "<": operator.lt,
+        ">=": operator.ge,
+        "<=": operator.le,
+        "=": operator.eq,
+    }
+)
 
 
-@dataclass
+@dataclass(frozen=True)
 class Condition:
     """
     An IF condition. This is used by BinaryConditionToken.
+
+    The operator is looked up and the right-hand side is parsed once, when the condition is created.
+
+    >>> Condition(">=", "1000").eval(1000)
+    True
+    >>> Condition(">=", "1000").threshold
+    1000.0
     """
 
     operator: str
     rhs: str
 
+    compare: Callable[[Any, Any], bool] = field(init=False, repr=False, compare=False)
+    threshold: Optional[float] = field(init=False, repr=False, compare=False)
+    """
+    The right-hand side as a number, or `None` if it isn't one, e.g. "1,5". Then evaluating the condition fails.
+    """
+
+    def __post_init__(self) -> None:
+        object.__setattr__(self, "compare", operations[self.operator])
+        try:
+            threshold: Optional[float] = float(self.rhs)
+        except ValueError:
+            threshold = None
+        object.__setattr__(self, "threshold", threshold)
+
     def eval(self, value: Any) -> bool:
-        return operations[self.operator](float(value), float(self.rhs))
+        lhs = float(value)
+        if self.threshold is None:
+            float(self.rhs)
+        return self.compare(lhs, self.threshold)
@@ -0,0 +1,201 @@
+"""
+Format the columns of pandas and Polars data frames.
+
+Neither library is a dependency. They are only imported when a function here is given one of their objects, or when
+their accessors are registered.
+"""
+
+import sys
+from typing import Any, Dict, Optional, Union
+
+from excel_text._array import require_numpy
+from excel_text._batch import render_column
+from excel_text._compiled import CompiledFormat
+from excel_text._errors import ExcelError
+from excel_text._factory import compile_format, get_full_config
+
+_NUMERIC_DTYPES = {"i": "int64", "u": "uint64", "f": "float64"}
+
+
+def text_series(
+    series: Any,
+    fmt: str,
+    config: Optional[Dict[str, Any]] = None,
+) -> Any:
+    """
+    The same as calling the text function for each value of a pandas or Polars series, but the format string is only
+    compiled once, and numeric series are formatted as arrays.
+
+    Missing values stay missing. If the `raise` option is off, errors are returned in place, like with
+    :func:`text_many`. Polars series can't hold errors, so those become nulls instead.
+
+    :param series: A `pandas.Series` or a `polars.Series`.
+    :param fmt: The format string that describes how the output should look.
+    :param config: Dictionary with config options, like for :func:`get_text_function`.
+    :return: A series of the same kind, with the same length, index and name.
+    """
+    full_config = get_full_config(config)
+    compiled = compile_or_error(fmt, full_config)
+    if is_polars(series, "Series"):
+        return render_polars_series(compiled, series, full_config["raise"])
+
+    import pandas as pd
+
+    if not isinstance(series, pd.Series):
+        raise TypeError(f"Expected a pandas or Polars series, not {type(series)}.")
+
+    if isinstance(compiled, ExcelError):
+        return pd.Series([compiled] * len(series), series.index, object, series.name)
+
+    return pd.Series(
+        render_pandas_values(compiled, series, full_config["raise"]),
+        series.index,
+        name=series.name,
+    )
+
+
+def text_expr(
+    expr: Any,
+    fmt: str,
+    config: Optional[Dict[str, Any]] = None,
+) -> Any:
+    """
+    Format the values of a Polars expression, like :func:`text_series`. The format string is compiled right away, so
+    that invalid ones fail early, and only once for all batches.
+
+    >>> import polars as pl
+    >>> pl.DataFrame({"x": [1234.5678, 0.5]}).select(text_expr(pl.col("x"), "$#,##0.00"))["x"].to_list()
+    ['$1,234.57', '$0.50']
+
+    :param expr: A `polars.Expr`.
+    :param fmt: The format string that describes how the output should look.
+    :param config: Dictionary with config options, like for :func:`get_text_function`.
+    :return: An expression of strings.
+    """
+    import polars as pl
+
+    full_config = get_full_config(config)
+    compiled = compile_or_error(fmt, full_config)
+    raise_errors = full_config["raise"]
+
+    def render(series: Any) -> Any:
+        return render_polars_series(compiled, series, raise_errors)
+
+    return expr.map_batches(render, return_dtype=pl.String, is_elementwise=True)
+
+
+def compile_or_error(
+    fmt: str,
+    full_config: Dict[str, Any],
+) -> Union[CompiledFormat, ExcelError]:
+    """
+    Compile a format string, and return its error instead if the `raise` option is off.
+    """
+    try:
+        return compile_format(fmt, full_config)
+    except ExcelError as e:
+        if full_config["raise"]:
+            raise e
+        return e
+
+
+def is_polars(obj: Any, class_name: str) -> bool:
+    """
+    Whether an object is an instance of a Polars class, without importing Polars if it was not imported yet.
+    """
+    polars = sys.modules.get("polars")
+    return polars is not None and isinstance(obj, getattr(polars, class_name))
+
+
+def render_pandas_values(
+    compiled: CompiledFormat,
+    series: Any,
+    raise_errors: bool,
+) -> Any:
+    import numpy as np
+
+    require_numpy()
+    missing = series.isna().to_numpy()
+    if series.dtype.kind in _NUMERIC_DTYPES:
+        # Nullable dtypes need a placeholder for their missing values, which are not rendered anyway.
+        values = series.to_numpy(_NUMERIC_DTYPES[series.dtype.kind], na_value=0)
+    elif isinstance(series.dtype, np.dtype) and series.dtype.kind == "M":
+        # Only datetimes without a time zone.
+        values = series.to_numpy()
+    else:
+        values = series.to_numpy(object)
+    return render_column(compiled, values, missing, raise_errors)
+
+
+def render_polars_series(
+    compiled: Union[CompiledFormat, ExcelError],
+    series: Any,
+    raise_errors: bool,
+) -> Any:
+    import numpy as np
+    import polars as pl
+
+    if isinstance(compiled, ExcelError):
+        return pl.Series(series.name, [None] * len(series), dtype=pl.String)
+
+    missing = series.is_null().to_numpy()
+    if series.dtype.is_numeric() and not series.dtype == pl.Decimal:
+        values = series.fill_null(0).to_numpy()
+    elif series.dtype == pl.Date or (
+        isinstance(series.dtype, pl.Datetime) and series.dtype.time_zone is None
+    ):
+        values = series.to_numpy()
+    else:
+        values = np.empty(len(series), dtype=object)
+        values[:] = series.to_list()
+
+    rendered = render_column(compiled, values, missing, raise_errors)
+    if rendered.dtype == object:
+        rendered[[isinstance(s, ExcelError) for s in rendered]] = None
+    return pl.Series(series.name, rendered, dtype=pl.String)
+
+
+class SeriesAccessor:
+    """
+    The `excel` accessor of pandas and Polars series, and of Polars expressions.
+
+    >>> import pandas as pd
+    >>> register_accessors()
+    >>> pd.Series([1234.5678, None]).excel.text("$#,##0.00").tolist()
+    ['$1,234.57', nan]
+    """
+
+    def __init__(self, obj: Any) -> None:
+        self._obj = obj
+
+    def text(self, fmt: str, config: Optional[Dict[str, Any]] = None) -> Any:
+        """
+        See :func:`text_series` and :func:`text_expr`.
+        """
+        if is_polars(self._obj, "Expr"):
+            return text_expr(self._obj, fmt, config)
+        return text_series(self._obj, fmt, config)
+
+
+def register_accessors() -> None:
+    """
+    Register `Series.excel.text(fmt, config)` for pandas, and `Series.excel.text` and `Expr.excel.text` for Polars, for
+    those of them that are installed. Registering them again does nothing.
+    """
+    try:
+        import pandas as pd
+    except ImportError:  # pragma: no cover
+        pass
+    else:
+        if not hasattr(pd.Series, "excel"):
+            pd.api.extensions.register_series_accessor("excel")(SeriesAccessor)
+
+    try:
+        import polars as pl
+    except ImportError:  # pragma: no cover
+        pass
+    else:
+        if not hasattr(pl.Series, "excel"):
+            pl.api.register_series_namespace("excel")(SeriesAccessor)
+        if not hasattr(pl.Expr, "excel"):
+            pl.api.register_expr_namespace("excel")(SeriesAccessor)
@@ -1,9 +1,70 @@
-from typing import Union, Any, Optional, Dict, Callable
+from typing import TYPE_CHECKING, Union, Any, Optional, Dict, Callable
 
+from excel_text._cache import FormatCache
+from excel_text._compiled import CompiledFormat, compile_tokens
 from excel_text._errors import ExcelError
-from excel_text._preprocess import preprocess
-from excel_text._grammar import FormatStringParser
-from excel_text._visitor import FormatStringVisitor
+from excel_text._fast import with_fast_renderer
+from excel_text._tokenizer import check_parser, get_tokenizer
+
+if TYPE_CHECKING:
+    from excel_text._format_file import FormatFile
+
+
+def get_full_config(config: Optional[Dict[str, Any]]) -> Dict[str, Any]:
+    """
+    Provide config defaults.
+    """
+    if config is None:
+        config = {}
+
+    return {
+        "decimal": ".",
+        "thousands": ",",
+        "raise": True,
+        "cache_size": 1024,
+        "renderer": "interpreter",
+        "parser": "peg",
+        "fast_path": True,
+        **config,
+    }
+
+
+def compile_format(
+    fmt: str,
+    config: Optional[Dict[str, Any]] = None,
+) -> CompiledFormat:
+    """
+    Compile a format string once, so that it can be used to render many values.
+
+    Only the `decimal`, `thousands`, `parser`, `renderer` and `format_file` config options are relevant here. Invalid
+    format strings always raise.
+
+    >>> compile_format("0.00%").render(0.2859)
+    '28.59%'
+
+    :param fmt: The format string that describes how the output should look.
+    :param config: Dictionary with config options, like for :func:`get_text_function`.
+    :return: The compiled format.
+    """
+    full_config = get_full_config(config)
+    format_file: Optional["FormatFile"] = full_config.get("format_file")
+    if format_file is not None:
+        compiled = format_file.get(
+            fmt,
+            full_config["decimal"],
+            full_config["thousands"],
+            full_config["renderer"],
+        )
+        if compiled is not None:
+            return compiled
+
+    return compile_tokens(
+        fmt,
+        get_tokenizer(
+            full_config["decimal"], full_config["thousands"], full_config["parser"]
+        ),
+        full_config["renderer"],
+    )
 
 
 def get_text_function(
@@ -15,31 +76,44 @@ def get_text_function(
     The text function can be configured to return errors rather than raise them, just like in Excel.
     The error classes are all subclasses of :class:`ExcelError`.
 
+    Format strings are parsed once and kept in a least-recently-used cache, so that repeated formats only pay for
+    rendering. The cache is bounded by the `cache_size` option. Pass your own :class:`FormatCache` as the `cache`
+    option to share it between text functions, or to inspect its statistics.
+
+    With the `renderer` option set to "codegen", each format string is compiled into a specialized Python function
+    when it is first used. This costs more up front, but renders faster.
+
+    With the `parser` option set to "scanner", format strings are tokenized by a hand-written scanner instead of the
+    PEG grammar. The tokens are the same, but new format strings are parsed faster.
+
+    The parser for each locale is built once and shared by the whole process, see :func:`warm_up`. With a
+    :class:`FormatFile` as the `format_file` option, format strings are looked up in that file before they are parsed,
+    and the parser is only built for those that are not in it.
+
+    Common format strings, like "0.00", "#,##0", "0%", "yyyy-mm-dd", "@" and quoted literals, are rendered by
+    hand-written renderers instead of their tokens, unless the `fast_path` option is off. The results are the same.
+
     TODO: Use a TypedDict for the `config` param.
 
     :param config: Dictionary with config options.
     :return: TEXT function.
     """
+    full_config = get_full_config(config)
 
-    # Provide config defaults.
-    if config is None:
-        config = {}
+    if full_config.get("cache") is None:
+        full_config["cache"] = FormatCache(maxsize=full_config["cache_size"])
+    cache: FormatCache[CompiledFormat] = full_config["cache"]
 
-    full_config: Dict[str, Any] = {
-        "decimal": ".",
-        "thousands": ",",
-        "raise": True,
-        **config,
-    }
+    # The tokenizer is only created when a format string has to be parsed, but invalid options should fail here.
+    check_parser(full_config["parser"])
+    decimal_char = full_config["decimal"]
+    thousands_char = full_config["thousands"]
+    renderer = full_config["renderer"]
+    fast_path = full_config["fast_path"]
 
-    parser = FormatStringParser(
-        decimal_char=full_config["decimal"],
-        thousands_char=full_config["thousands"],
-    )
-    visitor = FormatStringVisitor(
-        decimal_char=full_config["decimal"],
-        thousands_char=full_config["thousands"],
-    )
+    def compile_for_text(fmt: str) -> CompiledFormat:
+        compiled = compile_format(fmt, full_config)
+        return with_fast_renderer(compiled) if fast_path else compiled
 
     def t(value: Any, fmt: str) -> Union[str, ExcelError]:
         """
@@ -51,20 +125,11 @@ def get_text_function(
         :return: The formatted string.
         """
         try:
-            tree = parser.parse(fmt)
-            tokens = visitor.visit(tree)
-            # TODO: Try not to do stuff in-place, because it prevents proper type checking.
-            preprocess(tokens)
-            return_string = ""
-            filler_chars = ""
-            for token in tokens:
-                entry = token.render(value)
-                if hasattr(token, "thousands_char"):
-                    if entry[0] == "-":
-                        filler_chars += "-"
-                        entry = entry[1:]
-                return_string += entry
-            return filler_chars + return_string
+            compiled = cache.get_or_create(
+                (decimal_char, thousands_char, renderer, fast_path, fmt),
+                lambda: compile_for_text(fmt),
+            )
+            return compiled.render(value)
 
         except ExcelError as e:
             if full_config["raise"]:
@@ -75,5 +140,22 @@ def get_text_function(
     return t
 
 
-if __name__ == "__main__":
-    text = get_text_function({"decimal": ".", "thousands": ",", "raise": False})
+def warm_up(*configs: Optional[Dict[str, Any]]) -> None:
+    """
+    Build the tokenizers for the given configs up front, so that the first format strings don't have to wait for it.
+
+    Tokenizers are shared by all text functions with the same `decimal`, `thousands` and `parser` options, so this only
+    needs to be done once per locale, e.g. at startup.
+
+    >>> warm_up({"decimal": ",", "thousands": "."}, {"decimal": ".", "thousands": " "})
+
+    :param configs: Dictionaries with config options, like for :func:`get_text_function`. Without any, the default
+        config is warmed up.
+    """
+    for config in configs or [None]:
+        full_config = get_full_config(config)
+        tokenizer = get_tokenizer(
+            full_config["decimal"], full_config["thousands"], full_config["parser"]
+        )
+        # Everything is built lazily on first use, so tokenize a trivial format string.
+        tokenizer.tokenize("0")
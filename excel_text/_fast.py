@@ -0,0 +1,185 @@
+"""
+Hand-written renderers for the most common format strings, which text functions use instead of interpreting tokens.
+
+A format string is classified once, when it is compiled: date and time formats and "@" by an exact-match table, and
+numbers, percentages and literals by a regular expression. The renderers give exactly the same results as the tokens,
+including their rounding. For values that they can't render the same way, e.g. subclasses of `int` or years before
+1000, they fall back to the compiled format.
+"""
+
+import re
+from dataclasses import replace
+from functools import lru_cache
+from typing import Any, Callable, Dict, Optional, Pattern
+
+from excel_dates import ensure_python_date, ensure_python_time
+
+from excel_text._compiled import CompiledFormat
+from excel_text._numbers import scale_decimal
+from excel_text._tokens import NumberToken, StringToken, VerbatimToken
+
+Renderer = Callable[[Any], str]
+
+_DATE_TEMPLATES = {
+    "yyyy-mm-dd": "{y}-{m:02d}-{d:02d}",
+    "yyyy/mm/dd": "{y}/{m:02d}/{d:02d}",
+    "dd/mm/yyyy": "{d:02d}/{m:02d}/{y}",
+    "mm/dd/yyyy": "{m:02d}/{d:02d}/{y}",
+    "hh:mm": "{H:02d}:{M:02d}",
+    "hh:mm:ss": "{H:02d}:{M:02d}:{S:02.0f}",
+    "yyyy-mm-dd hh:mm": "{y}-{m:02d}-{d:02d} {H:02d}:{M:02d}",
+    "yyyy-mm-dd hh:mm:ss": "{y}-{m:02d}-{d:02d} {H:02d}:{M:02d}:{S:02.0f}",
+}
+"""
+Date and time formats, as templates with the year, month and day, and the hours, minutes and seconds.
+"""
+
+_LITERAL = re.compile(r'(?:"[^"]+")+')
+
+
+def with_fast_renderer(compiled: CompiledFormat) -> CompiledFormat:
+    """
+    Use a hand-written renderer for a compiled format, if there is one for its format string.
+
+    >>> from excel_text import compile_format
+    >>> fast = with_fast_renderer(compile_format("#,##0.00"))
+    >>> fast.renderer is not None, fast.render(1234.5678), fast.render(-1234.5678)
+    (True, '1,234.57', '-1,234.57')
+
+    :return: The compiled format with the renderer, or the compiled format itself.
+    """
+    renderer = fast_renderer(compiled)
+    if renderer is None:
+        return compiled
+    return replace(compiled, renderer=renderer)
+
+
+def fast_renderer(compiled: CompiledFormat) -> Optional[Renderer]:
+    """
+    A hand-written renderer for a compiled format, which falls back to it for values that it doesn't handle.
+
+    :return: The renderer, or `None` if the format string is not a common one.
+    """
+    fmt = compiled.fmt
+    tokens = compiled.tokens
+    fallback = compiled.renderer or compiled.render
+
+    if fmt == "@" and tokens == (StringToken(),):
+        return str
+
+    template = _DATE_TEMPLATES.get(fmt)
+    # With unusual separators, some of the characters can be part of a number instead.
+    if template is not None and not any(isinstance(t, NumberToken) for t in tokens):
+        return date_renderer(template, fallback)
+
+    if _LITERAL.fullmatch(fmt) and all(type(t) is VerbatimToken for t in tokens):
+        literal = "".join(t.text for t in tokens)
+        return lambda value: literal
+
+    match = number_pattern(compiled.decimal_char, compiled.thousands_char).fullmatch(
+        fmt
+    )
+    if (
+        match is None
+        or tokens != (NumberToken(fmt, compiled.decimal_char, compiled.thousands_char),)
+        # The tokens group the percent sign along with the digits.
+        or (match["grouped"] and match["percent"])
+    ):
+        return None
+    return number_renderer(
+        len(match["decimals"] or ""),
+        bool(match["grouped"]),
+        bool(match["percent"]),
+        compiled.decimal_char,
+        compiled.thousands_char,
+        fallback,
+    )
+
+
+@lru_cache(maxsize=None)
+def number_pattern(decimal_char: str, thousands_char: str) -> Pattern[str]:
+    """
+    The number formats with fast renderers, e.g. "0", "0.00", "#,##0", "#,##0.00", "0%" and "0.00%".
+    """
+    dec = re.escape(decimal_char)
+    thou = re.escape(thousands_char)
+    return re.compile(
+        rf"(?P<grouped>#{thou}##)?0(?:{dec}(?P<decimals>0+))?(?P<percent>%)?"
+    )
+
+
+def number_renderer(
+    decimals: int,
+    grouped: bool,
+    percent: bool,
+    decimal_char: str,
+    thousands_char: str,
+    fallback: Renderer,
+) -> Renderer:
+    """
+    Render numbers like :func:`excel_text._numbers.render_fixed`, but with `format()` for the thousands separators and
+    the leading zeros of the decimals, instead of a layout.
+
+    :param decimals: The number of decimals.
+    :param grouped: Whether thousands are separated.
+    :param percent: Whether the number is a percentage.
+    :param fallback: Renders the values that this doesn't.
+    """
+    suffix = "%" if percent else ""
+    shift = decimals + 2 if percent else decimals
+    unit = 10**decimals
+    replace_thousands = grouped and thousands_char != ","
+
+    def render(value: Any) -> str:
+        # Subclasses, like `bool`, may convert to strings differently.
+        if type(value) is not float and type(value) is not int:
+            return fallback(value)
+
+        scaled = scale_decimal(value, shift)
+        sign = "-" if scaled and value < 0 else ""
+        if not decimals:
+            if not grouped:
+                return f"{sign}{scaled}{suffix}"
+            characteristic = f"{scaled:,}"
+            if replace_thousands:
+                characteristic = characteristic.replace(",", thousands_char)
+            return f"{sign}{characteristic}"
+
+        integer, fraction = divmod(scaled, unit)
+        characteristic = f"{integer:,}" if grouped else str(integer)
+        if replace_thousands:
+            characteristic = characteristic.replace(",", thousands_char)
+        return f"{sign}{characteristic}{decimal_char}{fraction:0{decimals}d}{suffix}"
+
+    return render
+
+
+def date_renderer(template: str, fallback: Renderer) -> Renderer:
+    """
+    Render dates and times with `str.format()`, with the same date and time as the tokens.
+
+    :param template: See `_DATE_TEMPLATES`.
+    :param fallback: Renders the values that this doesn't.
+    """
+    uses_date = "{y}" in template
+    uses_time = "{H" in template
+
+    def render(value: Any) -> str:
+        fields: Dict[str, Any] = {}
+        # The tokens compute the date before the time, so they raise the same errors in the same order.
+        if uses_date:
+            date = ensure_python_date(value)
+            if date.year < 1000:
+                # How `strftime()` pads these depends on the platform.
+                return fallback(value)
+            fields.update(y=date.year, m=date.month, d=date.day)
+        if uses_time:
+            time = ensure_python_time(value)
+            fields.update(
+                H=time.hour,
+                M=time.minute,
+                S=time.second + time.microsecond / 1000000,
+            )
+        return template.format_map(fields)
+
+    return render
@@ -0,0 +1,222 @@
+"""
+Save compiled formats to a file, so that new processes can load them instead of parsing their format strings again.
+
+The file starts with a fixed header, followed by a pickled index, and the pickled tokens of each format:
+
+    magic (8 bytes) | file version (uint16) | index length (uint64) | index | tokens | tokens | ...
+
+The index holds the version of the package that wrote the file, a hash of the modules that define the tokens, and the
+position of the tokens of each format. The file is memory-mapped, and the tokens of a format are only unpickled when the
+format is first looked up.
+"""
+
+import hashlib
+import importlib
+import mmap
+import os
+import pickle
+import struct
+from functools import lru_cache
+from importlib import metadata
+from threading import Lock
+from typing import Any, Dict, Iterable, Optional, Tuple, Union
+
+from excel_text._compiled import CompiledFormat, create_compiled_format
+from excel_text._tokens import FormatStringToken
+
+_MAGIC = b"EXCELTXT"
+_FILE_VERSION = 1
+_HEADER = struct.Struct("<8sHQ")
+_TOKEN_MODULES = ("excel_text._condition", "excel_text._numbers", "excel_text._tokens")
+
+FormatKey = Tuple[str, str, str]
+"""
+The decimal separator, the thousands separator and the format string.
+"""
+
+
+def package_version() -> str:
+    """
+    The version of this package. Tokens are pickled by class, so files written by other versions are not used.
+    """
+    try:
+        return metadata.version("excel-text")
+    except metadata.PackageNotFoundError:
+        return "unknown"
+
+
+@lru_cache(maxsize=None)
+def schema_version() -> str:
+    """
+    A hash of the modules that define the tokens. Their pickles hold every field, including those that are
+    computed from the format string, so they only fit the code that wrote them. Checkouts that aren't installed all have
+    the same package version, and editable installs keep theirs while the code changes.
+    """
+    digest = hashlib.sha256()
+    for name in _TOKEN_MODULES:
+        module = importlib.import_module(name)
+        digest.update(name.encode())
+        if module.__file__ is None:
+            digest.update(package_version().encode())
+            continue
+        with open(module.__file__, "rb") as f:
+            digest.update(f.read())
+    return digest.hexdigest()
+
+
+def write_format_file(
+    path: Union[str, "os.PathLike[str]"],
+    formats: Iterable[str],
+    config: Optional[Dict[str, Any]] = None,
+) -> int:
+    """
+    Compile format strings, and write them to a file that can be opened with :class:`FormatFile`.
+
+    The file is written to a temporary file first, and then moved into place, so that processes that have the old file
+    open keep a consistent view of it.
+
+    >>> import os, tempfile
+    >>> path = os.path.join(tempfile.mkdtemp(), "formats.bin")
+    >>> write_format_file(path, ["$#,##0.00", "yyyy/mm/dd", "[>1000$# ##0.0"])
+    2
+
+    :param path: The file to write. It is replaced if it exists.
+    :param formats: The format strings. Those that fail to compile are left out.
+    :param config: Dictionary with config options, like for :func:`get_text_function`. Only the `decimal`, `thousands`
+        and `parser` options are relevant.
+    :return: The number of formats in the file.
+    """
+    from excel_text._factory import compile_format, get_full_config
+
+    full_config = get_full_config(config)
+    compile_config = {**full_config, "renderer": "interpreter", "format_file": None}
+
+    index: Dict[FormatKey, Tuple[int, int]] = {}
+    blobs = []
+    offset = 0
+    for fmt in dict.fromkeys(formats):
+        try:
+            tokens = compile_format(fmt, compile_config).tokens
+        except Exception:
+            # It fails again when it is used, with the same error.
+            continue
+        blob = pickle.dumps(tokens, protocol=pickle.HIGHEST_PROTOCOL)
+        index[full_config["decimal"], full_config["thousands"], fmt] = offset, len(blob)
+        blobs.append(blob)
+        offset += len(blob)
+
+    index_blob = pickle.dumps(
+        {"package": package_version(), "schema": schema_version(), "formats": index},
+        protocol=pickle.HIGHEST_PROTOCOL,
+    )
+    path = os.fspath(path)
+    temp_path = f"{path}.{os.getpid()}.tmp"
+    try:
+        with open(temp_path, "wb") as f:
+            f.write(_HEADER.pack(_MAGIC, _FILE_VERSION, len(index_blob)))
+            f.write(index_blob)
+            for blob in blobs:
+                f.write(blob)
+        os.replace(temp_path, path)
+    finally:
+        if os.path.exists(temp_path):
+            os.remove(temp_path)
+
+    return len(index)
+
+
+class FormatFile:
+    """
+    A file of compiled formats, written by :func:`write_format_file`.
+
+    Pass it as the `format_file` config option, and text functions and :func:`compile_format` look up format strings
+    here before parsing them. The file is memory-mapped, so opening it is cheap no matter how many formats it holds.
+
+    Files written by another version of this package, or by a checkout with other token code, are treated as empty. The
+    tokens are unpickled, so only open files that you wrote yourself.
+
+    >>> import os, tempfile
+    >>> from excel_text import get_text_function
+    >>> path = os.path.join(tempfile.mkdtemp(), "formats.bin")
+    >>> write_format_file(path, ["$#,##0.00"])
+    1
+    >>> with FormatFile(path) as format_file:
+    ...     get_text_function({"format_file": format_file})(1234.5678, "$#,##0.00")
+    '$1,234.57'
+
+    :param path: The file to open.
+    """
+
+    def __init__(self, path: Union[str, "os.PathLike[str]"]) -> None:
+        self.path = os.fspath(path)
+        with open(self.path, "rb") as f:
+            size = os.fstat(f.fileno()).st_size
+            if size < _HEADER.size:
+                raise ValueError(f"Not a format file: {self.path!r}")
+            self._mmap = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+
+        magic, file_version, index_length = _HEADER.unpack_from(self._mmap)
+        if magic != _MAGIC:
+            self._mmap.close()
+            raise ValueError(f"Not a format file: {self.path!r}")
+
+        self._data_start = _HEADER.size + index_length
+        self._index: Dict[FormatKey, Tuple[int, int]] = {}
+        # The tokens of the formats that were looked up. A file may be shared between threads, hence the lock.
+        self._tokens: Dict[FormatKey, Tuple[FormatStringToken, ...]] = {}
+        self._lock = Lock()
+        if file_version == _FILE_VERSION:
+            index = pickle.loads(self._mmap[_HEADER.size : self._data_start])
+            if (index["package"], index.get("schema")) == (
+                package_version(),
+                schema_version(),
+            ):
+                self._index = index["formats"]
+
+    def get(
+        self,
+        fmt: str,
+        decimal_char: str = ".",
+        thousands_char: str = ",",
+        renderer: str = "interpreter",
+    ) -> Optional[CompiledFormat]:
+        """
+        Load a compiled format from the file.
+
+        :param renderer: See :func:`excel_text._compiled.create_compiled_format`.
+        :return: The compiled format, or `None` if the file doesn't have it.
+        """
+        key = decimal_char, thousands_char, fmt
+        tokens = self._tokens.get(key)
+        if tokens is None:
+            location = self._index.get(key)
+            if location is None:
+                return None
+
+            offset, length = location
+            start = self._data_start + offset
+            tokens = pickle.loads(self._mmap[start : start + length])
+            with self._lock:
+                tokens = self._tokens.setdefault(key, tokens)
+        return create_compiled_format(
+            fmt, decimal_char, thousands_char, tokens, renderer
+        )
+
+    def close(self) -> None:
+        self._mmap.close()
+
+    def __len__(self) -> int:
+        return len(self._index)
+
+    def __contains__(self, key: object) -> bool:
+        return key in self._index
+
+    def __enter__(self) -> "FormatFile":
+        return self
+
+    def __exit__(self, *args: Any) -> None:
+        self.close()
+
+    def __reduce__(self) -> Tuple[Any, ...]:
+        # A memory map can't be sent to another process, so it opens the file again instead.
+        return FormatFile, (self.path,)
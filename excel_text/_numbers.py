@@ -1,54 +1,36 @@
-from typing import Optional
+import math
+from threading import Lock
+from typing import Any, Dict, List, NamedTuple, Optional, Tuple, Union
 
 
-def insert_thousands_separator(value: str, thousands: str) -> str:
-    """
-    Insert thousands separator at appropriate locations.
-
-    :param value: String representation of a number, without thousands separators.
-    :param thousands: The thousands separator.
-
-    :return: String representation of the number, with thousands separators.
-
-    >>> insert_thousands_separator("7654321", ",")
-    '765,432,1'
+LayoutItem = Union[str, int]
+"""
+An item in a number layout: either a literal string, or the index of a digit in the value.
+"""
 
-    >>> insert_thousands_separator("654321", ";")
-    '654;321'
 
-    >>> insert_thousands_separator("54321", "_")
-    '543_21'
-
-    >>> insert_thousands_separator("0987654321", " ")
-    '098 765 432 1'
-
-    >>> insert_thousands_separator("432", ",")
-    '432'
-
-    >>> insert_thousands_separator("0", ",")
-    '0'
+def characteristic_layout(
+    fmt: str,
+    thousands_char: str,
+    n_digits: int,
+) -> Tuple[LayoutItem, ...]:
     """
-    value_left_side_rev = value
-    for counter in range(1, (len(value) - 1) // 3 + 1):
-        pos = counter * 3 + counter - 1
-        value_left_side_rev = (
-            f"{value_left_side_rev[:pos]}{thousands}{value_left_side_rev[pos:]}"
-        )
-    return value_left_side_rev
+    Work out what the format before the decimal point renders for any number with `n_digits` digits, without looking at
+    the digits themselves. Digits are referred to by their power of ten, so `0` is the rightmost digit.
 
+    >>> characteristic_layout("#,##0", ",", 4)
+    (3, ',', 2, 1, 0)
 
-def render_characteristic(
-    fmt: str,
-    thousands_char: str,
-    values: str,
-) -> str:
-    values_iter = iter(values[::-1])
-    return_string = ""
-    filler = ""
+    >>> characteristic_layout("0000", ",", 2)
+    ('0', '0', 1, 0)
 
-    has_thousands_seperator = thousands_char in fmt
+    >>> characteristic_layout("##0° 00", ",", 5)
+    (4, 3, 2, '°', ' ', 1, 0)
+    """
+    values_iter = iter(range(n_digits))
+    items_rev: List[LayoutItem] = []
 
-    value: Optional[str]
+    value: Optional[LayoutItem]
     for character in fmt[::-1]:
         if character in "0#?":
             if character == "0":
@@ -57,59 +39,402 @@ def render_characteristic(
                 value = next(values_iter, None)
             if value is None:
                 break
-            elif value.isnumeric():
-                return_string += value
-            else:
-                filler += value
-                return_string += "0"
+            items_rev.append(value)
         else:
             if character != thousands_char:
-                return_string += character
+                items_rev.append(character)
 
-    for character in list(values_iter):
-        return_string += character
+    items_rev.extend(values_iter)
 
-    if has_thousands_seperator:
-        return_string = insert_thousands_separator(return_string, thousands_char)
+    if thousands_char in fmt:
+        # A separator after every three items, counted from the right, in one pass instead of an insert for each.
+        grouped: List[LayoutItem] = []
+        for i, item in enumerate(items_rev):
+            if i and not i % 3:
+                grouped.append(thousands_char)
+            grouped.append(item)
+        items_rev = grouped
 
-    return_string += filler
-    return return_string[::-1]
+    return tuple(items_rev[::-1])
 
 
-def render_mantissa(
-    fmt: str,
-    values: str,
-) -> str:
-    _counter = 0
-    n_sig_figs = calculate_num_significant_figures(fmt)
+_cache_lock = Lock()
+"""
+Guards the templates and layouts that :class:`CharacteristicFormat` adds as it meets new numbers of digits. They are
+rarely added, so all formats share one lock.
+"""
+
+
+class CharacteristicFormat:
+    """
+    The format before the decimal point. It renders digits with a template for their number, which is built the first
+    time that a number with that many digits is rendered, and then kept with the format. There is no bound on the
+    number of digits of an integer, so they can't all be built up front.
+
+    Compiled formats are shared between threads, so the templates are only added while holding a lock. Reading them
+    needs none: an entry is never changed or removed once it is added, and threads that race to build one build the
+    same.
+
+    >>> CharacteristicFormat("#,##0", ",").render("1234")
+    '1,234'
+    """
+
+    __slots__ = ("fmt", "thousands_char", "_templates", "_layouts")
+
+    def __init__(self, fmt: str, thousands_char: str) -> None:
+        self.fmt = fmt
+        self.thousands_char = thousands_char
+        self._templates: Dict[int, str] = {}
+        self._layouts: Dict[int, Tuple[LayoutItem, ...]] = {}
+
+    def layout(self, n_digits: int) -> Tuple[LayoutItem, ...]:
+        """
+        See :func:`characteristic_layout`.
+        """
+        items = self._layouts.get(n_digits)
+        if items is None:
+            items = characteristic_layout(self.fmt, self.thousands_char, n_digits)
+            with _cache_lock:
+                items = self._layouts.setdefault(n_digits, items)
+        return items
+
+    def render(self, digits: str) -> str:
+        """
+        :param digits: The digits of a number without a sign, e.g. `str(integer)`.
+        """
+        template = self._templates.get(len(digits))
+        if template is None:
+            template = characteristic_template(
+                self.fmt, self.thousands_char, len(digits)
+            )
+            with _cache_lock:
+                template = self._templates.setdefault(len(digits), template)
+        return template.format(digits)
+
+    def __repr__(self) -> str:
+        return f"CharacteristicFormat({self.fmt!r}, {self.thousands_char!r})"
+
+    def __reduce__(self) -> Tuple[Any, ...]:
+        # The templates are built again when they are needed.
+        return CharacteristicFormat, (self.fmt, self.thousands_char)
+
+
+def mantissa_layout(fmt: str) -> Tuple[LayoutItem, ...]:
+    """
+    Work out what the format after the decimal point renders. Digits are referred to by their position after the
+    decimal point, so `0` is the first decimal.
+
+    >>> mantissa_layout("00%")
+    (0, 1, '%')
 
-    values_iter = iter(values)
-    return_string = ""
-    sig_figs_counter = 0
+    >>> mantissa_layout("0 0")
+    (0, ' ', 1)
+    """
+    items: List[LayoutItem] = []
+    position = 0
     for character in fmt:
-        _counter += 1
         if character in "0#?":
-            sig_figs_counter += 1
-            value = next(values_iter, "0")
-            if _counter != n_sig_figs:
-                return_string += value
-            else:
-                return_str = str(
-                    int(value) + int((int(next(values_iter, "0")) + 5) / 10)
-                )
-                if len(return_str) == 1:
-                    return_string += return_str
-                else:
-                    return_string = (
-                        return_string[:-1] + str(int(return_string[-1]) + 1) + "0"
-                    )
+            items.append(position)
+            position += 1
         else:
-            return_string += character
-    return return_string
+            items.append(character)
+    return tuple(items)
+
+
+class NumberLayout(NamedTuple):
+    """
+    How a number format renders values, worked out once from the format, so that rendering doesn't have to analyse it
+    again. See :func:`number_layout`.
+    """
 
+    characteristic: CharacteristicFormat
+    """
+    The format before the decimal point. Its layout depends on the number of digits.
+    """
+    mantissa_template: str
+    """
+    A `str.format()` template that takes the decimals as a string.
+    """
+    n_decimals: int
+    """
+    The number of decimals that the value is rounded to.
+    """
+    integer: bool
+    """
+    Whether there is no mantissa, so that not even the decimal separator is rendered.
+    """
+    percent: bool
+    exponent: str
+    """
+    The format of the exponent, or an empty string if there is none.
+    """
+    exponent_templates: Tuple[str, str]
+    """
+    `str.format()` templates for positive and negative exponents, e.g. `("E+{:02d}", "E-{:02d}")`. They take the
+    absolute value of the exponent, or if it is not padded, its digits already rendered as a string.
+    """
+    exponent_characteristic: Optional[CharacteristicFormat]
+    """
+    If the format of the exponent has characters other than digits, it is rendered like a characteristic with this.
+    Otherwise, the templates pad it with zeros.
+    """
+    exponent_step: int
+    """
+    The exponent is a multiple of this. It is more than 1 for engineering formats, like "##0.0E+0".
+    """
+    exponent_offset: int
+    """
+    How much the exponent is lowered, so that the number has as many digits before the decimal point as the format.
+    """
+    scientific_limit: int
+    """
+    The scaled mantissa of a number in scientific notation is less than this. Otherwise, the exponent is too small.
+    """
+
+
+def number_layout(
+    fmt: str,
+    characteristic: str,
+    mantissa: Optional[str],
+    exponent: Optional[str],
+    thousands_char: str,
+    exponent_sign: str = "+",
+) -> NumberLayout:
+    """
+    Work out how a number format renders values.
 
-def calculate_num_significant_figures(fmt_right: str) -> int:
-    total = 0
-    for character in "0#?":
-        total += fmt_right.count(character)
-    return total
+    >>> number_layout("#,##0.0 0%", "#,##0", "0 0%", None, ",").mantissa_template
+    '{0:.1} {0[1]}%'
+
+    >>> layout = number_layout("##0.0E+00", "##0", "0", "00", ",")
+    >>> layout.exponent_templates, layout.exponent_step, layout.scientific_limit
+    (('E+{:02d}', 'E-{:02d}'), 3, 10000)
+
+    :param fmt: The whole number format.
+    :param characteristic: The format before the decimal point.
+    :param mantissa: The format after the decimal point, if there is one.
+    :param exponent: The format of the exponent, if there is one.
+    :param exponent_sign: "+" if positive exponents have a plus sign, or "-" if only negative exponents have a sign.
+    """
+    items = mantissa_layout(mantissa or "")
+    n_decimals = sum(isinstance(item, int) for item in items)
+    n_digits = sum(character in "0#?" for character in characteristic)
+    # Like Excel, optional digits before the decimal point make it engineering notation.
+    engineering = n_digits > 1 and any(
+        character in "#?" for character in characteristic
+    )
+    padded = all(character in "0#" for character in exponent or "")
+    digits = f"{{:0{(exponent or '').count('0')}d}}" if padded else "{}"
+    return NumberLayout(
+        characteristic=CharacteristicFormat(characteristic, thousands_char),
+        mantissa_template=layout_template(items),
+        n_decimals=n_decimals,
+        integer=bool(characteristic) and not mantissa,
+        percent="%" in fmt,
+        exponent=exponent or "",
+        exponent_templates=(
+            f"E+{digits}" if exponent_sign == "+" else f"E{digits}",
+            f"E-{digits}",
+        ),
+        exponent_characteristic=(
+            None if padded else CharacteristicFormat(exponent or "", "")
+        ),
+        exponent_step=n_digits if engineering else 1,
+        exponent_offset=0 if engineering else n_digits - 1,
+        scientific_limit=10 ** (n_digits + n_decimals),
+    )
+
+
+def scale_decimal(value: Union[float, int], decimals: int) -> int:
+    """
+    The absolute value of a number times `10 ** decimals`, rounded half away from zero, like Excel does.
+
+    Floats are rounded by their shortest decimal representation, the one that `repr()` shows, with integer arithmetic.
+    So the result is exact, without binary artefacts like `2.675 * 100 == 267.49999999999997`.
+
+    >>> scale_decimal(2.675, 2), scale_decimal(-0.125, 2), scale_decimal(2.5, 0), scale_decimal(1e-05, 2)
+    (268, 13, 3, 0)
+    >>> scale_decimal(0.58, 3), scale_decimal(1.5e+20, -18), scale_decimal(12, 2)
+    (580, 150, 1200)
+
+    :param decimals: The number of decimals to keep. Negative numbers round to tens, hundreds and so on.
+    :raises ValueError: For NaN.
+    :raises OverflowError: For infinity.
+    """
+    if not isinstance(value, float):
+        whole, fraction, exponent = str(abs(int(value))), "", ""
+    else:
+        # Not `repr()`, which is different for subclasses, like NumPy floats.
+        text = float.__repr__(value)
+        if text[-1] in "nf":
+            # Fails like `int()`.
+            int(value)
+        mantissa, _, exponent = text.lstrip("-").partition("e")
+        whole, _, fraction = mantissa.partition(".")
+
+    digits = int(whole + fraction)
+    shift = decimals - len(fraction) + (int(exponent) if exponent else 0)
+    if shift >= 0:
+        factor: int = 10**shift
+        return digits * factor
+
+    unit: int = 10**-shift
+    scaled, remainder = divmod(digits, unit)
+    return scaled + (remainder * 2 >= unit)
+
+
+def render_fixed(
+    layout: NumberLayout,
+    decimal_char: str,
+    value: Union[float, int],
+) -> str:
+    """
+    Render a number without an exponent. The value is rounded once, and its digits before and after the decimal point
+    both come from that.
+
+    >>> render_fixed(number_layout("#,##0.00", "#,##0", "00", None, ","), ".", -1234.565)
+    '-1,234.57'
+
+    :return: The rendered number, with a leading minus sign if it is negative and doesn't round to zero.
+    """
+    n_decimals = layout.n_decimals
+    scaled = scale_decimal(value, n_decimals + 2 if layout.percent else n_decimals)
+    return render_scaled(layout, decimal_char, scaled, bool(scaled) and value < 0)
+
+
+def render_scaled(
+    layout: NumberLayout,
+    decimal_char: str,
+    scaled: int,
+    negative: bool,
+) -> str:
+    """
+    Render a number that has already been rounded, as an integer of its absolute value times `10 ** n_decimals`.
+    """
+    n_decimals = layout.n_decimals
+    integer, fraction = divmod(scaled, 10**n_decimals)
+
+    characteristic = layout.characteristic.render(str(integer))
+    if negative:
+        characteristic = f"-{characteristic}"
+    if layout.integer:
+        return characteristic
+
+    mantissa = layout.mantissa_template.format(f"{fraction:0{n_decimals}d}")
+    return f"{characteristic}{decimal_char}{mantissa}"
+
+
+_LOG10_2 = math.log10(2)
+
+min_power_of_ten = -323
+powers_of_ten = tuple(float(f"1e{k}") for k in range(min_power_of_ten, 309))
+"""
+The floats nearest to the powers of ten, parsed so that they are correctly rounded, unlike `10.0 ** k`.
+"""
+
+
+def scale_scientific(layout: NumberLayout, value: Union[float, int]) -> Tuple[int, int]:
+    """
+    Round a number to scientific notation: its mantissa scaled like :func:`scale_decimal`, and its exponent.
+
+    The power of ten of the leading digit is estimated from the binary exponent of the value, which gives it or one
+    less, and corrected by comparing the value to the next power of ten. Then the mantissa is rounded, and if that has
+    too many digits, because rounding carried into another digit, the exponent is raised.
+
+    >>> layout = number_layout("0.00E+00", "0", "00", "00", ",")
+    >>> scale_scientific(layout, 12200000), scale_scientific(layout, -0.000123), scale_scientific(layout, 9.999)
+    ((122, 7), (123, -4), (100, 1))
+
+    :raises ValueError: For NaN.
+    :raises OverflowError: For infinity.
+    """
+    if not value:
+        return 0, 0
+
+    if isinstance(value, float):
+        power = math.floor((math.frexp(value)[1] - 1) * _LOG10_2)
+        # Only larger than the power of ten if it is larger than the float nearest to it, so this never overshoots.
+        if power < 308 and abs(value) > powers_of_ten[power + 1 - min_power_of_ten]:
+            power += 1
+    else:
+        power = len(str(abs(int(value)))) - 1
+
+    shift = layout.n_decimals
+    if layout.percent:
+        power += 2
+        shift += 2
+    step = layout.exponent_step
+    exponent = power // step * step - layout.exponent_offset
+
+    scaled = scale_decimal(value, shift - exponent)
+    while scaled >= layout.scientific_limit:
+        exponent += step
+        scaled = scale_decimal(value, shift - exponent)
+    return scaled, exponent
+
+
+def render_exponent(layout: NumberLayout, exponent: int) -> str:
+    """
+    Render the exponent of a number in scientific notation, including the "E" and its sign.
+
+    >>> render_exponent(number_layout("0.00E+00", "0", "00", "00", ","), -4)
+    'E-04'
+    """
+    template = layout.exponent_templates[exponent < 0]
+    if layout.exponent_characteristic is None:
+        return template.format(abs(exponent))
+    return template.format(layout.exponent_characteristic.render(str(abs(exponent))))
+
+
+def render_scientific(
+    layout: NumberLayout,
+    decimal_char: str,
+    value: Union[float, int],
+) -> str:
+    """
+    Render a number in scientific notation.
+
+    >>> layout = number_layout("0.00E+00", "0", "00", "00", ",")
+    >>> render_scientific(layout, ".", 12200000), render_scientific(layout, ".", 1 / 3)
+    ('1.22E+07', '3.33E-01')
+    """
+    scaled, exponent = scale_scientific(layout, value)
+    return render_scaled(
+        layout, decimal_char, scaled, bool(scaled) and value < 0
+    ) + render_exponent(layout, exponent)
+
+
+def layout_template(items: Tuple[LayoutItem, ...]) -> str:
+    """
+    Turn a layout into a `str.format()` template that takes the digits as a string. Here, digits are referred to by
+    their index in that string.
+
+    >>> layout_template((0, 1, "%", 3))
+    '{0:.2}%{0[3]}'
+    """
+    # Leading digits that are in the same order as in the string are one field, which is cheaper than one per digit.
+    n_leading = 0
+    while n_leading < len(items) and items[n_leading] == n_leading:
+        n_leading += 1
+
+    template = f"{{0:.{n_leading}}}" if n_leading else ""
+    for item in items[n_leading:]:
+        if isinstance(item, int):
+            template += f"{{0[{item}]}}"
+        else:
+            template += item.replace("{", "{{").replace("}", "}}")
+    return template
+
+
+def characteristic_template(fmt: str, thousands_char: str, n_digits: int) -> str:
+    """
+    A `str.format()` template that renders the digits of any number with `n_digits` digits, like
+    :func:`characteristic_layout`.
+
+    >>> characteristic_template("#,##0", ",", 4)
+    '{0:.1},{0[1]}{0[2]}{0[3]}'
+    """
+    items = characteristic_layout(fmt, thousands_char, n_digits)
+    return layout_template(
+        tuple(n_digits - 1 - item if isinstance(item, int) else item for item in items)
+    )
@@ -0,0 +1,169 @@
+"""
+Format many values in multiple worker processes.
+"""
+
+import math
+import os
+from concurrent.futures import ProcessPoolExecutor
+from itertools import chain
+from typing import Any, Dict, Iterable, List, Optional, Tuple, Union
+
+from excel_text._array import HAS_NUMPY, render_array
+from excel_text._batch import as_list, render_values
+from excel_text._compiled import CompiledFormat
+from excel_text._errors import ExcelError
+from excel_text._factory import compile_format, get_full_config
+
+if HAS_NUMPY:
+    import numpy as np
+    from multiprocessing.shared_memory import SharedMemory
+
+_worker_compiled: Optional[CompiledFormat] = None
+_worker_shared: Optional[Tuple["SharedMemory", "np.ndarray[Any, Any]"]] = None
+"""
+The state of a worker process, which is set up once by :func:`init_worker`.
+"""
+
+
+def text_parallel(
+    values: Iterable[Any],
+    fmt: str,
+    config: Optional[Dict[str, Any]] = None,
+    workers: Optional[int] = None,
+    chunksize: Optional[int] = None,
+) -> List[Union[str, ExcelError]]:
+    """
+    The same as :func:`text_many`, but the values are formatted by multiple worker processes.
+
+    The format string and config are sent to each worker once, and the values are sent in contiguous chunks. Numeric
+    NumPy arrays are not sent at all, but shared with the workers through shared memory.
+
+    Errors are the same as those of :func:`text_many`: if the `raise` option is on, the error of the first value that
+    fails is raised, and otherwise errors are returned in place.
+
+    :param values: Values that will be formatted.
+    :param fmt: The format string that describes how the output should look.
+    :param config: Dictionary with config options, like for :func:`get_text_function`.
+    :param workers: The number of worker processes. Defaults to the number of CPUs.
+    :param chunksize: The number of values per chunk. Defaults to a few chunks per worker.
+    :return: The formatted strings (or errors), in the same order as the values.
+    """
+    full_config = get_full_config(config)
+    # The cache can't be sent to other processes, and is not used anyway.
+    full_config.pop("cache", None)
+    raise_errors = full_config["raise"]
+
+    array = None
+    value_list: List[Any] = []
+    if HAS_NUMPY and isinstance(values, np.ndarray) and values.dtype.kind in "iuf":
+        array = values.ravel()
+        n = len(array)
+    else:
+        value_list = as_list(values)
+        n = len(value_list)
+
+    # Fail early, and only once, for invalid format strings.
+    try:
+        compiled = compile_format(fmt, full_config)
+    except ExcelError as e:
+        if raise_errors:
+            raise e
+        return [e] * n
+
+    if workers is None:
+        workers = os.cpu_count() or 1
+    ranges = chunk_ranges(n, workers, chunksize)
+    if workers <= 1 or len(ranges) <= 1:
+        if array is not None:
+            strings: List[Union[str, ExcelError]] = render_array(
+                compiled, array, raise_errors
+            ).tolist()
+            return strings
+        return render_values(compiled, value_list, raise_errors)
+
+    shared = None
+    shared_args = None
+    if array is not None:
+        shared = SharedMemory(create=True, size=max(array.nbytes, 1))
+        np.ndarray(array.shape, array.dtype, buffer=shared.buf)[:] = array
+        shared_args = shared.name, n, array.dtype.str
+
+    try:
+        with ProcessPoolExecutor(
+            max_workers=min(workers, len(ranges)),
+            initializer=init_worker,
+            initargs=(fmt, full_config, shared_args),
+        ) as executor:
+            if shared is None:
+                chunks = executor.map(
+                    render_chunk,
+                    [value_list[start:stop] for start, stop in ranges],
+                    [raise_errors] * len(ranges),
+                )
+            else:
+                chunks = executor.map(
+                    render_shared_chunk, ranges, [raise_errors] * len(ranges)
+                )
+            # The chunks come back in order, and the error of the first chunk that failed is raised.
+            return list(chain.from_iterable(chunks))
+    finally:
+        if shared is not None:
+            shared.close()
+            shared.unlink()
+
+
+def chunk_ranges(
+    n: int,
+    workers: int,
+    chunksize: Optional[int],
+) -> List[Tuple[int, int]]:
+    """
+    Split `n` values into contiguous chunks.
+
+    >>> chunk_ranges(10, 1, 4)
+    [(0, 4), (4, 8), (8, 10)]
+
+    :param chunksize: The number of values per chunk. Defaults to a few chunks per worker.
+    :return: The start and stop index of each chunk.
+    """
+    if chunksize is None:
+        chunksize = max(math.ceil(n / (workers * 4)), 1)
+    if chunksize < 1:
+        raise ValueError(f"chunksize must be positive, not {chunksize}.")
+    return [(start, min(start + chunksize, n)) for start in range(0, n, chunksize)]
+
+
+def init_worker(
+    fmt: str,
+    config: Dict[str, Any],
+    shared: Optional[Tuple[str, int, str]],
+) -> None:
+    """
+    Compile the format string once per worker, and attach to the shared values, if any.
+    """
+    global _worker_compiled, _worker_shared
+    _worker_compiled = compile_format(fmt, config)
+    if shared is not None:
+        name, n, dtype = shared
+        memory = SharedMemory(name=name)
+        _worker_shared = memory, np.ndarray((n,), dtype, buffer=memory.buf)
+
+
+def render_chunk(
+    values: List[Any],
+    raise_errors: bool,
+) -> List[Union[str, ExcelError]]:
+    assert _worker_compiled is not None
+    return render_values(_worker_compiled, values, raise_errors)
+
+
+def render_shared_chunk(
+    start_stop: Tuple[int, int],
+    raise_errors: bool,
+) -> List[Union[str, ExcelError]]:
+    assert _worker_compiled is not None and _worker_shared is not None
+    start, stop = start_stop
+    strings: List[Union[str, ExcelError]] = render_array(
+        _worker_compiled, _worker_shared[1][start:stop], raise_errors
+    ).tolist()
+    return strings
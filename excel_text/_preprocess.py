@@ -1,4 +1,5 @@
-from typing import List
+from dataclasses import replace
+from typing import List, Sequence, Tuple
 
 from excel_text._tokens import (
     FormatStringToken,
@@ -17,74 +18,100 @@ from excel_text._tokens import (
 from excel_text._errors import ValueExcelError
 
 
-def preprocess(tokens: List[FormatStringToken]) -> None:
+def preprocess(tokens: Sequence[FormatStringToken]) -> Tuple[FormatStringToken, ...]:
     """
-    Preparse the token list. The list is modified in place.
+    Preparse the token list.
 
-    Some tokens are influenced by the presence of other tokens in the list. This is handled here.
+    Some tokens are influenced by the presence of other tokens in the list. This is handled here. Tokens are immutable,
+    so those are replaced by new tokens, in a new list. The given tokens are left as they are.
 
     :param tokens: The list of tokens to process.
+    :return: The processed tokens.
     """
-    preprocess_conditionals(tokens)
-    preprocess_month_minute(tokens)
-    preprocess_am_pm(tokens)
+    processed = preprocess_conditionals(tokens)
+    processed = preprocess_month_minute(processed)
+    processed = preprocess_am_pm(processed)
+    return tuple(processed)
 
 
-def preprocess_conditionals(tokens: List[FormatStringToken]) -> None:
+def preprocess_conditionals(
+    tokens: Sequence[FormatStringToken],
+) -> List[FormatStringToken]:
     """
     Condition tokens contain their own lists of tokens, which must also be pre-processed.
     """
+    processed: List[FormatStringToken] = []
     for t in tokens:
         if isinstance(t, BinaryConditionalToken):
-            preprocess(t.true_tokens)
-            preprocess(t.false_tokens)
+            t = replace(
+                t,
+                true_tokens=preprocess(t.true_tokens),
+                false_tokens=preprocess(t.false_tokens),
+            )
         if isinstance(t, TernaryConditionalToken):
-            preprocess(t.lt_tokens)
-            preprocess(t.eq_tokens)
-            preprocess(t.gt_tokens)
+            t = replace(
+                t,
+                lt_tokens=preprocess(t.lt_tokens),
+                eq_tokens=preprocess(t.eq_tokens),
+                gt_tokens=preprocess(t.gt_tokens),
+            )
         if isinstance(t, VerbatimToken):
             if t.text == "[":
                 raise ValueExcelError(
                     "A value used in the formula is of the wrong data type."
                 )
+        processed.append(t)
+    return processed
 
 
-def preprocess_month_minute(tokens: List[FormatStringToken]) -> None:
+def preprocess_month_minute(
+    tokens: Sequence[FormatStringToken],
+) -> List[FormatStringToken]:
     """
     Detect when "m" means "month" and when it means "minute".
     """
+    processed = list(tokens)
+
     last_date_token = None
     for i, token in enumerate(tokens):
         if isinstance(token, MonthOrMinuteToken):
             if isinstance(last_date_token, (YearToken, DayToken)):
                 # It follows "year" or "day", so it must mean "month".
-                tokens[i] = MonthToken(token.text)
+                processed[i] = MonthToken(token.text)
             else:
-                tokens[i] = MinuteToken(token.text)
+                processed[i] = MinuteToken(token.text)
 
         if isinstance(token, DateToken):
             last_date_token = token
 
     last_date_token = None
-    for i, token in reversed(list(enumerate(tokens))):
+    for i, token in reversed(list(enumerate(processed))):
         if isinstance(token, (MonthOrMinuteToken, MinuteToken)):
             if isinstance(last_date_token, (YearToken, DayToken)):
                 # It leads "year" or "day", so it must mean "month".
-                tokens[i] = MonthToken(token.text)
+                processed[i] = MonthToken(token.text)
 
         if isinstance(token, DateToken):
             last_date_token = token
 
+    return processed
+
 
-def preprocess_am_pm(tokens: List[FormatStringToken]) -> None:
+def preprocess_am_pm(tokens: Sequence[FormatStringToken]) -> List[FormatStringToken]:
     """
     If AM/PM is present, switch all hour tokens to 12-hour mode.
     """
-    last_hour_token = None
+    processed = list(tokens)
+
+    last_hour_index = None
     for i, token in enumerate(tokens):
-        if isinstance(token, AmPmToken) and last_hour_token:
-            # Set the last seen hour token to twelve-hour mode.
-            last_hour_token.twelve = True
+        if isinstance(token, AmPmToken) and last_hour_index is not None:
+            # Switch the last seen hour token to twelve-hour mode.
+            processed[last_hour_index] = replace(
+                processed[last_hour_index], twelve=True
+            )
 
         if isinstance(token, HourToken):
-            last_hour_token = token
+            last_hour_index = i
+
+    return processed
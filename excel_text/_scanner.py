@@ -0,0 +1,257 @@
+"""
+A hand-written, single-pass alternative to :class:`excel_text._grammar.FormatStringParser` and
+:class:`excel_text._visitor.FormatStringVisitor`.
+
+The PEG parser builds a node for every character of most format strings, which the visitor then walks recursively.
+This scanner matches the same rules with one combined regular expression instead, in the same order, and creates the
+tokens straight away. The result is the same list of tokens, and invalid format strings raise the same parsimonious
+exceptions.
+"""
+
+import re
+from dataclasses import dataclass
+from functools import cached_property
+from typing import Callable, Dict, List, NamedTuple, Optional, Pattern, Tuple
+
+from excel_text._condition import Condition
+from excel_text._tokens import (
+    YearToken,
+    MonthOrMinuteToken,
+    FormatStringToken,
+    DayToken,
+    HourToken,
+    SecondToken,
+    VerbatimToken,
+    AmPmToken,
+    ElapsedHoursToken,
+    ElapsedMinutesToken,
+    ElapsedSecondsToken,
+    NumberToken,
+    StringToken,
+    BinaryConditionalToken,
+    TernaryConditionalToken,
+)
+
+
+class TokenError(NamedTuple):
+    """
+    A token that could not be created. Like the visitor, which only creates tokens once the whole format string has
+    been parsed, this is only raised if the format string is valid otherwise.
+    """
+
+    error: Exception
+    rule: str
+    start: int
+    end: int
+
+
+@dataclass
+class FormatStringScanner:
+    decimal_char: str
+    thousands_char: str
+
+    @cached_property
+    def expression_pattern(self) -> Pattern[str]:
+        """
+        The `expression` rule of the grammar. Like a PEG choice, a regex alternation uses the first alternative that
+        matches, so the alternatives are listed in the same order.
+        """
+        re_decimal_char = re.escape(self.decimal_char)
+        re_thousands_char = re.escape(self.thousands_char)
+
+        return re.compile(
+            "|".join(
+                [
+                    r'(?P<double_quoted>"[^\"]+")',
+                    r"(?P<single_quoted>'[^\']+')",
+                    r"(?P<ampm>(?i:am?/pm?))",
+                    r"(?P<h_elapsed>(?i:\[h+]))",
+                    r"(?P<m_elapsed>(?i:\[m+]))",
+                    r"(?P<s_elapsed>(?i:\[s+]))",
+                    r"(?P<y>(?i:y+|e+))",
+                    r"(?P<m>(?i:m+))",
+                    r"(?P<d>(?i:d+))",
+                    r"(?P<h>(?i:h+))",
+                    r"(?P<s>(?i:s+(\.0+)?))",
+                    r"(?P<colon>:+)",
+                    r"(?P<at>@+)",
+                    rf"(?P<number>[#0?%{re_decimal_char}{re_thousands_char}][^bdeghmnsy;@\[\]]*)",
+                    r"(?P<other>[^;])",
+                ]
+            )
+        )
+
+    @cached_property
+    def condition_pattern(self) -> Pattern[str]:
+        re_decimal_char = re.escape(self.decimal_char)
+        return re.compile(rf"\[(<=|>=|=|>|<)([\d{re_decimal_char}]+)]")
+
+    @cached_property
+    def token_factories(self) -> Dict[str, Callable[[str], FormatStringToken]]:
+        """
+        The token to create for each alternative, like the `visit_*` methods of the visitor.
+        """
+        return {
+            "double_quoted": lambda text: VerbatimToken(text[1:-1].replace(r"\"", '"')),
+            "single_quoted": lambda text: VerbatimToken(text[1:-1].replace(r"\'", "'")),
+            "ampm": AmPmToken,
+            "h_elapsed": lambda text: ElapsedHoursToken(),
+            "m_elapsed": lambda text: ElapsedMinutesToken(),
+            "s_elapsed": lambda text: ElapsedSecondsToken(),
+            "y": YearToken,
+            "m": MonthOrMinuteToken,
+            "d": DayToken,
+            "h": HourToken,
+            "s": lambda text: SecondToken(text, self.decimal_char),
+            "colon": lambda text: VerbatimToken(":"),
+            "at": lambda text: StringToken(),
+            "number": lambda text: NumberToken(
+                text=text,
+                decimal_char=self.decimal_char,
+                thousands_char=self.thousands_char,
+            ),
+            "other": VerbatimToken,
+        }
+
+    def expressions(
+        self,
+        fmt: str,
+        pos: int,
+        errors: List[TokenError],
+    ) -> Tuple[List[FormatStringToken], int]:
+        """
+        Scan as many expressions as possible, starting at `pos`. Only a `;` stops the scan before the end.
+
+        :param errors: The tokens that could not be created are added to this. They are replaced by verbatim tokens.
+        :return: The tokens, and the position after the last expression.
+        """
+        match = self.expression_pattern.match
+        factories = self.token_factories
+        tokens: List[FormatStringToken] = []
+
+        m = match(fmt, pos)
+        while m is not None:
+            try:
+                tokens.append(factories[m.lastgroup](m.group()))  # type: ignore
+            except Exception as e:
+                errors.append(TokenError(e, m.lastgroup, m.start(), m.end()))  # type: ignore
+                tokens.append(VerbatimToken(m.group()))
+            pos = m.end()
+            m = match(fmt, pos)
+
+        return tokens, pos
+
+    def sections(
+        self,
+        fmt: str,
+        pos: int,
+        count: int,
+        errors: List[TokenError],
+    ) -> Optional[Tuple[List[List[FormatStringToken]], int]]:
+        """
+        Scan `count` non-empty, `;`-separated lists of expressions, starting at `pos`. See :meth:`expressions`.
+
+        :return: The token lists, and the position after the last one. `None` if there are fewer lists.
+        """
+        sections = []
+        for i in range(count):
+            if i > 0:
+                if not fmt.startswith(";", pos):
+                    return None
+                pos += 1
+            tokens, pos = self.expressions(fmt, pos, errors)
+            if not tokens:
+                return None
+            sections.append(tokens)
+        return sections, pos
+
+    def tokenize(self, fmt: str) -> List[FormatStringToken]:
+        """
+        Scan a format string into tokens, which still need to be preprocessed.
+
+        Like the PEG parser, the first of the `if_binary`, `if_ternary` and `expressions` rules that matches is used,
+        and it must match the whole format string.
+
+        :raises ParseError: If no rule matches.
+        :raises IncompleteParseError: If the rule that matches doesn't match the whole format string.
+        :raises VisitationError: If a token can't be created, like the visitor.
+        """
+        condition = None
+        pos = 0
+        m = self.condition_pattern.match(fmt)
+        if m is not None:
+            condition = Condition(operator=m[1], rhs=m[2])
+            pos = m.end()
+
+        if condition is None:
+            # The default condition is to check if the value is greater than zero (i.e. "truthy").
+            condition = Condition(operator=">", rhs="0")
+
+        tokens: List[FormatStringToken]
+        errors: List[TokenError] = []
+        binary = self.sections(fmt, pos, 2, errors)
+        if binary is not None:
+            (true_tokens, false_tokens), pos = binary
+            tokens = [
+                BinaryConditionalToken(
+                    text=fmt[:pos],
+                    condition=condition,
+                    true_tokens=tuple(true_tokens),
+                    false_tokens=tuple(false_tokens),
+                )
+            ]
+        else:
+            # This can only match if the binary rule failed after a condition, which is then scanned as expressions.
+            errors = []
+            ternary = self.sections(fmt, 0, 3, errors)
+            if ternary is not None:
+                (gt_tokens, eq_tokens, lt_tokens), pos = ternary
+                tokens = [
+                    TernaryConditionalToken(
+                        text=fmt[:pos],
+                        gt_tokens=tuple(gt_tokens),
+                        eq_tokens=tuple(eq_tokens),
+                        lt_tokens=tuple(lt_tokens),
+                    )
+                ]
+            else:
+                errors = []
+                tokens, pos = self.expressions(fmt, 0, errors)
+
+        if not tokens or pos != len(fmt) or errors:
+            raise parse_error(fmt, tokens, pos, errors)
+
+        return tokens
+
+
+def parse_error(
+    fmt: str,
+    tokens: List[FormatStringToken],
+    pos: int,
+    errors: List[TokenError],
+) -> Exception:
+    """
+    The exception that the PEG parser and the visitor raise for an invalid format string.
+    """
+    # Only imported here, so that valid format strings don't import parsimonious.
+    from parsimonious.exceptions import (
+        IncompleteParseError,
+        ParseError,
+        VisitationError,
+    )
+    from parsimonious.expressions import Literal
+    from parsimonious.nodes import Node
+
+    if not tokens:
+        return ParseError(fmt, 0, Literal("", name="format_string"))
+    if pos != len(fmt):
+        return IncompleteParseError(fmt, pos, Literal("", name="format_string"))
+
+    error = errors[0]
+    node = Node(
+        Literal(fmt[error.start : error.end], name=error.rule),
+        fmt,
+        error.start,
+        error.end,
+    )
+    return VisitationError(error.error, type(error.error), node)
@@ -0,0 +1,116 @@
+"""
+Format many values in multiple threads, which share a single compiled format.
+
+Compiled formats are immutable, and all state that is shared between threads is either immutable or guarded:
+
+- The tokenizers of each locale are kept in a :class:`FormatCache`, which has a lock, and so do the caches of text
+  functions.
+- The grammar, regexes and other `cached_property` values of tokenizers and compiled formats only depend on the object
+  itself. Threads that race to compute one compute the same value, so it doesn't matter whose is kept.
+- Number formats keep a template and a layout for each count of digits that they render, for scalar and NumPy
+  rendering. They are added under a lock the first time that a count of digits is met, and never changed after that,
+  so reading them needs no lock. See :class:`excel_text._numbers.CharacteristicFormat`.
+- A :class:`FormatFile` keeps the tokens that it unpickles, which are added under a lock in the same way.
+- The patterns of the fast number renderers are cached with :func:`functools.lru_cache`, which is thread-safe.
+- Everything else at module level, like the comparison operators of conditions, is never modified after import.
+
+So rendering only takes a lock when it meets a new count of digits, and on free-threaded builds of CPython (3.13t and
+later) the threads run on all cores.
+"""
+
+import os
+import sys
+from concurrent.futures import Executor, ThreadPoolExecutor
+from itertools import chain
+from typing import Any, Dict, Iterable, List, Optional, Tuple, Union
+
+from excel_text._array import HAS_NUMPY, render_array
+from excel_text._batch import as_list, render_values
+from excel_text._errors import ExcelError
+from excel_text._factory import compile_format, get_full_config
+from excel_text._parallel import chunk_ranges
+
+if HAS_NUMPY:
+    import numpy as np
+
+
+def gil_enabled() -> bool:
+    """
+    Whether the global interpreter lock is enabled, i.e. whether threads can only run Python code one at a time. It can
+    only be disabled on free-threaded builds of CPython 3.13 and later.
+    """
+    is_gil_enabled = getattr(sys, "_is_gil_enabled", None)
+    return is_gil_enabled is None or bool(is_gil_enabled())
+
+
+def text_threaded(
+    values: Iterable[Any],
+    fmt: str,
+    config: Optional[Dict[str, Any]] = None,
+    workers: Optional[int] = None,
+    chunksize: Optional[int] = None,
+    executor: Optional[Executor] = None,
+) -> List[Union[str, ExcelError]]:
+    """
+    The same as :func:`text_many`, but contiguous chunks of the values are formatted by a pool of threads.
+
+    Unlike with :func:`text_parallel`, nothing has to be sent anywhere: the format string is compiled once, and all
+    threads render with it. That only speeds things up when the GIL is disabled, so by default a single thread is used
+    if it is enabled. NumPy releases the GIL for much of its work, so numeric arrays may still benefit from more threads.
+
+    Errors are the same as those of :func:`text_many`: if the `raise` option is on, the error of the first value that
+    fails is raised, and otherwise errors are returned in place.
+
+    >>> text_threaded([1234.5678, 0.5], "$#,##0.00", workers=2, chunksize=1)
+    ['$1,234.57', '$0.50']
+
+    :param values: Values that will be formatted.
+    :param fmt: The format string that describes how the output should look.
+    :param config: Dictionary with config options, like for :func:`get_text_function`.
+    :param workers: The number of threads. Defaults to the number of CPUs without the GIL, and to 1 with it.
+    :param chunksize: The number of values per chunk. Defaults to a few chunks per thread.
+    :param executor: An existing executor to submit the chunks to, e.g. a `ThreadPoolExecutor` that is reused between
+        calls. It is not shut down afterwards.
+    :return: The formatted strings (or errors), in the same order as the values.
+    """
+    full_config = get_full_config(config)
+    raise_errors = full_config["raise"]
+
+    array: Optional["np.ndarray[Any, Any]"] = None
+    value_list: List[Any] = []
+    if HAS_NUMPY and isinstance(values, np.ndarray) and values.dtype.kind in "iuf":
+        array = values.ravel()
+        n = len(array)
+    else:
+        value_list = as_list(values)
+        n = len(value_list)
+
+    try:
+        compiled = compile_format(fmt, full_config)
+    except ExcelError as e:
+        if raise_errors:
+            raise e
+        return [e] * n
+
+    def render_chunk(start_stop: Tuple[int, int]) -> List[Union[str, ExcelError]]:
+        start, stop = start_stop
+        if array is not None:
+            strings: List[Union[str, ExcelError]] = render_array(
+                compiled, array[start:stop], raise_errors
+            ).tolist()
+            return strings
+        return render_values(compiled, value_list[start:stop], raise_errors)
+
+    if workers is None:
+        workers = 1 if gil_enabled() else os.cpu_count() or 1
+    ranges = chunk_ranges(n, workers, chunksize)
+    if executor is None and (workers <= 1 or len(ranges) <= 1):
+        return render_chunk((0, n))
+
+    if executor is not None:
+        chunks = executor.map(render_chunk, ranges)
+        return list(chain.from_iterable(chunks))
+
+    with ThreadPoolExecutor(max_workers=min(workers, len(ranges))) as pool:
+        # The chunks come back in order, and the error of the first chunk that failed is raised.
+        return list(chain.from_iterable(pool.map(render_chunk, ranges)))
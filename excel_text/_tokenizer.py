@@ -0,0 +1,95 @@
+"""
+Turn format strings into tokens, either with the PEG parser or with the hand-written scanner.
+"""
+
+from dataclasses import dataclass
+from typing import TYPE_CHECKING, List, Union
+
+from excel_text._cache import FormatCache
+from excel_text._scanner import FormatStringScanner
+from excel_text._tokens import FormatStringToken
+
+if TYPE_CHECKING:
+    from excel_text._grammar import FormatStringParser
+    from excel_text._visitor import FormatStringVisitor
+
+
+@dataclass
+class PegTokenizer:
+    """
+    Parse a format string with the PEG grammar, and visit the resulting tree.
+    """
+
+    parser: "FormatStringParser"
+    visitor: "FormatStringVisitor"
+
+    @property
+    def decimal_char(self) -> str:
+        return self.parser.decimal_char
+
+    @property
+    def thousands_char(self) -> str:
+        return self.parser.thousands_char
+
+    def tokenize(self, fmt: str) -> List[FormatStringToken]:
+        tokens: List[FormatStringToken] = self.visitor.visit(self.parser.parse(fmt))
+        return tokens
+
+
+Tokenizer = Union[PegTokenizer, FormatStringScanner]
+
+
+_registry: FormatCache[Tokenizer] = FormatCache(maxsize=None)
+"""
+The tokenizers for each locale and parser. Their grammars and regexes are expensive to build, and they don't change,
+so they are shared by the whole process.
+"""
+
+
+def get_tokenizer(decimal_char: str, thousands_char: str, parser: str) -> Tokenizer:
+    """
+    Get the shared tokenizer for a locale, creating it the first time.
+
+    :param parser: See :func:`create_tokenizer`.
+    """
+    return _registry.get_or_create(
+        (decimal_char, thousands_char, parser),
+        lambda: create_tokenizer(decimal_char, thousands_char, parser),
+    )
+
+
+def create_tokenizer(decimal_char: str, thousands_char: str, parser: str) -> Tokenizer:
+    """
+    Create a new tokenizer.
+
+    :param parser: Either "peg" for the parsimonious grammar, or "scanner" for the hand-written scanner. Both produce
+        the same tokens, but the scanner is faster.
+    """
+    check_parser(parser)
+    if parser == "peg":
+        # Parsimonious is slow to import, and not needed by the scanner.
+        from excel_text._grammar import FormatStringParser
+        from excel_text._visitor import FormatStringVisitor
+
+        return PegTokenizer(
+            parser=FormatStringParser(
+                decimal_char=decimal_char,
+                thousands_char=thousands_char,
+            ),
+            visitor=FormatStringVisitor(
+                decimal_char=decimal_char,
+                thousands_char=thousands_char,
+            ),
+        )
+    return FormatStringScanner(
+        decimal_char=decimal_char,
+        thousands_char=thousands_char,
+    )
+
+
+def check_parser(parser: str) -> None:
+    """
+    Raise a `ValueError` for an unknown `parser` option, without creating a tokenizer.
+    """
+    if parser not in ("peg", "scanner"):
+        raise ValueError(f"Unknown parser: {parser!r}")
@@ -1,23 +1,122 @@
+import datetime
 import re
-from dataclasses import dataclass, field
-from typing import Any, List
+from dataclasses import MISSING, dataclass, field, fields
+from functools import wraps
+from typing import Any, List, Optional, Tuple, TypeVar
 
 from excel_dates import ensure_python_date, ensure_python_time
 
 from excel_text._condition import Condition
-from excel_text._elapsed import elapsed_hours, elapsed_minutes, elapsed_seconds
-from excel_text._numbers import render_characteristic, render_mantissa
+from excel_text._elapsed import elapsed_seconds
+from excel_text._numbers import (
+    NumberLayout,
+    number_layout,
+    render_fixed,
+    render_scientific,
+)
 
+_TokenClass = TypeVar("_TokenClass", bound=type)
 
-@dataclass
+
+def slotted(cls: _TokenClass) -> _TokenClass:
+    """
+    Recreate a dataclass with `__slots__` for its fields, so that its instances have no `__dict__`. Compiled formats are
+    cached by the thousands, and their tokens are small, so the dictionaries would be most of their memory.
+
+    This is what `dataclass(slots=True)` does, which needs Python 3.10. Like it, `__init__` sets the defaults of fields
+    with `init=False`, which dataclasses otherwise leave to the class attributes.
+    """
+    field_names = [f.name for f in fields(cls)]
+    defaults = {
+        f.name: f.default
+        for f in fields(cls)
+        if not f.init and f.default is not MISSING
+    }
+    inherited = {
+        name for base in cls.__mro__[1:] for name in getattr(base, "__slots__", ())
+    }
+    cls_dict = dict(cls.__dict__)
+    cls_dict["__slots__"] = tuple(name for name in field_names if name not in inherited)
+    # Defaults are class attributes, which would hide the slots. The generated `__init__` has its own copy of them.
+    for name in field_names:
+        cls_dict.pop(name, None)
+    cls_dict.pop("__dict__", None)
+    cls_dict.pop("__weakref__", None)
+    if defaults:
+        init = cls_dict["__init__"]
+
+        @wraps(init)
+        def __init__(self: Any, *args: Any, **kwargs: Any) -> None:
+            for name, value in defaults.items():
+                object.__setattr__(self, name, value)
+            init(self, *args, **kwargs)
+
+        cls_dict["__init__"] = __init__
+    return type(cls)(cls.__name__, cls.__bases__, cls_dict)
+
+
+class ValueParts:
+    """
+    A value that is being rendered, with its date, time and elapsed seconds. Each of those is computed the first time a
+    token needs it, and then shared by all tokens of the same render.
+    """
+
+    __slots__ = ("value", "_date", "_time", "_elapsed_seconds")
+
+    def __init__(self, value: Any) -> None:
+        self.value = value
+        self._date: Optional[datetime.date] = None
+        self._time: Optional[datetime.time] = None
+        self._elapsed_seconds: Optional[float] = None
+
+    @property
+    def date(self) -> datetime.date:
+        if self._date is None:
+            self._date = ensure_python_date(self.value)
+        return self._date
+
+    @property
+    def time(self) -> datetime.time:
+        if self._time is None:
+            self._time = ensure_python_time(self.value)
+        return self._time
+
+    @property
+    def elapsed_seconds(self) -> float:
+        if self._elapsed_seconds is None:
+            self._elapsed_seconds = elapsed_seconds(self.value)
+        return self._elapsed_seconds
+
+
+@slotted
+@dataclass(frozen=True)
 class FormatStringToken:
+    """
+    A part of a format string. Tokens are immutable, and have no `__dict__`.
+    """
+
     text: str
 
+    def __getstate__(self) -> Tuple[Any, ...]:
+        return tuple(getattr(self, f.name) for f in fields(self))
+
+    def __setstate__(self, state: Tuple[Any, ...]) -> None:
+        # Frozen dataclasses can't set their fields the usual way.
+        for f, value in zip(fields(self), state):
+            object.__setattr__(self, f.name, value)
+
     def render(self, value: Any) -> str:
         raise NotImplementedError()
 
+    def render_parts(self, parts: ValueParts) -> str:
+        """
+        Render the value of `parts`, reusing what other tokens already computed from it.
+        """
+        return self.render(parts.value)
 
-@dataclass
+
+@slotted
+@dataclass(frozen=True)
 class MonthOrMinuteToken(FormatStringToken):
     """
     A placeholder token to use when we don't know yet whether it's minutes or months.
@@ -29,21 +128,26 @@ class MonthOrMinuteToken(FormatStringToken):
         )
 
 
-@dataclass
+@slotted
+@dataclass(frozen=True)
 class DateToken(FormatStringToken):
     def render(self, value: Any) -> str:
+        return self.render_parts(ValueParts(value))
+
+    def render_parts(self, parts: ValueParts) -> str:
         raise NotImplementedError()
 
 
-@dataclass
+@slotted
+@dataclass(frozen=True)
 class YearToken(DateToken):
     def __post_init__(self) -> None:
         if re.fullmatch("e+", self.text):
-            self.text = "yyyy"
+            object.__setattr__(self, "text", "yyyy")
 
-    def render(self, value: Any) -> str:
+    def render_parts(self, parts: ValueParts) -> str:
         n = len(self.text)
-        d = ensure_python_date(value)
+        d = parts.date
         if n > 2:
             return d.strftime("%Y")
         if n > 0:
@@ -52,11 +156,12 @@ class YearToken(DateToken):
         raise ValueError("TODO proper Excel error")
 
 
-@dataclass
+@slotted
+@dataclass(frozen=True)
 class MonthToken(DateToken):
-    def render(self, value: Any) -> str:
+    def render_parts(self, parts: ValueParts) -> str:
         n = len(self.text)
-        d = ensure_python_date(value)
+        d = parts.date
         if n >= 6 or n == 4:
             return d.strftime("%B")
         if n == 5:
@@ -71,11 +176,12 @@ class MonthToken(DateToken):
         raise ValueError(f"Can't render month token with length {n}")
 
 
-@dataclass
+@slotted
+@dataclass(frozen=True)
 class DayToken(DateToken):
-    def render(self, value: Any) -> str:
+    def render_parts(self, parts: ValueParts) -> str:
         n = len(self.text)
-        d = ensure_python_date(value)
+        d = parts.date
         if n > 3:
             return d.strftime("%A")
         if n > 2:
@@ -88,16 +194,17 @@ class DayToken(DateToken):
         raise ValueError(f"Can't render day token with length {n}")
 
 
-@dataclass
+@slotted
+@dataclass(frozen=True)
 class HourToken(DateToken):
     twelve: bool = False
     """
     12-hour mode
     """
 
-    def render(self, value: Any) -> str:
+    def render_parts(self, parts: ValueParts) -> str:
         n = len(self.text)
-        d = ensure_python_time(value)
+        d = parts.time
         if self.twelve:
             if n >= 2:
                 return d.strftime("%I")
@@ -112,11 +219,12 @@ class HourToken(DateToken):
         raise ValueError(f"Can't render hour token with length {n}")
 
 
-@dataclass
+@slotted
+@dataclass(frozen=True)
 class MinuteToken(DateToken):
-    def render(self, value: Any) -> str:
+    def render_parts(self, parts: ValueParts) -> str:
         n = len(self.text)
-        d = ensure_python_time(value)
+        d = parts.time
         if n == 2:
             return f"{d.minute:02d}"
         if n == 1:
@@ -125,19 +233,23 @@ class MinuteToken(DateToken):
         raise ValueError(f"Can't render minute token with length {n}")
 
 
-@dataclass
+@slotted
+@dataclass(frozen=True)
 class SecondToken(FormatStringToken):
     decimal_char: str
 
     def render(self, value: Any) -> str:
-        d = ensure_python_time(value)
+        return self.render_parts(ValueParts(value))
+
+    def render_parts(self, parts: ValueParts) -> str:
+        d = parts.time
         val = d.second + d.microsecond / 1000000
 
-        parts = self.text.split(self.decimal_char)
-        n_int = len(parts[0])
-        if len(parts) > 1:
+        integer_and_fraction = self.text.split(self.decimal_char)
+        n_int = len(integer_and_fraction[0])
+        if len(integer_and_fraction) > 1:
             # Seconds with decimals.
-            n_frac = len(parts[1])
+            n_frac = len(integer_and_fraction[1])
             pad = f"0{1 + n_frac + n_int}"
         else:
             # Seconds as integer.
@@ -147,10 +259,14 @@ class SecondToken(FormatStringToken):
         return f"{val:{pad}.{n_frac}f}"
 
 
-@dataclass
+@slotted
+@dataclass(frozen=True)
 class AmPmToken(FormatStringToken):
     def render(self, value: Any) -> str:
-        d = ensure_python_time(value)
+        return self.render_parts(ValueParts(value))
+
+    def render_parts(self, parts: ValueParts) -> str:
+        d = parts.time
         val = d.strftime("%p")
 
         if self.text == "am/pm":
@@ -169,31 +285,46 @@ class AmPmToken(FormatStringToken):
         raise ValueError(f"Failed to render token '{self.text}'.")
 
 
-@dataclass
+@slotted
+@dataclass(frozen=True)
 class ElapsedHoursToken(FormatStringToken):
     text: str = field(default="[h]", init=False, repr=False, compare=False)
 
     def render(self, value: Any) -> str:
-        return str(int(elapsed_hours(value)))
+        return self.render_parts(ValueParts(value))
+
+    def render_parts(self, parts: ValueParts) -> str:
+        # The same as `elapsed_hours`, without converting the value again.
+        return str(int(parts.elapsed_seconds / 3600))
 
 
-@dataclass
+@slotted
+@dataclass(frozen=True)
 class ElapsedMinutesToken(FormatStringToken):
     text: str = field(default="[m]", init=False, repr=False, compare=False)
 
     def render(self, value: Any) -> str:
-        return str(int(elapsed_minutes(value)))
+        return self.render_parts(ValueParts(value))
+
+    def render_parts(self, parts: ValueParts) -> str:
+        # The same as `elapsed_minutes`, without converting the value again.
+        return str(int(parts.elapsed_seconds / 60))
 
 
-@dataclass
+@slotted
+@dataclass(frozen=True)
 class ElapsedSecondsToken(FormatStringToken):
     text: str = field(default="[s]", init=False, repr=False, compare=False)
 
     def render(self, value: Any) -> str:
-        return str(int(elapsed_seconds(value)))
+        return self.render_parts(ValueParts(value))
 
+    def render_parts(self, parts: ValueParts) -> str:
+        return str(int(parts.elapsed_seconds))
 
-@dataclass
+
+@slotted
+@dataclass(frozen=True)
 class VerbatimToken(FormatStringToken):
     """
     Renders a part of the format string into the results. Ignores the value.
@@ -203,7 +334,8 @@ class VerbatimToken(FormatStringToken):
         return self.text
 
 
-@dataclass
+@slotted
+@dataclass(frozen=True)
 class NumberToken(FormatStringToken):
     """
     >>> NumberToken(text="0000", decimal_char=".", thousands_char=",").render(12)
@@ -215,6 +347,9 @@ class NumberToken(FormatStringToken):
     >>> NumberToken(text='0.00E+00', decimal_char='.', thousands_char=' ').render(12200000)
     '1.22E+07'
 
+    >>> NumberToken(text='0.00E-00', decimal_char='.', thousands_char=' ').render(0.000123)
+    '1.23E-04'
+
     >>> NumberToken(text='00.00%', decimal_char='.', thousands_char=' ').render(0.2859)
     '28.59%'
 
@@ -228,55 +363,46 @@ class NumberToken(FormatStringToken):
     _characteristic: str = field(init=False, repr=False, compare=False)
     _mantissa: str = field(init=False, repr=False, compare=False)
     _exponent: str = field(init=False, repr=False, compare=False)
+    _layout: NumberLayout = field(init=False, repr=False, compare=False)
 
     def __post_init__(self) -> None:
         dec = re.escape(self.decimal_char)
         match = re.fullmatch(
-            rf"(?P<characteristic>[^eE+{dec}]*)({dec}(?P<mantissa>[^eE+{dec}]*))?([eE]\+(?P<exponent>[^eE+{dec}]*))?",
+            rf"(?P<characteristic>[^eE+{dec}]*)({dec}(?P<mantissa>[^eE+{dec}]*))?([eE](?P<exponent_sign>[+-])(?P<exponent>[^eE+{dec}]*))?",
             self.text,
         )
         if not match:
             raise ValueError(f"Invalid number format: {self.text}")
 
         groups = match.groupdict()
-        self._characteristic = groups["characteristic"]
-        self._mantissa = groups["mantissa"]
-        self._exponent = groups["exponent"]
+        object.__setattr__(self, "_characteristic", groups["characteristic"])
+        object.__setattr__(self, "_mantissa", groups["mantissa"])
+        object.__setattr__(self, "_exponent", groups["exponent"])
+        # Everything about the format that doesn't depend on the value, so that rendering doesn't work it out again.
+        object.__setattr__(
+            self,
+            "_layout",
+            number_layout(
+                self.text,
+                groups["characteristic"],
+                groups["mantissa"],
+                groups["exponent"],
+                self.thousands_char,
+                groups["exponent_sign"] or "+",
+            ),
+        )
 
     def render(self, value: Any) -> str:
         if not isinstance(value, (float, int)):
             raise ValueError("Value is not numeric.")
 
-        if "%" in self.text:
-            value *= 100
-
-        exponent = ""
-        if self._exponent:
-            e = len(str(int(value))) - 1
-            exponent = "E+" + render_characteristic(self._exponent, "", str(e))
-            value /= 10**e
+        if self._layout.exponent:
+            return render_scientific(self._layout, self.decimal_char, value)
+        return render_fixed(self._layout, self.decimal_char, value)
 
-        if self._characteristic and not self._mantissa:
-            characteristic = render_characteristic(
-                self._characteristic,
-                self.thousands_char,
-                str(int(round(value))),
-            )
-            return f"{characteristic}{exponent}"
-
-        characteristic = render_characteristic(
-            self._characteristic,
-            self.thousands_char,
-            str(int(value)),
-        )
-        mantissa = render_mantissa(
-            self._mantissa,
-            str(abs(value) % 1)[2:],
-        )
-        return f"{characteristic}{self.decimal_char}{mantissa}{exponent}"
 
-
-@dataclass
+@slotted
+@dataclass(frozen=True)
 class StringToken(FormatStringToken):
     """
     Represents the "@" formatter, which means "format as a string". Its definition is quite vague.
@@ -288,37 +414,51 @@ class StringToken(FormatStringToken):
         return str(value)
 
 
-@dataclass
+@slotted
+@dataclass(frozen=True)
 class BinaryConditionalToken(FormatStringToken):
     """
     Represents an conditional structure like `[condition]true_value;false_value`.
     """
 
     condition: Condition
-    true_tokens: List[FormatStringToken]
-    false_tokens: List[FormatStringToken]
+    true_tokens: Tuple[FormatStringToken, ...]
+    false_tokens: Tuple[FormatStringToken, ...]
 
     def render(self, value: Any) -> str:
         tokens = self.true_tokens if self.condition.eval(value) else self.false_tokens
         return "".join(t.render(value) for t in tokens)
 
+    def render_parts(self, parts: ValueParts) -> str:
+        tokens = (
+            self.true_tokens if self.condition.eval(parts.value) else self.false_tokens
+        )
+        return "".join(t.render_parts(parts) for t in tokens)
+
 
-@dataclass
+@slotted
+@dataclass(frozen=True)
 class TernaryConditionalToken(FormatStringToken):
     """
     Represents an conditional structure like `value_if_gt_zero;value_if_zero;value_if_lt_zero`
     """
 
-    gt_tokens: List[FormatStringToken]
-    lt_tokens: List[FormatStringToken]
-    eq_tokens: List[FormatStringToken]
+    gt_tokens: Tuple[FormatStringToken, ...]
+    lt_tokens: Tuple[FormatStringToken, ...]
+    eq_tokens: Tuple[FormatStringToken, ...]
 
     def render(self, value: Any) -> str:
-        if value > 0:
-            tokens = self.gt_tokens
-        elif value < 0:
-            tokens = self.lt_tokens
-        else:
-            tokens = self.eq_tokens
+        return "".join(t.render(value) for t in self.section(value))
 
-        return "".join(t.render(value) for t in tokens)
+    def render_parts(self, parts: ValueParts) -> str:
+        return "".join(t.render_parts(parts) for t in self.section(parts.value))
+
+    def section(self, value: Any) -> Tuple[FormatStringToken, ...]:
+        """
+        The tokens of the section that applies to a value.
+        """
+        if value > 0:
+            return self.gt_tokens
+        if value < 0:
+            return self.lt_tokens
+        return self.eq_tokens
@@ -207,8 +207,8 @@ class FormatStringVisitor(NodeVisitor):  # type: ignore
             return BinaryConditionalToken(
                 text=node.text,
                 condition=condition,
-                true_tokens=visited_children[1],
-                false_tokens=visited_children[3],
+                true_tokens=tuple(visited_children[1]),
+                false_tokens=tuple(visited_children[3]),
             )
         else:
             raise ValueError(
@@ -223,9 +223,9 @@ class FormatStringVisitor(NodeVisitor):  # type: ignore
         if len(node.children) == 5:
             return TernaryConditionalToken(
                 text=node.text,
-                gt_tokens=visited_children[0],
-                eq_tokens=visited_children[2],
-                lt_tokens=visited_children[4],
+                gt_tokens=tuple(visited_children[0]),
+                eq_tokens=tuple(visited_children[2]),
+                lt_tokens=tuple(visited_children[4]),
             )
         else:
             raise ValueError(
@@ -0,0 +1,298 @@
+import unittest
+import warnings
+from typing import Any, List
+
+from excel_text import get_text_function, text_array
+
+# noinspection PyProtectedMember
+from excel_text._array import HAS_NUMPY, render_array
+
+# noinspection PyProtectedMember
+from excel_text._compiled import create_compiled_format
+
+# noinspection PyProtectedMember
+from excel_text._tokenizer import get_tokenizer
+
+# noinspection PyProtectedMember
+from excel_text._tokens import TernaryConditionalToken
+
+# noinspection PyProtectedMember
+from excel_text._errors import ValueExcelError
+
+if HAS_NUMPY:
+    import numpy as np
+
+number_formats = [
+    "0",
+    "0.00",
+    "#,##0",
+    "#,##0.00",
+    "$#,##0.000",
+    "R #,##0.00",
+    "0%",
+    "0.0%",
+    "00.00%",
+    "0000000",
+    "##0° 00' 00''",
+    "#.0",
+    "0.",
+    ".",
+    "0 0",
+    '"m"#,##0.0',
+]
+
+
+date_formats = [
+    "yyyy-mm-dd hh:mm:ss",
+    "yyyy/mm/dd hh:mm:ss.00",
+    "yy/m/d h:m:s",
+    "dddd d mmmm",
+    "ddd dd mmm",
+    "yyyy mmmmm",
+    "e",
+    "hh:mm:ss AM/PM",
+    "h:mm a/p",
+    "h A/p",
+    "hh a/P",
+    "ss.0",
+    "[h]:mm:ss",
+    "[mm]:ss",
+    "[ss]",
+]
+
+
+@unittest.skipUnless(HAS_NUMPY, "NumPy is not installed")
+class TestTextArray(unittest.TestCase):
+    def assert_same_as_scalar(self, values: Any, fmt: str) -> None:
+        text = get_text_function({"raise": False})
+        supported = []
+        expected: List[Any] = []
+        for value in np.asarray(values).tolist():
+            try:
+                expected.append(text(value, fmt))
+                supported.append(value)
+            except (ValueError, IndexError):
+                # The scalar renderer fails with a non-Excel error for some values.
+                pass
+        self.assertEqual(expected, text_array(supported, fmt).tolist())
+
+    def test_random_floats(self) -> None:
+        rng = np.random.default_rng(42)
+        values = np.concatenate(
+            [
+                rng.normal(0, 1, 500),
+                rng.normal(0, 1e6, 500),
+                np.round(rng.normal(0, 1000, 500), 2),
+                np.round(rng.normal(0, 1000, 500), 3),
+                rng.random(100) * 1e-4,
+                [0.0, -0.0, 0.5, -0.5, 2.5, 0.125, 0.995, 1.005, 1234.1239],
+            ]
+        )
+        for fmt in number_formats:
+            with self.subTest(fmt=fmt):
+                self.assert_same_as_scalar(values, fmt)
+
+    def test_integers(self) -> None:
+        values = np.array([0, 1, -1, 12, -123, 1234, -123456, 10**12])
+        for fmt in number_formats:
+            with self.subTest(fmt=fmt):
+                self.assert_same_as_scalar(values, fmt)
+
+    def test_several_numbers(self) -> None:
+        values = np.array([-0.5, 0.5, -1234.5, 0.0, -0.001, 86400.0])
+        for fmt in [
+            '0.0E-0"ab"0.00E+00',
+            '#,##0.00" / "0%',
+            "[ss]#-$0.0E-0",
+            "-0.0",
+            "#-0.0",
+        ]:
+            for array in [values, np.tile(values, 20), values.astype(np.int64)]:
+                with self.subTest(fmt=fmt, n=len(array), dtype=array.dtype):
+                    self.assert_same_as_scalar(array, fmt)
+
+    def test_many_decimals(self) -> None:
+        values = np.array([0.5, -1234.125, 1e-20, 12.0])
+        for fmt in ["0." + "0" * 18, "0." + "0" * 19, "#,##0." + "0" * 25 + "%"]:
+            with self.subTest(fmt=fmt):
+                self.assert_same_as_scalar(values, fmt)
+                self.assert_same_as_scalar(values.astype(np.int64), fmt)
+
+    def test_scientific(self) -> None:
+        rng = np.random.default_rng(42)
+        floats = np.concatenate(
+            [
+                rng.random(500) * 10.0 ** rng.integers(-12, 0, 500),
+                rng.normal(0, 1e6, 500),
+                np.round(rng.normal(0, 1000, 500), 3),
+                10.0 ** rng.integers(-300, 300, 200),
+                [0.0, -0.0, 9.995, 9.999, 99999.0, 0.000995, 1e-5, 5e-324, 1e308],
+            ]
+        )
+        integers = np.array([0, 1, -1, 12, 99999, -123456, 10**12, 10**18 + 1])
+        for fmt in [
+            "0.00E+00",
+            "0.0E-0",
+            "#0.0E+0",
+            "##0.00E+00",
+            "00.000E+00",
+            "0.0E+0%",
+            "0E+0",
+        ]:
+            for values in [floats, integers]:
+                with self.subTest(fmt=fmt, dtype=values.dtype):
+                    self.assert_same_as_scalar(values, fmt)
+
+    def test_scientific_many_decimals(self) -> None:
+        values = np.array([0.5, -1234.125, 1e-20, 9.5, 12.0])
+        for fmt in [
+            "0." + "0" * 17 + "E+00",
+            "0." + "0" * 18 + "E+00",
+            "00." + "0" * 19 + "E-0",
+            "0." + "0" * 17 + "%",
+        ]:
+            for array in [values, values.astype(np.int64)]:
+                with self.subTest(fmt=fmt, dtype=array.dtype):
+                    self.assert_same_as_scalar(array, fmt)
+
+    def test_huge_values(self) -> None:
+        values = np.array([1e308, -1e308, 1.5, 1e300, 5e-324])
+        for fmt in number_formats + ["0." + "0" * 25, "0.00E+00"]:
+            with self.subTest(fmt=fmt), warnings.catch_warnings():
+                # Overflowing values are left to the scalar renderer, without NumPy warning about them.
+                warnings.simplefilter("error")
+                self.assert_same_as_scalar(values, fmt)
+
+    def test_serial_dates(self) -> None:
+        rng = np.random.default_rng(42)
+        values = np.concatenate(
+            [
+                rng.random(500) * 60000,
+                rng.random(100) * 100,
+                np.round(rng.random(500) * 60000 * 86400) / 86400,
+                [0.0, 0.5, 59.0, 59.9999, 60.0, 60.5, 61.0, 0.99999999999, -1.0],
+            ]
+        )
+        for fmt in date_formats:
+            with self.subTest(fmt=fmt):
+                self.assert_same_as_scalar(values, fmt)
+
+    def test_integer_dates(self) -> None:
+        values = np.array([1, 59, 61, 1234, 43832, 2958464])
+        for fmt in date_formats:
+            with self.subTest(fmt=fmt):
+                self.assert_same_as_scalar(values, fmt)
+
+    def test_huge_elapsed_times(self) -> None:
+        for fmt in ["[h]:mm:ss", "[mm]:ss", "[ss].00"]:
+            with self.subTest(fmt=fmt), warnings.catch_warnings():
+                warnings.simplefilter("error")
+                # Overflowing values are left to the scalar renderer, which fails like for a single value.
+                with self.assertRaises(OverflowError):
+                    text_array(np.array([1.5, 1e308]), fmt)
+
+    def test_datetimes(self) -> None:
+        rng = np.random.default_rng(42)
+        start, stop = np.datetime64("1899-01-01", "ns"), np.datetime64(
+            "2200-01-01", "ns"
+        )
+        values = start + (rng.random(2000) * (stop - start)).astype("timedelta64[ns]")
+        values[::3] = values[::3].astype("datetime64[s]")
+        values[::5] = values[::5].astype("datetime64[D]")
+        for unit in ["ns", "us", "s", "D"]:
+            array = values.astype(f"datetime64[{unit}]")
+            # Like `tolist`, but without turning nanoseconds into integers.
+            datetimes = array.astype("datetime64[us]" if unit != "D" else array.dtype)
+            for fmt in [*date_formats, "ss.000", "@"]:
+                with self.subTest(unit=unit, fmt=fmt):
+                    text = get_text_function({"raise": False})
+                    self.assertEqual(
+                        [text(value, fmt) for value in datetimes.tolist()],
+                        text_array(array, fmt).tolist(),
+                    )
+
+    def test_conditional_formats(self) -> None:
+        rng = np.random.default_rng(42)
+        floats = np.concatenate(
+            [
+                rng.normal(0, 1000, 500),
+                np.round(rng.normal(0, 1000, 500), 2),
+                rng.random(500) * 60000,
+                [0.0, -0.0, 543.0, 543.234, 1000.0, 999.999, -1000.0],
+            ]
+        )
+        integers = np.array([0, 1, -1, 543, 544, 999, 1000, -1000, 40000])
+        for fmt in [
+            "[>=1000]#,##0;0.00",
+            "[>543]0000;#0.0",
+            "[<0]0.0%;$#,##0.00",
+            '[=0]"zero";#,##0.00',
+            '[>0]"x"0;"y"0.0',
+            "[>=40000]yyyy-mm-dd;0.00",
+            "[>1]0.00E+00;0.0",
+        ]:
+            for values in [floats, integers]:
+                with self.subTest(fmt=fmt, dtype=values.dtype):
+                    self.assert_same_as_scalar(values, fmt)
+
+    def test_ternary_conditional(self) -> None:
+        tokenizer = get_tokenizer(".", ",", "peg")
+        token = TernaryConditionalToken(
+            text="",
+            gt_tokens=tuple(tokenizer.tokenize("#,##0.00")),
+            lt_tokens=tuple(tokenizer.tokenize('"minus "0')),
+            eq_tokens=tuple(tokenizer.tokenize('"zero"')),
+        )
+        compiled = create_compiled_format("", ".", ",", (token,))
+        values = np.array([1234.5, -0.5, 0.0, -12.25, np.nan, 3.0])
+        self.assertEqual(
+            [compiled.render(v) for v in values.tolist()],
+            render_array(compiled, values).tolist(),
+        )
+
+    def test_1900_leap_year(self) -> None:
+        self.assertEqual(
+            ["1900/02/28", "1900/03/01"],
+            text_array([59, 61], "yyyy/mm/dd").tolist(),
+        )
+        with self.assertRaises(ValueError):
+            text_array([59, 60, 61], "yyyy/mm/dd")
+
+    def test_shape_and_dtype(self) -> None:
+        result = text_array(np.array([[1.5, 2.25], [3.0, 4.125]]), "0.00")
+        self.assertEqual((2, 2), result.shape)
+        self.assertEqual("U", result.dtype.kind)
+        self.assertEqual([["1.50", "2.25"], ["3.00", "4.13"]], result.tolist())
+
+    def test_empty(self) -> None:
+        self.assertEqual([], text_array(np.array([]), "0.00").tolist())
+
+    def test_fallback_formats(self) -> None:
+        # Formats that can't be vectorized are rendered one value at a time.
+        self.assertEqual(["8", "hello"], text_array([8, "hello"], "@").tolist())
+        self.assertEqual(
+            ["0543", "500.5"],
+            text_array([543.234, 500.5], "[>543]0000;#0.0").tolist(),
+        )
+
+    def test_config(self) -> None:
+        self.assertEqual(
+            ["123.123,00"],
+            text_array(
+                [123123], "#.##0,00", {"decimal": ",", "thousands": "."}
+            ).tolist(),
+        )
+
+    def test_errors(self) -> None:
+        with self.assertRaises(ValueExcelError):
+            text_array([1.0, 2.0], "[>1000$# ##0.0")
+
+        result = text_array([1.0, 2.0], "[>1000$# ##0.0", {"raise": False})
+        self.assertEqual(object, result.dtype)
+        self.assertIsInstance(result[0], ValueExcelError)
+
+
+if __name__ == "__main__":
+    unittest.main(
+        failfast=True,
+    )
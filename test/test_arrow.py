@@ -0,0 +1,122 @@
+import datetime
+import unittest
+from typing import Any, List
+from unittest import mock
+
+from excel_text import get_text_function, text_arrow
+
+# noinspection PyProtectedMember
+from excel_text import _arrow
+
+# noinspection PyProtectedMember
+from excel_text._errors import ValueExcelError
+
+try:
+    import numpy as np
+    import pyarrow as pa
+
+    HAS_PYARROW = True
+except ImportError:  # pragma: no cover
+    HAS_PYARROW = False
+
+formats = [
+    "0.00",
+    "#,##0",
+    "$#,##0.00",
+    "0%",
+    "# ##0,00 €",
+    "yyyy/mm/dd hh:mm:ss.00",
+    "dddd d mmmm AM/PM",
+    "[h]:mm",
+    '"<"@">"',
+]
+
+
+@unittest.skipUnless(HAS_PYARROW, "pyarrow is not installed")
+class TestTextArrow(unittest.TestCase):
+    def assert_same_as_scalar(self, array: Any, fmt: str) -> None:
+        text = get_text_function({"raise": False})
+        expected: List[Any] = []
+        for value in array.to_pylist():
+            try:
+                expected.append(None if value is None else text(value, fmt))
+            except (ValueError, IndexError, TypeError, OverflowError):
+                # The scalar renderer fails with a non-Excel error for some values.
+                return
+        result = text_arrow(array, fmt)
+        result.validate(full=True)
+        self.assertEqual(pa.string(), result.type)
+        self.assertEqual(expected, result.to_pylist())
+
+    def test_numbers(self) -> None:
+        rng = np.random.default_rng(42)
+        floats = pa.array(
+            np.round(rng.normal(0, 1e4, 1000), 2), mask=rng.random(1000) < 0.1
+        )
+        arrays: List[Any] = [
+            floats,
+            floats.slice(3, 100),
+            floats.cast(pa.float32()),
+            pa.array(rng.integers(-(10**6), 10**6, 1000)),
+            pa.array([0, 1, None, 255], pa.uint8()),
+            pa.array([], pa.float64()),
+        ]
+        for array in arrays:
+            for fmt in formats:
+                with self.subTest(type=array.type, fmt=fmt):
+                    self.assert_same_as_scalar(array, fmt)
+
+    def test_dates(self) -> None:
+        timestamps = pa.array(
+            [
+                datetime.datetime(2021, 3, 4, 12, 30, 15, 123456),
+                None,
+                datetime.datetime(1900, 1, 1),
+                datetime.datetime(2200, 12, 31, 23, 59, 59),
+            ],
+            pa.timestamp("us"),
+        )
+        array_types: List[Any] = [
+            pa.timestamp("us"),
+            pa.timestamp("ns"),
+            pa.date32(),
+            pa.date64(),
+        ]
+        for array_type in array_types:
+            array = timestamps.cast(array_type, safe=False)
+            for fmt in formats:
+                with self.subTest(type=array_type, fmt=fmt):
+                    self.assert_same_as_scalar(array, fmt)
+
+    def test_other_types(self) -> None:
+        self.assert_same_as_scalar(pa.array(["abc", None, "é"]), '"<"@">"')
+        self.assert_same_as_scalar(pa.array([True, False]), "0.0")
+
+    def test_chunked(self) -> None:
+        result = text_arrow(pa.chunked_array([[1.5], [], [2.25, None]]), "0.0")
+        self.assertIsInstance(result, pa.ChunkedArray)
+        self.assertEqual(["1.5", "2.3", None], result.to_pylist())
+
+    def test_chunked_large(self) -> None:
+        # Only the second chunk is too large for 32-bit offsets.
+        with mock.patch.object(_arrow, "_MAX_STRING_DATA", 10):
+            result = text_arrow(pa.chunked_array([[1.5], [1.0] * 4]), "0.00")
+        result.validate(full=True)
+        self.assertEqual(pa.large_string(), result.type)
+        self.assertEqual(["1.50"] + ["1.00"] * 4, result.to_pylist())
+
+    def test_control_characters(self) -> None:
+        self.assert_same_as_scalar(pa.array(["a\x00b", "\x00€", "x"]), '"<"@">"')
+        self.assert_same_as_scalar(pa.array([1.5, None]), '0.0"\x00\x01"')
+
+    def test_surrogates(self) -> None:
+        with self.assertRaises(UnicodeEncodeError) as cm:
+            text_arrow(pa.array([1.5, 2.0]), '0.0"\udc80"')
+        self.assertEqual("surrogates not allowed", cm.exception.reason)
+
+    def test_errors(self) -> None:
+        with self.assertRaises(ValueExcelError):
+            text_arrow(pa.array([1.0, 2.0]), "[>1000$# ##0.0")
+
+        result = text_arrow(pa.array([1.0, 2.0]), "[>1000$# ##0.0", {"raise": False})
+        self.assertEqual([None, None], result.to_pylist())
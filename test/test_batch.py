@@ -0,0 +1,104 @@
+import random
+import unittest
+from typing import Any, List
+
+from excel_text import get_text_function, text_many, text_pairs
+
+# noinspection PyProtectedMember
+from excel_text._errors import ValueExcelError
+
+
+def random_values(size: int) -> List[Any]:
+    rng = random.Random(10)
+    return [round(rng.uniform(0, 50000), rng.randint(0, 4)) for _ in range(size)]
+
+
+def supported_values(values: List[Any], fmt: str) -> List[Any]:
+    """
+    Leave out the values for which the scalar renderer fails with a non-Excel error.
+    """
+    text = get_text_function()
+    supported = []
+    for value in values:
+        try:
+            text(value, fmt)
+        except (ValueError, IndexError):
+            continue
+        supported.append(value)
+    return supported
+
+
+class TestTextMany(unittest.TestCase):
+    def test_same_as_text(self) -> None:
+        text = get_text_function()
+        floats = random_values(500)
+        integers = [int(v) for v in floats]
+        for fmt in ["0.00", "#,##0", "$#,##0.0", "0%", "yyyy/mm/dd hh:mm", "@"]:
+            for values in [floats, integers, floats[:10], [1, 2.5, 3] * 30]:
+                with self.subTest(fmt=fmt, n=len(values), type=type(values[0])):
+                    supported = supported_values(values, fmt)
+                    self.assertEqual(
+                        [text(v, fmt) for v in supported], text_many(supported, fmt)
+                    )
+
+    def test_strings(self) -> None:
+        self.assertEqual(["xa", "xb"], text_many(iter(["a", "b"]), '"x"@'))
+
+    def test_config(self) -> None:
+        self.assertEqual(
+            ["1.234,50", "0,25"],
+            text_many([1234.5, 0.25], "#.##0,00", {"decimal": ",", "thousands": "."}),
+        )
+
+    def test_empty(self) -> None:
+        self.assertEqual([], text_many([], "0"))
+
+    def test_errors(self) -> None:
+        with self.assertRaises(ValueExcelError):
+            text_many([1, 2], "[>5]")
+
+        results = text_many([1, 2], "[>5]", {"raise": False})
+        self.assertEqual(2, len(results))
+        for result in results:
+            self.assertIsInstance(result, ValueExcelError)
+
+
+class TestTextPairs(unittest.TestCase):
+    def test_same_as_text(self) -> None:
+        text = get_text_function()
+        rng = random.Random(10)
+        formats = ["0.00", "#,##0", "yyyy/mm/dd", "[h]:mm", "@"]
+        pairs = [(v, rng.choice(formats)) for v in random_values(1000)]
+        pairs = [(v, fmt) for v, fmt in pairs if supported_values([v], fmt)]
+        pairs += [(int(v), "0") for v, _ in pairs[:100]]
+        rng.shuffle(pairs)
+
+        for chunksize in [1, 7, 4096]:
+            with self.subTest(chunksize=chunksize):
+                self.assertEqual(
+                    [text(v, fmt) for v, fmt in pairs],
+                    list(text_pairs(iter(pairs), chunksize=chunksize)),
+                )
+
+    def test_errors_in_place(self) -> None:
+        results = list(
+            text_pairs([(1, "0.0"), (2, "[>5]"), (3, "0.0")], {"raise": False})
+        )
+        self.assertEqual("1.0", results[0])
+        self.assertIsInstance(results[1], ValueExcelError)
+        self.assertEqual("3.0", results[2])
+
+    def test_raise_after_previous_results(self) -> None:
+        results = text_pairs([(1, "0.0"), (2, "0"), (3, "[>5]"), (4, "0.0")])
+        self.assertEqual("1.0", next(results))
+        self.assertEqual("2", next(results))
+        with self.assertRaises(ValueExcelError):
+            next(results)
+
+    def test_lazy(self) -> None:
+        def pairs() -> Any:
+            yield 1, "0"
+            raise RuntimeError("Consumed too far.")
+
+        results = text_pairs(pairs(), chunksize=1)
+        self.assertEqual("1", next(results))
@@ -0,0 +1,75 @@
+import unittest
+
+from excel_text import get_text_function, FormatCache
+
+# noinspection PyProtectedMember
+from excel_text._errors import ValueExcelError
+
+
+class TestFormatCache(unittest.TestCase):
+    def test_lru_eviction(self) -> None:
+        cache: FormatCache[int] = FormatCache(maxsize=2)
+        cache.get_or_create("a", lambda: 1)
+        cache.get_or_create("b", lambda: 2)
+        cache.get_or_create("a", lambda: 3)
+        cache.get_or_create("c", lambda: 4)
+        self.assertIn("a", cache)
+        self.assertNotIn("b", cache)
+        self.assertIn("c", cache)
+
+    def test_disabled(self) -> None:
+        cache: FormatCache[int] = FormatCache(maxsize=0)
+        self.assertEqual(1, cache.get_or_create("a", lambda: 1))
+        self.assertEqual(2, cache.get_or_create("a", lambda: 2))
+        self.assertEqual(0, len(cache))
+        self.assertEqual(2, cache.info().misses)
+
+    def test_negative_size(self) -> None:
+        with self.assertRaises(ValueError):
+            FormatCache(maxsize=-1)
+
+    def test_clear(self) -> None:
+        cache: FormatCache[int] = FormatCache()
+        cache.get_or_create("a", lambda: 1)
+        cache.clear()
+        self.assertEqual((0, 0, 1024, 0), tuple(cache.info()))
+
+
+class TestTextFunctionCache(unittest.TestCase):
+    def test_repeated_format_is_parsed_once(self) -> None:
+        cache: FormatCache[object] = FormatCache()
+        t = get_text_function({"cache": cache})
+        self.assertEqual("$1,234.57", t(1234.5678, "$#,##0.00"))
+        self.assertEqual("$8,765.43", t(8765.4321, "$#,##0.00"))
+        self.assertEqual("1903/05/18", t(1234.1234, "yyyy/mm/dd"))
+        info = cache.info()
+        self.assertEqual(1, info.hits)
+        self.assertEqual(2, info.misses)
+        self.assertEqual(2, info.currsize)
+
+    def test_shared_between_configs(self) -> None:
+        cache: FormatCache[object] = FormatCache()
+        t1 = get_text_function({"cache": cache})
+        t2 = get_text_function({"cache": cache, "decimal": ",", "thousands": "."})
+        self.assertEqual("1,234.50", t1(1234.5, "#,##0.00"))
+        self.assertEqual("1.234,50", t2(1234.5, "#.##0,00"))
+        self.assertEqual("1,234.50", t1(1234.5, "#,##0.00"))
+        self.assertEqual(2, cache.info().currsize)
+
+    def test_errors_are_not_cached(self) -> None:
+        cache: FormatCache[object] = FormatCache()
+        t = get_text_function({"cache": cache, "raise": False})
+        self.assertIsInstance(t(123.123, "[>1000$# ##0.0"), ValueExcelError)
+        self.assertIsInstance(t(123.123, "[>1000$# ##0.0"), ValueExcelError)
+        self.assertEqual(0, cache.info().currsize)
+
+    def test_cache_size(self) -> None:
+        t = get_text_function({"cache_size": 0})
+        self.assertEqual("0012", t(12, "0000"))
+        self.assertEqual("0012", t(12, "0000"))
+
+
+if __name__ == "__main__":
+    unittest.main(
+        failfast=True,
+    )
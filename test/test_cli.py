@@ -0,0 +1,121 @@
+import json
+import tempfile
+import unittest
+from contextlib import redirect_stderr
+from io import StringIO
+from pathlib import Path
+from typing import List
+
+# noinspection PyProtectedMember
+from excel_text._cli import main, parse_cell
+
+CSV = """Name,Amount,Date,Note
+A,1234.5,2021-03-04,x
+B,7,44259.5,"multi
+line"
+C,,2021-03-04T12:30:00,abc
+"""
+
+
+class TestCli(unittest.TestCase):
+    def setUp(self) -> None:
+        self.dir = tempfile.TemporaryDirectory()
+        self.addCleanup(self.dir.cleanup)
+        self.input = Path(self.dir.name, "input.csv")
+        self.output = Path(self.dir.name, "output.csv")
+        self.input.write_text(CSV, encoding="utf-8")
+
+    def run_cli(self, args: List[str]) -> str:
+        self.assertEqual(0, main([str(self.input), "-o", str(self.output), *args]))
+        return self.output.read_text(encoding="utf-8")
+
+    def test_formats(self) -> None:
+        expected = (
+            "Name,Amount,Date,Note\n"
+            'A,"$1,234.50",2021/03/04 00:00,<x>\n'
+            'B,$7.00,2021/03/04 12:00,"<multi\nline>"\n'
+            "C,,2021/03/04 12:30,<abc>\n"
+        )
+        args = [
+            "-f",
+            "Amount=$#,##0.00",
+            "--format",
+            "Date=yyyy/mm/dd hh:mm",
+            "-f",
+            'Note="<"@">"',
+        ]
+        self.assertEqual(expected, self.run_cli(args))
+
+        for workers in ["1", "2"]:
+            with self.subTest(workers=workers):
+                self.assertEqual(
+                    expected,
+                    self.run_cli([*args, "--workers", workers, "--chunk-rows", "1"]),
+                )
+
+    def test_parse_cell(self) -> None:
+        for cell in ["1_000", "1_0.5", "12 ", "12\t", "١٢", "-1_2e3"]:
+            with self.subTest(cell=cell):
+                self.assertEqual(cell, parse_cell(cell))
+        self.assertEqual([1000, 1.5e3], [parse_cell("1000"), parse_cell("1.5e3")])
+
+    def test_formats_file(self) -> None:
+        formats = Path(self.dir.name, "formats.json")
+        formats.write_text(json.dumps({"Amount": "0.0"}), encoding="utf-8")
+        self.assertEqual(
+            ["Amount", "1234.5", "7.0", ""],
+            [
+                row.split(",")[1]
+                for row in self.run_cli(["--formats", str(formats)]).splitlines()
+                if row[:1] in "NABC"
+            ],
+        )
+
+    def test_tsv_without_header(self) -> None:
+        self.input.write_text("a\t1.5\nb\t2\n", encoding="utf-8")
+        self.assertEqual(
+            "a\t1.50\nb\t2.00\n",
+            self.run_cli(["--tsv", "--no-header", "-f", "1=0.00"]),
+        )
+
+    def test_locale(self) -> None:
+        self.input.write_text("x\n1234.5\n", encoding="utf-8")
+        self.assertEqual(
+            "x\n1.234,50\n",
+            self.run_cli(
+                ["-d", ";", "--decimal", ",", "--thousands", ".", "-f", "x=#.##0,00"]
+            ),
+        )
+
+    def test_errors(self) -> None:
+        self.assertEqual(
+            ["", "", ""],
+            [
+                row.split(",")[0]
+                for row in self.run_cli(
+                    ["-f", "Name=0.0", "--on-error", "empty"]
+                ).splitlines()[1:]
+                if row[:1] in ",ABC"
+            ],
+        )
+        self.assertIn(
+            "A,1234.5", self.run_cli(["-f", "Name=0.0", "--on-error", "keep"])
+        )
+
+        stderr = StringIO()
+        with redirect_stderr(stderr):
+            code = main([str(self.input), "-o", str(self.output), "-f", "Name=0.0"])
+        self.assertEqual(1, code)
+        self.assertIn("Row 2, column 1", stderr.getvalue())
+
+    def test_invalid_arguments(self) -> None:
+        invalid_args: List[List[str]] = [
+            [],
+            ["-f", "Nope=0"],
+            ["-f", "Amount"],
+            ["-f", "Amount=[>5]"],
+        ]
+        for args in invalid_args:
+            with self.subTest(args=args):
+                with redirect_stderr(StringIO()), self.assertRaises(SystemExit):
+                    main([str(self.input), "-o", str(self.output), *args])
@@ -0,0 +1,102 @@
+import datetime
+import unittest
+from typing import Any
+
+from excel_text import get_text_function
+
+formats = [
+    "d",
+    "dd",
+    "ddd",
+    "dddd",
+    "YYYY",
+    "yy/m/d",
+    "yyyy/mmmmm",
+    "yyyy mmmm",
+    "yyyy mmm",
+    "yyyy/mm/dd hh:mm:ss",
+    "yyyy/mm/dd hh:mm:ss AM/PM",
+    "yyyy/mm/dd hh:mm:ss.00",
+    "h:mm a/p",
+    "h A/p",
+    "hh a/P am/pm",
+    "hh:ss",
+    "mm:ss",
+    "ss.00",
+    "hh:::mm:ss",
+    "hh:mmm",
+    "[hh]:mm:ss",
+    "[mm]:ss",
+    "[ss]",
+    "$#,##0.000",
+    "R#,##0.0",
+    '"m"#,##0.0',
+    ".",
+    "0.",
+    "0.0%",
+    "000.000%",
+    "0000000",
+    "##0° 00' 00''",
+    "R #,##0.00",
+    "R #,##0.00;0000",
+    "[>543]0000;#0.0",
+    "[<543]0000;#0.0",
+    "[=543][h];yyyymm",
+    "[>=1,5]0;0.0",
+    "[>" + "9" * 400 + "]0;0.0",
+    "0.00E+00",
+    "0 yyyy",
+    "@",
+    "[>1000$# ##0.0",
+]
+
+values = [
+    0,
+    1,
+    -1,
+    0.5,
+    -0.4,
+    123.45689,
+    543,
+    543.234,
+    1234.1234,
+    -3463.456,
+    12200000,
+    0.999,
+    "text",
+    datetime.datetime(2024, 10, 4, 5, 3, 4),
+    datetime.date(2024, 10, 4),
+    datetime.time(5, 3, 4),
+]
+
+
+class TestCodegen(unittest.TestCase):
+    def test_same_as_interpreter(self) -> None:
+        interpreter = get_text_function({"raise": False})
+        codegen = get_text_function({"raise": False, "renderer": "codegen"})
+
+        def result(t: Any, value: Any, fmt: str) -> Any:
+            try:
+                return t(value, fmt)
+            except Exception as e:
+                return type(e)
+
+        for fmt in formats:
+            for value in values:
+                with self.subTest(fmt=fmt, value=value):
+                    expected = result(interpreter, value, fmt)
+                    actual = result(codegen, value, fmt)
+                    if isinstance(expected, Exception):
+                        self.assertEqual(str(expected), str(actual))
+                    else:
+                        self.assertEqual(expected, actual)
+
+    def test_unknown_renderer(self) -> None:
+        with self.assertRaises(ValueError):
+            get_text_function({"renderer": "nope"})(1, "0")
+
+
+if __name__ == "__main__":
+    unittest.main(
+        failfast=True,
+    )
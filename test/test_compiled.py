@@ -0,0 +1,151 @@
+import dataclasses
+import pickle
+import unittest
+from concurrent.futures import ThreadPoolExecutor
+from unittest import mock
+
+from excel_text import compile_format, text
+
+# noinspection PyProtectedMember
+from excel_text import _tokens
+
+# noinspection PyProtectedMember
+from excel_text._errors import ValueExcelError
+
+# noinspection PyProtectedMember
+from excel_text._preprocess import preprocess
+
+# noinspection PyProtectedMember
+from excel_text._tokenizer import get_tokenizer
+
+
+class TestCompiledFormat(unittest.TestCase):
+    def test_render_matches_text(self) -> None:
+        for value, fmt in [
+            (1234.5678, "$#,##0.00"),
+            (-3463.456, "R #,##0.00"),
+            (-34.456, "R #,##0.00;0000"),
+            (543.234, "[>543]0000;#0.0"),
+            (1234.8765, "yyyy/mm/dd hh:mm:ss AM/PM"),
+            (1234.5432, "[hh]:mm:ss"),
+        ]:
+            with self.subTest(fmt=fmt):
+                self.assertEqual(text(value, fmt), compile_format(fmt).render(value))
+
+    def test_values_are_converted_once(self) -> None:
+        for fmt in ["dd/mm/yyyy hh:mm:ss AM/PM", "[>=0]yyyy [h]:[mm]:[ss];0", "[h]:mm"]:
+            cf = compile_format(fmt)
+            expected = text(44259.53, fmt)
+            with self.subTest(fmt=fmt), mock.patch.object(
+                _tokens, "ensure_python_date", wraps=_tokens.ensure_python_date
+            ) as date, mock.patch.object(
+                _tokens, "ensure_python_time", wraps=_tokens.ensure_python_time
+            ) as time, mock.patch.object(
+                _tokens, "elapsed_seconds", wraps=_tokens.elapsed_seconds
+            ) as elapsed:
+                self.assertEqual(expected, cf.render(44259.53))
+                self.assertLessEqual(date.call_count, 1)
+                self.assertLessEqual(time.call_count, 1)
+                self.assertLessEqual(elapsed.call_count, 1)
+
+    def test_render_many(self) -> None:
+        self.assertEqual(
+            ["0012", "0123", "1234"],
+            compile_format("0000").render_many([12, 123, 1234]),
+        )
+        self.assertEqual([], compile_format("0000").render_many([]))
+
+    def test_config(self) -> None:
+        cf = compile_format("#.##0,00", {"decimal": ",", "thousands": "."})
+        self.assertEqual("123.123,00", cf.render(123123))
+
+    def test_immutable(self) -> None:
+        cf = compile_format("0.00")
+        with self.assertRaises(dataclasses.FrozenInstanceError):
+            cf.fmt = "0"  # type: ignore
+
+    def test_tokens_are_compact(self) -> None:
+        for fmt in ["$#,##0.00", "dd/mm/yyyy hh:mm:ss AM/PM", "[h]:mm;@", '"x"0%']:
+            cf = compile_format(fmt)
+            tokens = [t for section in cf.sections for t in section]
+            for token in tokens:
+                with self.subTest(fmt=fmt, token=token):
+                    self.assertFalse(hasattr(token, "__dict__"))
+                    with self.assertRaises(dataclasses.FrozenInstanceError):
+                        token.text = "0"  # type: ignore
+                    self.assertEqual(token, pickle.loads(pickle.dumps(token)))
+
+            copy = pickle.loads(pickle.dumps(cf))
+            self.assertEqual(cf.render(44259.53), copy.render(44259.53))
+
+    def test_fixed_text(self) -> None:
+        for token_class, text in [
+            (_tokens.ElapsedHoursToken, "[h]"),
+            (_tokens.ElapsedMinutesToken, "[m]"),
+            (_tokens.ElapsedSecondsToken, "[s]"),
+            (_tokens.StringToken, "@"),
+        ]:
+            with self.subTest(token_class=token_class):
+                token = token_class()
+                self.assertEqual(text, token.text)
+                self.assertEqual(text, pickle.loads(pickle.dumps(token)).text)
+                with self.assertRaises(TypeError):
+                    token_class(text="x")  # type: ignore
+
+    def test_preprocess_returns_new_tokens(self) -> None:
+        tokens = get_tokenizer(".", ",", "peg").tokenize("[>0]yyyy mm hh:mm AM/PM;m")
+        original = list(tokens)
+        processed = preprocess(tokens)
+        self.assertEqual(original, tokens)
+        self.assertIsInstance(processed, tuple)
+        self.assertNotEqual(original, list(processed))
+
+    def test_shared_between_threads(self) -> None:
+        cf = compile_format("[>=1000]dd/mm/yyyy hh:mm:ss AM/PM;#,##0.00")
+        values = [i * 37.123 for i in range(2000)]
+        expected = [cf.render(v) for v in values]
+        with ThreadPoolExecutor(8) as executor:
+            results = list(executor.map(cf.render, values))
+        self.assertEqual(expected, results)
+
+    def test_conditional_branches(self) -> None:
+        cf = compile_format('[>=1000]#,##0;"x"0.00')
+        self.assertIsNone(compile_format("0.00").branches)
+        assert cf.branches is not None
+        self.assertEqual(cf.sections, tuple(b.tokens for b in cf.branches))
+        self.assertEqual([0, 0, 1, 1], [cf.branch(v) for v in [1000, 1e6, 999.5, -5]])
+        # The minus sign stays within the section.
+        self.assertEqual(
+            ["1,235", "x12.50", "x-12.50"], cf.render_many([1234.6, 12.5, -12.5])
+        )
+        self.assertEqual(cf.render(-12.5), pickle.loads(pickle.dumps(cf)).render(-12.5))
+
+        with self.assertRaises(ValueError):
+            compile_format("[>=1000]0;0.00").render("text")
+
+    def test_invalid_format_raises(self) -> None:
+        with self.assertRaises(ValueExcelError):
+            compile_format("[>1000$# ##0.0", {"raise": False})
+
+    def test_sections(self) -> None:
+        self.assertEqual(1, len(compile_format("0.00").sections))
+        self.assertEqual(2, len(compile_format("[<543]0000;#0.0").sections))
+
+    def test_introspection(self) -> None:
+        cf = compile_format("yyyy/mm/dd")
+        self.assertTrue(cf.is_date_format)
+        self.assertFalse(cf.is_numeric_format)
+
+        cf = compile_format("[=543][h];0.00")
+        self.assertTrue(cf.is_date_format)
+        self.assertTrue(cf.is_numeric_format)
+
+        cf = compile_format('"hello"')
+        self.assertFalse(cf.is_date_format)
+        self.assertFalse(cf.is_numeric_format)
+
+
+if __name__ == "__main__":
+    unittest.main(
+        failfast=True,
+    )
@@ -0,0 +1,139 @@
+import datetime
+import unittest
+from typing import Any, List
+
+from excel_text import text, text_series, text_expr, register_accessors
+
+# noinspection PyProtectedMember
+from excel_text._errors import ValueExcelError
+
+try:
+    import pandas as pd
+
+    HAS_PANDAS = True
+except ImportError:  # pragma: no cover
+    HAS_PANDAS = False
+
+try:
+    import polars as pl
+
+    HAS_POLARS = True
+except ImportError:  # pragma: no cover
+    HAS_POLARS = False
+
+values: List[Any] = [1234.5678, -0.5, 12, 0.0, 44259.53]
+dates = [
+    datetime.datetime(2021, 3, 4, 12, 30, 15, 250000),
+    datetime.datetime(1900, 1, 1),
+    datetime.datetime(9999, 12, 31, 23, 59, 59),
+]
+formats = ["0.00", "#,##0", "$#,##0.00", "0%", "yyyy/mm/dd hh:mm", '"x"0.0']
+
+
+@unittest.skipUnless(HAS_PANDAS, "pandas is not installed")
+class TestPandas(unittest.TestCase):
+    def test_numbers(self) -> None:
+        for dtype in ["float64", "Float64", "object"]:
+            series = pd.Series(values, index=list("abcde"), name="x", dtype=dtype)
+            for fmt in formats:
+                with self.subTest(dtype=dtype, fmt=fmt):
+                    result = text_series(series, fmt)
+                    self.assertEqual([text(v, fmt) for v in values], result.tolist())
+                    self.assertEqual(list("abcde"), result.index.tolist())
+                    self.assertEqual("x", result.name)
+
+    def test_integers(self) -> None:
+        for dtype in ["int64", "uint8", "Int32"]:
+            with self.subTest(dtype=dtype):
+                series = pd.Series([0, 1, 12, 255], dtype=dtype)
+                self.assertEqual(
+                    ["0.0", "1.0", "12.0", "255.0"], text_series(series, "0.0").tolist()
+                )
+
+    def test_datetimes(self) -> None:
+        series = pd.Series(dates, dtype="datetime64[us]")
+        for fmt in ["yyyy/mm/dd hh:mm:ss.00", "dddd d mmmm AM/PM", "[h]:mm"]:
+            with self.subTest(fmt=fmt):
+                self.assertEqual(
+                    [text(d, fmt) for d in dates], text_series(series, fmt).tolist()
+                )
+
+    def test_missing_values(self) -> None:
+        for series in [
+            pd.Series([1.5, None, 2.0]),
+            pd.Series([1.5, None, 2.0], dtype="Float64"),
+            pd.Series([1.5, None, 2.0], dtype=object),
+            pd.Series([45000.5, None, 45001.0], dtype=object),
+            pd.Series([dates[0], None, dates[1]]),
+        ]:
+            with self.subTest(dtype=series.dtype):
+                result = text_series(series, "yyyy/mm/dd")
+                self.assertEqual([False, True, False], result.isna().tolist())
+
+    def test_errors(self) -> None:
+        series = pd.Series([1.0, 2.0])
+        with self.assertRaises(ValueExcelError):
+            text_series(series, "[>1000$# ##0.0")
+
+        result = text_series(series, "[>1000$# ##0.0", {"raise": False})
+        self.assertEqual(2, len(result))
+        self.assertTrue(all(isinstance(e, ValueExcelError) for e in result))
+
+        with self.assertRaises(TypeError):
+            text_series([1.0, 2.0], "0.00")
+
+    def test_accessor(self) -> None:
+        register_accessors()
+        register_accessors()
+        series = pd.Series([1234.5678, 0.5])
+        result = series.excel.text(  # type: ignore[attr-defined]
+            "#.##0,00", {"decimal": ",", "thousands": "."}
+        )
+        self.assertEqual(["1.234,57", "0,50"], result.tolist())
+
+
+@unittest.skipUnless(HAS_POLARS, "Polars is not installed")
+class TestPolars(unittest.TestCase):
+    def test_series(self) -> None:
+        for dtype in [pl.Float64, pl.Float32, pl.Int64]:
+            series = pl.Series("x", [1, None, 1234], dtype=dtype)
+            with self.subTest(dtype=dtype):
+                result = text_series(series, "#,##0.00")
+                self.assertEqual(["1.00", None, "1,234.00"], result.to_list())
+                self.assertEqual("x", result.name)
+                self.assertEqual(pl.String, result.dtype)
+
+    def test_dates(self) -> None:
+        dtypes: List[Any] = [pl.Datetime("ms"), pl.Datetime("ns"), pl.Date]
+        for dtype in dtypes:
+            series = pl.Series(dates, dtype=dtype)
+            for fmt in ["yyyy/mm/dd hh:mm:ss.000", "d mmm yy"]:
+                with self.subTest(dtype=dtype, fmt=fmt):
+                    self.assertEqual(
+                        [text(d, fmt) for d in series.to_list()],
+                        text_series(series, fmt).to_list(),
+                    )
+
+    def test_strings(self) -> None:
+        series = pl.Series(["abc", None])
+        self.assertEqual(["<abc>", None], text_series(series, '"<"@">"').to_list())
+
+    def test_expr(self) -> None:
+        df = pl.DataFrame({"x": [1.5, None, 3.25], "y": ["a", "b", "c"]})
+        self.assertEqual(
+            ["1.5", None, "3.3"],
+            df.select(text_expr(pl.col("x"), "0.0"))["x"].to_list(),
+        )
+        with self.assertRaises(ValueExcelError):
+            text_expr(pl.col("x"), "[>1000$# ##0.0")
+
+        result = df.select(text_expr(pl.col("x"), "[>1000$# ##0.0", {"raise": False}))
+        self.assertEqual([None, None, None], result["x"].to_list())
+
+    def test_namespace(self) -> None:
+        register_accessors()
+        df = pl.DataFrame({"x": [1234.5678, 0.5]})
+        expr = pl.col("x").excel.text("$#,##0.00")  # type: ignore[attr-defined]
+        self.assertEqual(["$1,234.57", "$0.50"], df.select(expr)["x"].to_list())
+        series = df["x"].head(1).excel.text("0")  # type: ignore[attr-defined]
+        self.assertEqual(["1235"], series.to_list())
@@ -0,0 +1,105 @@
+import datetime
+import unittest
+from typing import Any, Callable, Dict
+
+from hypothesis import given, settings, strategies as st
+
+from excel_text import get_text_function, FormatCache
+
+formats = [
+    "0",
+    "0.0",
+    "0.00",
+    "0.000",
+    "#,##0",
+    "#,##0.00",
+    "0%",
+    "0.0%",
+    "0.00%",
+    "#,##0%",
+    "@",
+    '"n/a"',
+    '"x""y"',
+    "yyyy-mm-dd",
+    "yyyy/mm/dd",
+    "dd/mm/yyyy",
+    "mm/dd/yyyy",
+    "hh:mm",
+    "hh:mm:ss",
+    "yyyy-mm-dd hh:mm:ss",
+]
+
+configs = [
+    {},
+    {"decimal": ",", "thousands": "."},
+    {"decimal": ".", "thousands": " "},
+    {"renderer": "codegen"},
+]
+
+numbers = st.one_of(
+    st.floats(),
+    st.integers(),
+    # Values with few decimals, which round half up, or carry across nines.
+    st.integers(-(10**12), 10**12).map(lambda n: n / 1000),
+    st.integers(-(10**6), 10**6).map(lambda n: n / 8),
+    st.integers(-(10**6), 10**6).map(lambda n: n + 0.995),
+    st.floats(-1e-3, 1e-3),
+)
+values = st.one_of(
+    numbers,
+    st.floats(0, 2958465.99),
+    st.booleans(),
+    st.text(max_size=5),
+    st.datetimes(),
+    st.dates(),
+    st.times(),
+    st.none(),
+)
+
+
+def outcome(t: Callable[[Any, str], Any], value: Any, fmt: str) -> Any:
+    try:
+        return t(value, fmt)
+    except Exception as e:
+        return type(e), str(e)
+
+
+class TestFastPath(unittest.TestCase):
+    @settings(max_examples=2000, deadline=None)
+    @given(
+        st.sampled_from(configs),
+        st.sampled_from(formats),
+        values,
+    )
+    def test_same_as_tokens(self, config: Dict[str, Any], fmt: str, value: Any) -> None:
+        fmt = fmt.replace(".", "\0").replace(",", config.get("thousands", ","))
+        fmt = fmt.replace("\0", config.get("decimal", "."))
+        fast = get_text_function(config)
+        slow = get_text_function({**config, "fast_path": False})
+        self.assertEqual(outcome(slow, value, fmt), outcome(fast, value, fmt))
+
+    def test_used(self) -> None:
+        cache: FormatCache[Any] = FormatCache()
+        t = get_text_function({"cache": cache})
+        self.assertEqual("1,234.57", t(1234.5678, "#,##0.00"))
+        self.assertEqual("2021-03-04", t(datetime.date(2021, 3, 4), "yyyy-mm-dd"))
+        self.assertEqual("-1,234.57", t(-1234.5678, "#,##0.00"))
+        self.assertEqual("2.00", t(1.995, "0.00"))
+
+        compiled = cache.get_or_create(
+            (".", ",", "interpreter", True, "#,##0.00"), lambda: None
+        )
+        self.assertIsNotNone(compiled.renderer)
+
+    def test_disabled(self) -> None:
+        cache: FormatCache[Any] = FormatCache()
+        t = get_text_function({"cache": cache, "fast_path": False})
+        self.assertEqual("1,234.57", t(1234.5678, "#,##0.00"))
+        compiled = cache.get_or_create(
+            (".", ",", "interpreter", False, "#,##0.00"), lambda: None
+        )
+        self.assertIsNone(compiled.renderer)
+
+
+if __name__ == "__main__":
+    unittest.main()
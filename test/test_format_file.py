@@ -0,0 +1,124 @@
+import os
+import pickle
+import subprocess
+import sys
+import tempfile
+import unittest
+from unittest import mock
+
+import excel_text
+from excel_text import FormatFile, compile_format, get_text_function, write_format_file
+
+# noinspection PyProtectedMember
+from excel_text import _factory, _format_file
+
+formats = ["$#,##0.00", "dd/mm/yyyy hh:mm AM/PM", "[>=1000]#,##0;0.00%", '"x"@']
+
+
+class TestFormatFile(unittest.TestCase):
+    def setUp(self) -> None:
+        directory = tempfile.TemporaryDirectory()
+        self.addCleanup(directory.cleanup)
+        self.path = os.path.join(directory.name, "formats.bin")
+
+    def open(self) -> FormatFile:
+        format_file = FormatFile(self.path)
+        self.addCleanup(format_file.close)
+        return format_file
+
+    def test_round_trip(self) -> None:
+        self.assertEqual(
+            len(formats), write_format_file(self.path, formats + ["[>5", formats[0]])
+        )
+        format_file = self.open()
+        self.assertEqual(len(formats), len(format_file))
+        for fmt in formats:
+            for renderer in ["interpreter", "codegen"]:
+                with self.subTest(fmt=fmt, renderer=renderer):
+                    compiled = format_file.get(fmt, renderer=renderer)
+                    assert compiled is not None
+                    self.assertEqual(compile_format(fmt), compiled)
+                    self.assertEqual(
+                        compile_format(fmt).render(1234.5), compiled.render(1234.5)
+                    )
+        self.assertIsNone(format_file.get("0.0"))
+        self.assertIsNone(format_file.get("[>5"))
+
+    def test_locale(self) -> None:
+        write_format_file(self.path, ["#.##0,00"], {"decimal": ",", "thousands": "."})
+        format_file = self.open()
+        self.assertIn((",", ".", "#.##0,00"), format_file)
+        self.assertIsNone(format_file.get("#.##0,00"))
+        compiled = format_file.get("#.##0,00", ",", ".")
+        assert compiled is not None
+        self.assertEqual("1.234,50", compiled.render(1234.5))
+
+    def test_text_function(self) -> None:
+        write_format_file(self.path, formats)
+        format_file = self.open()
+        text = get_text_function({"format_file": format_file, "renderer": "codegen"})
+        with mock.patch.object(
+            _factory, "compile_tokens", wraps=_factory.compile_tokens
+        ) as compile_tokens:
+            self.assertEqual("$1,234.50", text(1234.5, "$#,##0.00"))
+            compile_tokens.assert_not_called()
+            self.assertEqual("1,234.5", text(1234.5, "#,##0.0"))
+            compile_tokens.assert_called_once()
+            self.assertEqual(
+                "$1.00",
+                compile_format("$#,##0.00", {"format_file": format_file}).render(1),
+            )
+            compile_tokens.assert_called_once()
+
+    def test_skips_parser(self) -> None:
+        write_format_file(self.path, formats)
+        root = os.path.dirname(os.path.dirname(excel_text.__file__))
+        code = (
+            "import sys; from excel_text import FormatFile, get_text_function; "
+            f"text = get_text_function({{'format_file': FormatFile({self.path!r})}}); "
+            "print(text(44259.53, 'dd/mm/yyyy hh:mm AM/PM'), 'parsimonious' in sys.modules)"
+        )
+        output = subprocess.run(
+            [sys.executable, "-c", code],
+            capture_output=True,
+            text=True,
+            check=True,
+            env={**os.environ, "PYTHONPATH": root},
+        ).stdout
+        self.assertEqual("04/03/2021 12:43 PM False", output.strip())
+
+    def test_tokens_are_unpickled_once(self) -> None:
+        write_format_file(self.path, formats)
+        format_file = self.open()
+        with mock.patch.object(pickle, "loads", wraps=pickle.loads) as loads:
+            first = format_file.get(formats[0])
+            second = format_file.get(formats[0], renderer="codegen")
+            loads.assert_called_once()
+        assert first is not None and second is not None
+        self.assertIs(first.tokens, second.tokens)
+
+    def test_other_version(self) -> None:
+        with mock.patch.object(_format_file, "package_version", return_value="0.0.1"):
+            write_format_file(self.path, formats)
+        self.assertEqual(0, len(self.open()))
+
+    def test_other_schema(self) -> None:
+        # E.g. an uninstalled checkout, whose package version is always "unknown", after its tokens changed.
+        with mock.patch.object(_format_file, "package_version", return_value="unknown"):
+            with mock.patch.object(_format_file, "schema_version", return_value="0"):
+                write_format_file(self.path, formats)
+            self.assertEqual(0, len(self.open()))
+        self.assertEqual(64, len(_format_file.schema_version()))
+
+    def test_invalid_file(self) -> None:
+        for content in [b"", b"not a format file at all"]:
+            with open(self.path, "wb") as f:
+                f.write(content)
+            with self.assertRaises(ValueError):
+                FormatFile(self.path)
+
+    def test_pickle(self) -> None:
+        write_format_file(self.path, formats)
+        copy = pickle.loads(pickle.dumps(self.open()))
+        self.addCleanup(copy.close)
+        self.assertEqual(len(formats), len(copy))
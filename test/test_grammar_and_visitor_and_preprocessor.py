@@ -58,9 +58,7 @@ def tokenize(
     tree = parser.parse(fmt)
     tokens = visitor.visit(tree)
 
-    # TODO: Try not to do stuff in-place, because it prevents proper type checking.
-    preprocess(tokens)
-    return tokens  # type: ignore
+    return list(preprocess(tokens))
 
 
 class TestGrammar(unittest.TestCase):
@@ -182,12 +180,12 @@ class TestGrammar(unittest.TestCase):
                         operator="<",
                         rhs="543",
                     ),
-                    true_tokens=[
-                        NumberToken(text="0000", decimal_char=".", thousands_char=",")
-                    ],
-                    false_tokens=[
-                        NumberToken(text="#0.0", decimal_char=".", thousands_char=",")
-                    ],
+                    true_tokens=(
+                        NumberToken(text="0000", decimal_char=".", thousands_char=","),
+                    ),
+                    false_tokens=(
+                        NumberToken(text="#0.0", decimal_char=".", thousands_char=","),
+                    ),
                 )
             ],
             tokenize("[<543]0000;#0.0", ".", ","),
@@ -202,11 +200,11 @@ class TestGrammar(unittest.TestCase):
                         operator="=",
                         rhs="543",
                     ),
-                    true_tokens=[ElapsedHoursToken()],
-                    false_tokens=[
+                    true_tokens=(ElapsedHoursToken(),),
+                    false_tokens=(
                         YearToken(text="yyyy"),
                         MonthToken(text="mm"),
-                    ],
+                    ),
                 )
             ],
             tokenize("[=543][h];yyyymm", ".", ","),
@@ -221,12 +219,12 @@ class TestGrammar(unittest.TestCase):
                         operator=">",
                         rhs="543",
                     ),
-                    true_tokens=[
-                        NumberToken(text="0000", decimal_char=".", thousands_char=",")
-                    ],
-                    false_tokens=[
-                        NumberToken(text="#0.0", decimal_char=".", thousands_char=",")
-                    ],
+                    true_tokens=(
+                        NumberToken(text="0000", decimal_char=".", thousands_char=","),
+                    ),
+                    false_tokens=(
+                        NumberToken(text="#0.0", decimal_char=".", thousands_char=","),
+                    ),
                 )
             ],
             tokenize("[>543]0000;#0.0", ".", ","),
@@ -372,16 +370,16 @@ class TestGrammar(unittest.TestCase):
                         operator=">",
                         rhs="0",
                     ),
-                    true_tokens=[
+                    true_tokens=(
                         VerbatimToken(text="R"),
                         VerbatimToken(text=" "),
                         NumberToken(
                             text="#,##0.00", decimal_char=".", thousands_char=","
                         ),
-                    ],
-                    false_tokens=[
-                        NumberToken(text="0000", decimal_char=".", thousands_char=",")
-                    ],
+                    ),
+                    false_tokens=(
+                        NumberToken(text="0000", decimal_char=".", thousands_char=","),
+                    ),
                 ),
             ],
             tokenize("R #,##0.00;0000", ".", ","),
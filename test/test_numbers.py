@@ -0,0 +1,223 @@
+import random
+import unittest
+from concurrent.futures import ThreadPoolExecutor
+from decimal import ROUND_HALF_UP, Context, Decimal
+from typing import List, Optional, Union
+
+# noinspection PyProtectedMember
+from excel_text._numbers import (
+    CharacteristicFormat,
+    number_layout,
+    render_fixed,
+    render_scientific,
+    scale_decimal,
+    scale_scientific,
+)
+
+characteristic_formats = ["0", "#", "#,##0", "0000000", "##0° 00' 00''", "0 0", "{0}"]
+
+# Wide enough for all of the numbers below, so that only quantizing rounds.
+context = Context(prec=100, rounding=ROUND_HALF_UP)
+
+
+def render_characteristic(fmt: str, thousands_char: str, digits: str) -> str:
+    """
+    How numbers used to be rendered before the decimal point, one character at a time, which the layouts must match.
+    """
+    digits_iter = iter(digits[::-1])
+    return_string = ""
+
+    digit: Optional[str]
+    for character in fmt[::-1]:
+        if character in "0#?":
+            digit = next(digits_iter, "0" if character == "0" else None)
+            if digit is None:
+                break
+            return_string += digit
+        elif character != thousands_char:
+            return_string += character
+    return_string += "".join(digits_iter)
+
+    if thousands_char in fmt:
+        # The separators are inserted after every three characters, counted from the right.
+        for counter in range(1, (len(return_string) - 1) // 3 + 1):
+            pos = counter * 3 + counter - 1
+            return_string = (
+                f"{return_string[:pos]}{thousands_char}{return_string[pos:]}"
+            )
+    return return_string[::-1]
+
+
+def random_numbers(n: int, seed: int = 42) -> List[Union[float, int]]:
+    """
+    Numbers of all magnitudes, with many that are exactly or nearly halfway between two roundings.
+    """
+    rng = random.Random(seed)
+    numbers: List[Union[float, int]] = [0, 0.0, -0.0, 0.5, 2.5, -2.5, 0.125, 1.005]
+    numbers += [2.675, 1.995, 0.58, 1e-5, 9.995, 1.5e20, True]
+    for _ in range(n):
+        kind = rng.randrange(6)
+        if kind == 0:
+            numbers.append(rng.uniform(-1, 1) * 10 ** rng.randint(-12, 17))
+        elif kind == 1:
+            numbers.append(round(rng.uniform(-1e5, 1e5), rng.randint(0, 6)))
+        elif kind == 2:
+            # Halves at the last decimal.
+            half = rng.randint(-(10**9), 10**9) + 0.5
+            numbers.append(half / 10 ** rng.randint(0, 6))
+        elif kind == 3:
+            numbers.append(rng.randint(-(10**20), 10**20))
+        elif kind == 4:
+            numbers.append(float(f"{rng.randint(0, 10**6)}.{'9' * rng.randint(1, 12)}"))
+        else:
+            numbers.append(rng.choice([-1, 1]) * rng.random() / 10 ** rng.randint(0, 8))
+    return numbers
+
+
+def expected_decimal(value: Union[float, int], decimals: int, shift: int) -> Decimal:
+    """
+    The absolute value of a number times `10 ** shift`, rounded to `decimals` decimals with `decimal`.
+    """
+    scaled = abs(Decimal(repr(value) if isinstance(value, float) else int(value)))
+    scaled = scaled.scaleb(shift, context)
+    return scaled.quantize(Decimal(1).scaleb(-decimals), context=context)
+
+
+class TestScaleDecimal(unittest.TestCase):
+    def test_same_as_decimal(self) -> None:
+        for value in random_numbers(20000):
+            for decimals in [0, 1, 2, 3, 4, 7, 12, -2]:
+                self.assertEqual(
+                    int(expected_decimal(value, 0, decimals)),
+                    scale_decimal(value, decimals),
+                    (value, decimals),
+                )
+
+    def test_half_away_from_zero(self) -> None:
+        self.assertEqual(3, scale_decimal(2.5, 0))
+        self.assertEqual(3, scale_decimal(-2.5, 0))
+        self.assertEqual(268, scale_decimal(2.675, 2))
+        self.assertEqual(101, scale_decimal(1.005, 2))
+
+    def test_invalid(self) -> None:
+        with self.assertRaises(ValueError):
+            scale_decimal(float("nan"), 2)
+        with self.assertRaises(OverflowError):
+            scale_decimal(float("-inf"), 2)
+
+
+class TestRenderFixed(unittest.TestCase):
+    def test_same_as_decimal(self) -> None:
+        for fmt, characteristic, mantissa, n_decimals in [
+            ("0", "0", None, 0),
+            ("0.00", "0", "00", 2),
+            ("#,##0.000", "#,##0", "000", 3),
+            ("0.0%", "0", "0%", 1),
+            ("#,##0", "#,##0", None, 0),
+        ]:
+            layout = number_layout(fmt, characteristic, mantissa, None, ",")
+            grouping = "," if "," in fmt else ""
+            percent = "%" if "%" in fmt else ""
+            for value in random_numbers(5000):
+                rounded = expected_decimal(value, n_decimals, 2 if percent else 0)
+                expected = f"{rounded:{grouping}.{n_decimals}f}{percent}"
+                if value < 0 and rounded:
+                    expected = f"-{expected}"
+                self.assertEqual(
+                    expected, render_fixed(layout, ".", value), (fmt, value)
+                )
+
+    def test_carry(self) -> None:
+        layout = number_layout("0.00", "0", "00", None, ",")
+        self.assertEqual(
+            ["2.00", "10.00", "0.00", "0.00", "-0.50"],
+            [render_fixed(layout, ".", v) for v in [1.995, 9.999, 1e-5, -1e-5, -0.5]],
+        )
+
+
+class TestScaleScientific(unittest.TestCase):
+    def test_same_as_decimal(self) -> None:
+        for fmt, characteristic, mantissa, n_digits, step in [
+            ("0.00E+00", "0", "00", 1, 1),
+            ("0E+0", "0", None, 1, 1),
+            ("00.000E+00", "00", "000", 2, 1),
+            ("##0.0E+0", "##0", "0", 3, 3),
+            ("0.0E+0%", "0", "0", 1, 1),
+        ]:
+            layout = number_layout(fmt, characteristic, mantissa, "0", ",")
+            n_decimals = layout.n_decimals
+            shift = 2 if "%" in fmt else 0
+            for value in random_numbers(5000):
+                if not value:
+                    self.assertEqual((0, 0), scale_scientific(layout, value))
+                    continue
+                power = (
+                    abs(
+                        Decimal(repr(value) if isinstance(value, float) else int(value))
+                    ).adjusted()
+                    + shift
+                )
+                exponent = power // step * step - (n_digits - 1 if step == 1 else 0)
+                scaled = int(expected_decimal(value, 0, shift + n_decimals - exponent))
+                if scaled >= 10 ** (n_digits + n_decimals):
+                    exponent += step
+                    scaled = int(
+                        expected_decimal(value, 0, shift + n_decimals - exponent)
+                    )
+                self.assertEqual(
+                    (scaled, exponent), scale_scientific(layout, value), (fmt, value)
+                )
+
+    def test_render(self) -> None:
+        layout = number_layout("0.00E+00", "0", "00", "00", ",")
+        self.assertEqual(
+            ["1.00E+01", "-1.23E-04", "0.00E+00", "1.00E-05", "1.00E+100"],
+            [
+                render_scientific(layout, ".", v)
+                for v in [9.999, -0.000123, 0.0, 1e-5, 10**100]
+            ],
+        )
+
+    def test_invalid(self) -> None:
+        layout = number_layout("0.00E+00", "0", "00", "00", ",")
+        with self.assertRaises(ValueError):
+            scale_scientific(layout, float("nan"))
+        with self.assertRaises(OverflowError):
+            scale_scientific(layout, float("inf"))
+
+
+class TestCharacteristicFormat(unittest.TestCase):
+    def test_same_as_render_characteristic(self) -> None:
+        values = ["0", "7", "12", "1234", "123456", "12345678901234567890"]
+        for fmt in characteristic_formats:
+            for thousands_char in [",", " ", ""]:
+                characteristic = CharacteristicFormat(fmt, thousands_char)
+                for value in values:
+                    with self.subTest(fmt=fmt, thousands_char=thousands_char):
+                        self.assertEqual(
+                            render_characteristic(fmt, thousands_char, value),
+                            characteristic.render(value),
+                            value,
+                        )
+
+    def test_templates_are_kept(self) -> None:
+        characteristic = CharacteristicFormat("#,##0", ",")
+        self.assertEqual(
+            ["1,234", "5,678", "12"],
+            [characteristic.render(v) for v in ["1234", "5678", "12"]],
+        )
+        self.assertEqual([4, 2], list(characteristic._templates))
+
+    def test_shared_between_threads(self) -> None:
+        characteristic = CharacteristicFormat("#,##0", ",")
+        values = [str(10**n) for n in range(100)]
+        with ThreadPoolExecutor(8) as executor:
+            results = list(executor.map(characteristic.render, values * 8))
+        self.assertEqual(
+            [render_characteristic("#,##0", ",", v) for v in values * 8], results
+        )
+        self.assertEqual(set(range(1, 101)), set(characteristic._templates))
+
+
+if __name__ == "__main__":
+    unittest.main()
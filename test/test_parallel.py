@@ -0,0 +1,60 @@
+import unittest
+
+from excel_text import text_many, text_parallel
+
+# noinspection PyProtectedMember
+from excel_text._array import HAS_NUMPY
+
+# noinspection PyProtectedMember
+from excel_text._errors import ValueExcelError
+
+if HAS_NUMPY:
+    import numpy as np
+
+
+class TestTextParallel(unittest.TestCase):
+    def test_numbers(self) -> None:
+        values = [i * 12.5 for i in range(1000)] + list(range(100))
+        self.assertEqual(
+            text_many(values, "#,##0.00"),
+            text_parallel(values, "#,##0.00", workers=2, chunksize=64),
+        )
+
+    def test_mixed_types(self) -> None:
+        values = [i * 12.5 for i in range(100)] + ["abc", 7, None]
+        self.assertEqual(
+            text_many(values, '"x"@'),
+            text_parallel(iter(values), '"x"@', workers=2, chunksize=10),
+        )
+
+    @unittest.skipUnless(HAS_NUMPY, "NumPy is not installed")
+    def test_shared_array(self) -> None:
+        values = np.arange(0, 50000, 6.25).reshape(-1, 2)
+        for fmt in ["#,##0.00", "yyyy/mm/dd hh:mm"]:
+            with self.subTest(fmt=fmt):
+                self.assertEqual(
+                    text_many(values, fmt),
+                    text_parallel(values, fmt, workers=2, chunksize=500),
+                )
+
+    def test_sequential(self) -> None:
+        self.assertEqual(
+            ["1.0", "2.5"], text_parallel([1, 2.5], "0.0", workers=1, chunksize=1)
+        )
+        self.assertEqual(["1.0", "2.5"], text_parallel([1, 2.5], "0.0"))
+        self.assertEqual([], text_parallel([], "0.0", workers=2))
+
+    def test_errors(self) -> None:
+        with self.assertRaises(ValueExcelError):
+            text_parallel([1, 2], "[>5]", workers=2, chunksize=1)
+
+        results = text_parallel([1, 2], "[>5]", {"raise": False}, workers=2)
+        self.assertEqual(2, len(results))
+        for result in results:
+            self.assertIsInstance(result, ValueExcelError)
+
+        with self.assertRaises(ValueError):
+            text_parallel([1, 2, "abc", 3], "0.0", workers=2, chunksize=1)
+
+        with self.assertRaises(ValueError):
+            text_parallel([1, 2], "0", workers=2, chunksize=0)
@@ -0,0 +1,102 @@
+"""
+Check that the hand-written scanner produces exactly the same tokens as the PEG parser.
+"""
+
+import ast
+import random
+import unittest
+from pathlib import Path
+from typing import List, Set
+
+# noinspection PyProtectedMember
+from excel_text._preprocess import preprocess
+
+# noinspection PyProtectedMember
+from excel_text._tokenizer import get_tokenizer
+
+# noinspection PyProtectedMember
+from excel_text._tokens import FormatStringToken
+
+from excel_text import get_text_function
+
+locales = [(".", ","), (",", "."), (".", " "), (",", " "), (".", "_")]
+
+
+def corpus() -> Set[str]:
+    """
+    All string literals that are passed to a function in the other tests, which includes every format string.
+    """
+    strings = set()
+    for path in Path(__file__).parent.glob("test_*.py"):
+        for node in ast.walk(ast.parse(path.read_text(encoding="utf-8"))):
+            if isinstance(node, ast.Call):
+                for arg in node.args:
+                    if isinstance(arg, ast.Constant) and isinstance(arg.value, str):
+                        strings.add(arg.value)
+    return strings
+
+
+def tokenize(
+    fmt: str,
+    decimal_char: str,
+    thousands_char: str,
+    parser: str,
+) -> List[FormatStringToken]:
+    """
+    Tokenize and preprocess.
+    """
+    tokens = get_tokenizer(decimal_char, thousands_char, parser).tokenize(fmt)
+    return list(preprocess(tokens))
+
+
+class TestScanner(unittest.TestCase):
+    def assert_same_as_peg(
+        self, fmt: str, decimal_char: str, thousands_char: str
+    ) -> None:
+        try:
+            expected = tokenize(fmt, decimal_char, thousands_char, "peg")
+        except Exception as e:
+            with self.assertRaises(Exception) as cm:
+                tokenize(fmt, decimal_char, thousands_char, "scanner")
+            self.assertIs(type(e), type(cm.exception))
+        else:
+            self.assertEqual(
+                expected, tokenize(fmt, decimal_char, thousands_char, "scanner")
+            )
+
+    def test_corpus(self) -> None:
+        strings = corpus()
+        self.assertGreater(len(strings), 100)
+        for fmt in sorted(strings):
+            for decimal_char, thousands_char in locales:
+                with self.subTest(fmt=fmt, decimal=decimal_char):
+                    self.assert_same_as_peg(fmt, decimal_char, thousands_char)
+
+    def test_random(self) -> None:
+        rng = random.Random(6)
+        alphabet = list("#0?%.,_ ;:@\"'[]<>=/\\-$EeYyMmDdHhSsAaPpbgn12345")
+        for _ in range(3000):
+            fmt = "".join(rng.choices(alphabet, k=rng.randint(0, 12)))
+            for decimal_char, thousands_char in locales[:2]:
+                with self.subTest(fmt=fmt, decimal=decimal_char):
+                    self.assert_same_as_peg(fmt, decimal_char, thousands_char)
+
+    def test_conditions(self) -> None:
+        for fmt in ["[>5]0;0", "[<=1,5]0;0.0", "0;0", "[>5];0;0", "0;0;0", "0;", ";0"]:
+            for decimal_char, thousands_char in locales:
+                with self.subTest(fmt=fmt, decimal=decimal_char):
+                    self.assert_same_as_peg(fmt, decimal_char, thousands_char)
+
+    def test_errors(self) -> None:
+        for fmt in ["", ";", ";?0.0E-0", "0;;", "0E:", "0;0E:", "[>1000$# ##0.0"]:
+            with self.subTest(fmt=fmt):
+                self.assert_same_as_peg(fmt, ".", ",")
+
+    def test_text(self) -> None:
+        text = get_text_function({"parser": "scanner"})
+        self.assertEqual("$1,234.57", text(1234.5678, "$#,##0.00"))
+        self.assertEqual("2021/03/04 12:00", text(44259.5, "yyyy/mm/dd hh:mm"))
+
+    def test_unknown_parser(self) -> None:
+        with self.assertRaises(ValueError):
+            get_text_function({"parser": "nope"})
@@ -1,5 +1,6 @@
 import datetime
 import unittest
+import excel_text
 from excel_text import text, get_text_function
 
 # noinspection PyProtectedMember
@@ -366,7 +367,25 @@ class TestText(unittest.TestCase):
 
     def test_scientific_format(self) -> None:
         self.assertEqual("1.22E+07", text(12200000, "0.00E+00"))
-        self.assertEqual("0.33E+00", text(1.0 / 3.0, "0.00E+00"))
+        self.assertEqual("3.33E-01", text(1.0 / 3.0, "0.00E+00"))
+        self.assertEqual("-1.23E-05", text(-0.0000123, "0.00E+00"))
+        self.assertEqual("0.00E+00", text(0, "0.00E+00"))
+        self.assertEqual("1.00E+05", text(99999, "0.00E+00"))
+        self.assertEqual("1.2E+100", text(1.2e100, "0.0E+00"))
+        self.assertEqual("1.2E7", text(12200000, "0.0E-0"))
+        self.assertEqual("1.2E-7", text(1.2e-7, "0.0E-0"))
+        self.assertEqual("12.20E+06", text(12200000, "00.00E+00"))
+
+    def test_engineering_format(self) -> None:
+        self.assertEqual("12.2E+6", text(12200000, "##0.0E+0"))
+        self.assertEqual("1.0E+3", text(999.96, "##0.0E+0"))
+        self.assertEqual("123.0E-6", text(0.000123, "##0.0E+0"))
+
+
+class TestPackage(unittest.TestCase):
+    def test_dir(self) -> None:
+        public = {name for name in dir(excel_text) if not name.startswith("_")}
+        self.assertEqual(set(excel_text.__all__), public)
 
 
 if __name__ == "__main__":
@@ -0,0 +1,76 @@
+import unittest
+from concurrent.futures import ThreadPoolExecutor
+
+from excel_text import text_many, text_threaded
+
+# noinspection PyProtectedMember
+from excel_text._array import HAS_NUMPY
+
+# noinspection PyProtectedMember
+from excel_text._errors import ValueExcelError
+
+# noinspection PyProtectedMember
+from excel_text._threads import gil_enabled
+
+if HAS_NUMPY:
+    import numpy as np
+
+
+class TestTextThreaded(unittest.TestCase):
+    def test_numbers(self) -> None:
+        values = [i * 12.5 for i in range(1000)] + list(range(100))
+        for fmt in ["#,##0.00", "[>=1000]dd/mm/yyyy hh:mm AM/PM;0.0%"]:
+            with self.subTest(fmt=fmt):
+                self.assertEqual(
+                    text_many(values, fmt),
+                    text_threaded(values, fmt, workers=4, chunksize=64),
+                )
+
+    def test_mixed_types(self) -> None:
+        values = [i * 12.5 for i in range(100)] + ["abc", 7, None]
+        self.assertEqual(
+            text_many(values, '"x"@'),
+            text_threaded(iter(values), '"x"@', workers=2, chunksize=10),
+        )
+
+    @unittest.skipUnless(HAS_NUMPY, "NumPy is not installed")
+    def test_array(self) -> None:
+        values = np.arange(0, 50000, 6.25).reshape(-1, 2)
+        for fmt in ["#,##0.00", "yyyy/mm/dd hh:mm"]:
+            with self.subTest(fmt=fmt):
+                self.assertEqual(
+                    text_many(values, fmt),
+                    text_threaded(values, fmt, workers=2, chunksize=500),
+                )
+
+    def test_executor(self) -> None:
+        values = list(range(500))
+        with ThreadPoolExecutor(3) as executor:
+            for _ in range(2):
+                self.assertEqual(
+                    text_many(values, "0.0"),
+                    text_threaded(values, "0.0", chunksize=7, executor=executor),
+                )
+
+    def test_sequential(self) -> None:
+        self.assertEqual(
+            ["1.0", "2.5"], text_threaded([1, 2.5], "0.0", workers=1, chunksize=1)
+        )
+        self.assertEqual(["1.0", "2.5"], text_threaded([1, 2.5], "0.0"))
+        self.assertEqual([], text_threaded([], "0.0", workers=2))
+        self.assertIsInstance(gil_enabled(), bool)
+
+    def test_errors(self) -> None:
+        with self.assertRaises(ValueExcelError):
+            text_threaded([1, 2], "[>5]", workers=2, chunksize=1)
+
+        results = text_threaded([1, 2], "[>5]", {"raise": False}, workers=2)
+        self.assertEqual(2, len(results))
+        for result in results:
+            self.assertIsInstance(result, ValueExcelError)
+
+        with self.assertRaises(ValueError):
+            text_threaded([1, 2, "abc", 3], "0.0", workers=2, chunksize=1)
+
+        with self.assertRaises(ValueError):
+            text_threaded([1, 2], "0", workers=2, chunksize=0)
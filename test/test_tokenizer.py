@@ -0,0 +1,73 @@
+import unittest
+
+from excel_text import get_text_function, compile_format, warm_up
+
+# noinspection PyProtectedMember
+from excel_text._grammar import FormatStringParser
+
+# noinspection PyProtectedMember
+from excel_text._scanner import FormatStringScanner
+
+# noinspection PyProtectedMember
+from excel_text._tokenizer import (
+    PegTokenizer,
+    get_tokenizer,
+    create_tokenizer,
+    _registry,
+)
+
+
+class TestTokenizerRegistry(unittest.TestCase):
+    def test_shared_per_locale(self) -> None:
+        self.assertIs(get_tokenizer(",", ".", "peg"), get_tokenizer(",", ".", "peg"))
+        self.assertIsNot(get_tokenizer(",", ".", "peg"), get_tokenizer(".", ",", "peg"))
+        self.assertIsNot(
+            get_tokenizer(",", ".", "peg"), get_tokenizer(",", ".", "scanner")
+        )
+
+    def test_create(self) -> None:
+        self.assertIsInstance(create_tokenizer(".", ",", "peg"), PegTokenizer)
+        self.assertIsInstance(
+            create_tokenizer(".", ",", "scanner"), FormatStringScanner
+        )
+        self.assertIsNot(
+            create_tokenizer(".", ",", "peg"), create_tokenizer(".", ",", "peg")
+        )
+
+    def test_unknown_parser(self) -> None:
+        with self.assertRaises(ValueError):
+            get_tokenizer(".", ",", "nope")
+        self.assertNotIn((".", ",", "nope"), _registry)
+
+    def test_text_functions_share_grammar(self) -> None:
+        text1 = get_text_function({"decimal": ",", "thousands": "'"})
+        self.assertEqual("1'234,50", text1(1234.5, "#'##0,00"))
+
+        tokenizer = get_tokenizer(",", "'", "peg")
+        assert isinstance(tokenizer, PegTokenizer)
+        grammar = tokenizer.parser.grammar
+
+        text2 = get_text_function({"decimal": ",", "thousands": "'"})
+        self.assertEqual("9'876,00", text2(9876, "#'##0,00"))
+        self.assertIs(grammar, tokenizer.parser.grammar)
+        self.assertEqual(
+            "5,0", compile_format("0,0", {"decimal": ",", "thousands": "'"}).render(5)
+        )
+        self.assertIs(tokenizer, get_tokenizer(",", "'", "peg"))
+
+    def test_warm_up(self) -> None:
+        warm_up({"decimal": "|", "thousands": "~"})
+        tokenizer = get_tokenizer("|", "~", "peg")
+        assert isinstance(tokenizer, PegTokenizer)
+        self.assertIn("grammar", vars(tokenizer.parser))
+
+        warm_up({"decimal": "|", "thousands": "~", "parser": "scanner"})
+        scanner = get_tokenizer("|", "~", "scanner")
+        self.assertIn("expression_pattern", vars(scanner))
+
+    def test_warm_up_default(self) -> None:
+        warm_up()
+        tokenizer = get_tokenizer(".", ",", "peg")
+        assert isinstance(tokenizer, PegTokenizer)
+        self.assertIsInstance(tokenizer.parser, FormatStringParser)
+        self.assertIn("grammar", vars(tokenizer.parser))